@@ -0,0 +1,89 @@
+"""
+Broadphase benchmark on the stacked 1x1x1 box scene (see scene/asd.py).
+
+Compares the uniform grid with the other backends and with the plain
+all-pairs loop World.solve_collections used to run, at 100, 1k and 5k
+bodies standing in columns on a 50x5x50 kinematic floor.
+
+Run from the repository root:
+    python -m benchmarks.broadphase
+"""
+import math
+import time
+
+import numpy as np
+
+from bereshit.Broadphase import AllPairs, SweepAndPrune, DynamicAABBTree, SpatialHashGrid
+
+COLUMN_HEIGHT = 10
+TICKS = 5
+
+
+def stack_scene(count, seed=0):
+    """AABBs for `count` unit boxes stacked in columns plus the floor as object 0."""
+    rng = np.random.default_rng(seed)
+    columns = math.ceil(count / COLUMN_HEIGHT)
+    side = math.ceil(math.sqrt(columns))
+    centers = []
+    for i in range(count):
+        column, level = divmod(i, COLUMN_HEIGHT)
+        x, z = divmod(column, side)
+        centers.append(((x - side / 2) * 1.05, level * 1.0, (z - side / 2) * 1.05))
+    centers = np.array(centers) + rng.normal(0, 0.01, (count, 3))
+    half = np.full((count, 3), 0.5)
+
+    floor_center, floor_half = np.array([[0.0, -3.0, 0.0]]), np.array([[25.0, 2.5, 25.0]])
+    centers = np.vstack([floor_center, centers])
+    half = np.vstack([floor_half, half])
+    static = [True] + [False] * count
+    return centers, half, static
+
+
+def python_all_pairs(keys, mins, maxs, static):
+    """The i < j loop the world used before it had a broadphase."""
+    lo, hi = mins.tolist(), maxs.tolist()
+    pairs = []
+    for i in range(len(keys)):
+        for j in range(i + 1, len(keys)):
+            if static[i] and static[j]:
+                continue
+            a, b, c, d = lo[i], hi[i], lo[j], hi[j]
+            if a[0] <= d[0] and c[0] <= b[0] and a[1] <= d[1] and c[1] <= b[1] and a[2] <= d[2] and c[2] <= b[2]:
+                pairs.append((i, j))
+    return pairs
+
+
+def run(update, centers, half, static, ticks, seed=1):
+    rng = np.random.default_rng(seed)
+    keys = list(range(len(centers)))
+    centers = centers.copy()
+    pairs = update(keys, centers - half, centers + half, static)  # warm up persistent state
+    elapsed = 0.0
+    for _ in range(ticks):
+        centers[1:] += rng.normal(0, 0.002, (len(centers) - 1, 3))  # bodies settling in place
+        start = time.perf_counter()
+        pairs = update(keys, centers - half, centers + half, static)
+        elapsed += time.perf_counter() - start
+    return elapsed / ticks, len(pairs)
+
+
+def main():
+    backends = [
+        ("python all-pairs", lambda: python_all_pairs),
+        ("all (numpy)", lambda: AllPairs().update),
+        ("sap", lambda: SweepAndPrune().update),
+        ("bvh", lambda: DynamicAABBTree().update),
+        ("grid", lambda: SpatialHashGrid(cell_size=1.0).update),
+    ]
+    print(f"{'bodies':>7} {'backend':>18} {'ms/tick':>10} {'pairs':>8} {'speedup':>8}")
+    for count in (100, 1000, 5000):
+        centers, half, static = stack_scene(count)
+        baseline = None
+        for name, make in backends:
+            seconds, pairs = run(make(), centers, half, static, TICKS)
+            baseline = baseline or seconds
+            print(f"{count:>7} {name:>18} {seconds * 1000:>10.2f} {pairs:>8} {baseline / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
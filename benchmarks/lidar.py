@@ -0,0 +1,65 @@
+"""
+Sensor benchmark: lidar and depth camera scans in the 1k box scene of
+benchmarks/raycast.py.
+
+Each sensor sits on an object in the middle of the scene and is driven by
+its own Update, as a World tick would call it, so the time includes taking
+the pose and publishing the ranges. Reports rays per second on one core
+against the 100k target, and the same scan through Physics.RaycastBatch
+(which does not know the rays share an origin) for comparison.
+
+Run from the repository root:
+    python -m benchmarks.lidar
+"""
+import time
+
+import numpy as np
+
+from bereshit import Object, Vector3, Physics
+from bereshit.addons.sensors import Lidar, DepthCamera, planar_scan, spinning_scan
+
+from benchmarks.raycast import scene, BOXES
+
+TARGET = 100_000  # rays per second
+
+
+def sensors():
+    return [
+        ("2D, 360 beams, 30 m", Lidar(planar_scan(360), max_range=30.0)),
+        ("16 x 1024, 30 m", Lidar(spinning_scan(1024, 16), max_range=30.0)),
+        ("64 x 1024, 30 m", Lidar(spinning_scan(1024, 64), max_range=30.0)),
+        ("16 x 1024, 100 m", Lidar(spinning_scan(1024, 16), max_range=100.0)),
+        ("depth 160 x 120, 30 m", DepthCamera(160, 120, fov=90.0, max_range=30.0)),
+    ]
+
+
+def timed(run, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    world = scene(BOXES)
+    mount = Object(position=Vector3(0, 5, 0), name="sensors")
+    world.add_child(mount)
+    world.scene_index.refresh()  # built once, like after the first tick
+
+    print(f"sensor at (0, 5, 0) among {BOXES} boxes, target {TARGET} rays/s")
+    print(f"{'sensor':>22} {'rays':>7} {'hits':>7} {'ms/scan':>8} {'rays/s':>10} {'batch rays/s':>13} {'target':>7}")
+    for name, sensor in sensors():
+        mount.add_component(sensor, name=name)
+        rays = sensor.ranges.size
+        repeat = max(3, 200_000 // rays)
+        seconds = timed(lambda: sensor.Update(1 / 60), repeat)
+        origins = np.broadcast_to(sensor.origin, (rays, 3))
+        batch = timed(lambda: Physics.RaycastBatch(origins, sensor.directions(), sensor.max_range, world=world), 1)
+        hits = int(np.isfinite(sensor.ranges).sum())
+        ok = "ok" if rays / seconds >= TARGET else "below"
+        print(f"{name:>22} {rays:>7} {hits:>7} {seconds * 1e3:>8.1f} {rays / seconds:>10.0f} "
+              f"{rays / batch:>13.0f} {ok:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Batched raycast benchmark: 10k rays against 1k boxes.
+
+Times Physics.RaycastBatch (cluster cull + vectorized ray/OBB tests)
+against one Physics.Raycast call per ray (tree walk per ray), a
+vectorized test of every ray against every box with no cull, and the old
+way of calling BoxCollider.Raycast for every box and ray. The slow ones run
+on a sample of the rays and are scaled up. Boxes are randomly sized and
+turned in a 100 x 20 x 100 volume, half of them kinematic, and rays start
+anywhere in it with random directions and a 30 unit range.
+
+Run from the repository root:
+    python -m benchmarks.raycast
+"""
+import time
+
+import numpy as np
+
+from bereshit import Object, BoxCollider, Rigidbody, World, Physics
+from bereshit.Physics import ray_obb
+
+RAYS = 10_000
+BOXES = 1_000
+RANGE = 30.0
+
+
+def scene(count, seed=0):
+    rng = np.random.default_rng(seed)
+    objects = []
+    for i in range(count):
+        obj = Object(position=tuple(rng.uniform((-50, 0, -50), (50, 20, 50))), size=tuple(rng.uniform(0.5, 3, 3)),
+                     rotation=tuple(rng.uniform(0, 90, 3)), name=f"box_{i}")
+        obj.add_component([BoxCollider(), Rigidbody(isKinematic=bool(i % 2), useGravity=False)])
+        objects.append(obj)
+    return World(children=objects)
+
+
+def rays(count, seed=1):
+    rng = np.random.default_rng(seed)
+    origins = rng.uniform((-50, -5, -50), (50, 25, 50), (count, 3))
+    directions = rng.normal(size=(count, 3))
+    return origins, directions / np.linalg.norm(directions, axis=1, keepdims=True)
+
+
+def timed(run, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = run()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def batch(world, origins, directions):
+    return Physics.RaycastBatch(origins, directions, RANGE, world=world)
+
+
+def per_ray(world, origins, directions):
+    return [Physics.Raycast(o, d, maxDistance=RANGE, world=world) for o, d in zip(origins, directions)]
+
+
+def all_pairs(world, origins, directions, chunk=256):
+    index = world.scene_index
+    centers, rotations, half_sizes = index.box_shapes(np.arange(len(index.objects)))
+    nearest = []
+    for start in range(0, len(origins), chunk):
+        o, d = origins[start:start + chunk, None], directions[start:start + chunk, None]
+        nearest.append(ray_obb(o, d, centers[None], rotations[None], half_sizes[None], RANGE, normals=False).min(axis=1))
+    return np.concatenate(nearest)
+
+
+def per_box(world, origins, directions):
+    colliders = [obj.collider for obj in world.registry.colliders]
+    return [[collider.Raycast(o, d, RANGE) for collider in colliders] for o, d in zip(origins, directions)]
+
+
+def main():
+    world = scene(BOXES)
+    origins, directions = rays(RAYS)
+    world.scene_index.refresh()  # built once, like after the first tick
+
+    seconds, (distances, _, _, colliders) = timed(lambda: batch(world, origins, directions), repeat=3)
+    rows = [("RaycastBatch", RAYS, seconds)]
+    sample = 500
+    rows.append(("Raycast per ray", sample, timed(lambda: per_ray(world, origins[:sample], directions[:sample]))[0]))
+    sample = 2000
+    seconds, brute = timed(lambda: all_pairs(world, origins[:sample], directions[:sample]))
+    rows.append(("all pairs, no cull", sample, seconds))
+    sample = 2
+    rows.append(("BoxCollider.Raycast", sample, timed(lambda: per_box(world, origins[:sample], directions[:sample]))[0]))
+
+    agree = np.array_equal(np.isfinite(brute), np.isfinite(distances[:len(brute)])) and \
+        np.allclose(brute[np.isfinite(brute)], distances[:len(brute)][np.isfinite(brute)])
+    print(f"{RAYS} rays x {BOXES} boxes, {int((colliders >= 0).sum())} hits, batch agrees with all pairs: {agree}")
+    print(f"{'method':>20} {'rays timed':>11} {'ms for 10k':>11} {'rays/s':>11} {'speedup':>8}")
+    baseline = rows[-1][2] / rows[-1][1]
+    for name, count, seconds in rows:
+        per = seconds / count
+        print(f"{name:>20} {count:>11} {per * RAYS * 1e3:>11.1f} {1 / per:>11.0f} {baseline / per:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
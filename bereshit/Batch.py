@@ -0,0 +1,111 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from bereshit.World import World
+
+
+class SimulationResult:
+    """
+    What one world of a batch produced. `positions` is (frames, bodies, 3)
+    and `quaternions` (frames, bodies, 4) for the recorded bodies in `names`,
+    sampled at `times` (the state before the first tick is frame 0).
+    `metrics` is whatever the metrics callable returned at the end.
+    """
+
+    def __init__(self, params, names, times, positions, quaternions, metrics, ticks, wall_time):
+        self.params = params
+        self.names = names
+        self.times = times
+        self.positions = positions
+        self.quaternions = quaternions
+        self.metrics = metrics
+        self.ticks = ticks
+        self.wall_time = wall_time
+
+    def trajectory(self, name):
+        """(positions, quaternions) of one recorded body over time."""
+        k = self.names.index(name)
+        return self.positions[:, k], self.quaternions[:, k]
+
+    def __repr__(self):
+        return (f"SimulationResult(params={self.params}, bodies={len(self.names)}, "
+                f"frames={len(self.times)}, wall_time={self.wall_time:.3f})")
+
+
+def simulate(scene_factory, params, ticks, dt=1 / 60, record=True, record_every=1, metrics=None,
+             world_options=None, stop=None):
+    """
+    Build scene_factory(**params) into a World, Start it and run `ticks`
+    ticks of `dt` back to back, or until `stop(world)` is true (see
+    World.step_many). `record` is True for every physics body, a list of
+    object names, or False for no trajectory.
+    """
+    world = World(children=scene_factory(**params), **(world_options or {}))
+    try:
+        world.Start()
+        world.sync_bodies()
+        if record is True:
+            recorded = list(world.registry.physics)
+        elif record:
+            recorded = [child for child in world.registry.physics if child.name in record]
+        else:
+            recorded = []
+        names = [child.name for child in recorded]
+        rows = np.array(world.bodies.rows([child.get_component("Rigidbody") for child in recorded]), dtype=np.int64)
+
+        frames = ticks // record_every + 1 if recorded else 0
+        positions = np.zeros((frames, len(rows), 3))
+        quaternions = np.zeros((frames, len(rows), 4))
+        times = np.zeros(frames)
+        if frames:
+            positions[0] = world.bodies.position[rows]
+            quaternions[0] = world.bodies.quaternion[rows]
+
+        def sample(world, tick):
+            frame = tick // record_every
+            # rows stay put unless the scene changes while running
+            positions[frame] = world.bodies.position[rows]
+            quaternions[frame] = world.bodies.quaternion[rows]
+            times[frame] = tick * dt
+
+        start = time.perf_counter()
+        ran = world.step_many(ticks, dt, stop=stop, callback=sample if frames else None, every=record_every)
+        wall_time = time.perf_counter() - start
+
+        kept = ran // record_every + 1 if frames else 0
+        summary = metrics(world) if metrics is not None else {}
+        return SimulationResult(params, names, times[:kept], positions[:kept], quaternions[:kept], summary, ran,
+                                wall_time)
+    finally:
+        world.close()
+
+
+def _simulate(args):
+    scene_factory, params, options = args
+    return simulate(scene_factory, params, **options)
+
+
+def simulate_batch(scene_factory, param_sets, ticks, dt=1 / 60, workers=None, record=True, record_every=1,
+                   metrics=None, world_options=None, stop=None):
+    """
+    Run simulate() for every dict in `param_sets` and return the
+    SimulationResults in the same order. workers=0 runs them one after the
+    other in this process, otherwise on a pool of `workers` processes
+    (None: one per core).
+
+        results = simulate_batch(scene, [{"restitution": r} for r in (0.2, 0.5, 0.8)], ticks=600)
+
+    `scene_factory`, `metrics` and `stop` are sent to the workers, so they
+    must be picklable (module level functions, or World.all_asleep).
+    Workers never import the renderer and their objects never open a GL
+    context.
+    """
+    options = dict(ticks=ticks, dt=dt, record=record, record_every=record_every, metrics=metrics,
+                   world_options=world_options, stop=stop)
+    jobs = [(scene_factory, params, options) for params in param_sets]
+    if workers == 0:
+        return [_simulate(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_simulate, jobs))
@@ -0,0 +1,628 @@
+import numpy as np
+
+from bereshit.Island import island_labels
+from bereshit.Quaternion import Quaternion
+from bereshit.Vector3 import Vector3
+
+
+class Vector3View(Vector3):
+    """A Vector3 whose x, y, z live in one row of a BodyStore array."""
+
+    def __init__(self, row, on_write=None):
+        self._row = row
+        self._on_write = on_write
+
+    def _written(self):
+        if self._on_write is not None:
+            self._on_write()
+
+    @property
+    def x(self):
+        return float(self._row[0])
+
+    @x.setter
+    def x(self, value):
+        self._row[0] = value
+        self._written()
+
+    @property
+    def y(self):
+        return float(self._row[1])
+
+    @y.setter
+    def y(self, value):
+        self._row[1] = value
+        self._written()
+
+    @property
+    def z(self):
+        return float(self._row[2])
+
+    @z.setter
+    def z(self, value):
+        self._row[2] = value
+        self._written()
+
+    def __iadd__(self, other):
+        if isinstance(other, Vector3):
+            self._row += (other.x, other.y, other.z)
+        elif isinstance(other, (list, tuple, np.ndarray)):
+            self._row += (other[0], other[1], other[2])
+        else:
+            raise TypeError(f"Unsupported type for +=: {type(other)}")
+        self._written()
+        return self
+
+    def to_np(self):
+        return self._row.astype('f4')
+
+    # copies never share the store row
+    def __copy__(self):
+        return Vector3(self.x, self.y, self.z)
+
+    def __deepcopy__(self, memo):
+        return Vector3(self.x, self.y, self.z)
+
+    def __reduce__(self):
+        return Vector3, (self.x, self.y, self.z)
+
+
+class QuaternionView(Quaternion):
+    """A Quaternion whose x, y, z, w live in one row of a BodyStore array."""
+
+    def __init__(self, row, on_write=None):
+        self._row = row
+        self._on_write = on_write
+
+    def _written(self):
+        if self._on_write is not None:
+            self._on_write()
+
+    @property
+    def x(self):
+        return float(self._row[0])
+
+    @x.setter
+    def x(self, value):
+        self._row[0] = value
+        self._written()
+
+    @property
+    def y(self):
+        return float(self._row[1])
+
+    @y.setter
+    def y(self, value):
+        self._row[1] = value
+        self._written()
+
+    @property
+    def z(self):
+        return float(self._row[2])
+
+    @z.setter
+    def z(self, value):
+        self._row[2] = value
+        self._written()
+
+    @property
+    def w(self):
+        return float(self._row[3])
+
+    @w.setter
+    def w(self, value):
+        self._row[3] = value
+        self._written()
+
+    def __copy__(self):
+        return Quaternion(self.x, self.y, self.z, self.w)
+
+    def __deepcopy__(self, memo):
+        return Quaternion(self.x, self.y, self.z, self.w)
+
+    def __reduce__(self):
+        return Quaternion, (self.x, self.y, self.z, self.w)
+
+
+class StoreField:
+    """
+    Attribute that lives on the instance until its body is registered with a
+    World, and in the World's BodyStore arrays after that. Reads of vector
+    fields return views, so in-place edits like `rb.velocity.x = 1` or
+    `obj.position += v` write straight into the arrays.
+    """
+
+    def __init__(self, field, kind="vector"):
+        self.field = field
+        self.kind = kind  # "vector", "quaternion", "scalar", "flag" or "matrix"
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.local = "_" + name
+
+    def __get__(self, inst, owner=None):
+        if inst is None:
+            return self
+        handle = inst.__dict__.get("_body")
+        if handle is None:
+            try:
+                return inst.__dict__[self.local]
+            except KeyError:
+                raise AttributeError(self.name) from None
+        return handle.get(self)
+
+    def __set__(self, inst, value):
+        handle = inst.__dict__.get("_body")
+        if handle is None:
+            inst.__dict__[self.local] = value
+        else:
+            handle.set(self, value)
+
+    def copy_out(self, inst):
+        """Current value as a standalone object (not tied to the store)."""
+        value = self.__get__(inst)
+        if self.kind == "vector":
+            return Vector3(value.x, value.y, value.z)
+        if self.kind == "quaternion":
+            return Quaternion(value.x, value.y, value.z, value.w)
+        if self.kind == "matrix":
+            return np.array(value)
+        return value
+
+
+def store_fields(cls):
+    """All StoreField descriptors of a class (including base classes)."""
+    fields = []
+    for klass in reversed(cls.__mro__):
+        fields.extend(value for value in vars(klass).values() if isinstance(value, StoreField))
+    return fields
+
+
+def detached_state(inst):
+    """Instance __dict__ with store backed fields copied out, for copy and pickle."""
+    state = dict(inst.__dict__)
+    if state.pop("_body", None) is not None:
+        for field in store_fields(type(inst)):
+            state[field.local] = field.copy_out(inst)
+    return state
+
+
+class Transform:
+    """
+    World-space data derived from an object's position, rotation and size:
+    `rotation` (world-from-local, what quaternion.conjugate().to_matrix3()
+    gives), its transpose `rotation_T` and the `aabb_min` / `aabb_max`
+    bounds of its box.
+
+    For a body in a BodyStore the arrays are views of its rows, refreshed in
+    one batch for every body that moved; read them, don't keep them across
+    ticks. Other objects get a private copy, recomputed only when their
+    position, rotation or size changed.
+    """
+    __slots__ = ("position", "rotation", "rotation_T", "aabb_min", "aabb_max", "key")
+
+    def __init__(self):
+        self.position = np.zeros(3)
+        self.rotation = np.eye(3)
+        self.rotation_T = self.rotation.T
+        self.aabb_min = np.zeros(3)
+        self.aabb_max = np.zeros(3)
+        self.key = None
+
+    @classmethod
+    def of_row(cls, store, index):
+        transform = cls.__new__(cls)
+        transform.position = store.position[index]
+        transform.rotation = store.rotation[index]
+        transform.rotation_T = transform.rotation.T
+        transform.aabb_min = store.aabb_min[index]
+        transform.aabb_max = store.aabb_max[index]
+        transform.key = None
+        return transform
+
+    def update(self, position, quaternion, size):
+        """Recompute from an object's (detached) transform if it changed since the last call."""
+        key = (position.to_tuple(), (quaternion.x, quaternion.y, quaternion.z, quaternion.w), size.to_tuple())
+        if key == self.key:
+            return self
+        self.key = key
+        R = quaternion.conjugate().to_matrix3()
+        self.position[:] = key[0]
+        self.rotation[:] = R
+        extent = np.abs(R) @ (np.array(key[2], dtype=float) * 0.5)
+        self.aabb_min[:] = self.position - extent
+        self.aabb_max[:] = self.position + extent
+        return self
+
+
+class BodyHandle:
+    """Where a body lives in its store; views read through it."""
+    __slots__ = ("store", "index", "views", "cached")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+        self.views = {}
+        self.cached = None  # Transform over this row
+
+    def get(self, field):
+        kind = field.kind
+        if kind == "vector" or kind == "quaternion":
+            view = self.views.get(field.field)
+            if view is None:
+                row = getattr(self.store, field.field)[self.index]
+                view_type = Vector3View if kind == "vector" else QuaternionView
+                view = view_type(row, self.store.write_hook(field.field, self))
+                self.views[field.field] = view
+            return view
+        value = getattr(self.store, field.field)[self.index]
+        if kind == "scalar":
+            return float(value)
+        if kind == "flag":
+            return bool(value)
+        return value
+
+    def set(self, field, value):
+        self.store.write(field.field, self.index, value)
+        hook = self.store.write_hook(field.field, self)
+        if hook is not None:
+            hook()
+
+    def wake(self):
+        self.store.wake(self.index)
+
+    def touch(self):
+        """Mark the body's transform cache stale."""
+        self.store.transform_dirty[self.index] = True
+        self.store.transforms_stale = True
+
+    def transform(self):
+        self.store.refresh_transforms()
+        if self.cached is None:
+            self.cached = Transform.of_row(self.store, self.index)
+        return self.cached
+
+    def rebind(self):
+        """Point cached views at the current arrays (after a resize or a move)."""
+        for name, view in self.views.items():
+            view._row = getattr(self.store, name)[self.index]
+        self.cached = None
+
+    def detach(self):
+        """Give cached views a private copy so they stop following the slot."""
+        for view in self.views.values():
+            view._row = view._row.copy()
+            view._on_write = None
+        self.views = {}
+        self.cached = None
+
+
+def quat_from_euler(angles):
+    """Vectorized Quaternion.euler for (N, 3) angles in degrees, returns (N, 4) x, y, z, w."""
+    half = np.radians(angles) * 0.5
+    c3, s3 = np.cos(half[:, 0]), np.sin(half[:, 0])  # roll
+    c2, s2 = np.cos(half[:, 1]), np.sin(half[:, 1])  # pitch
+    c1, s1 = np.cos(half[:, 2]), np.sin(half[:, 2])  # yaw
+    return np.stack([
+        c1 * c2 * s3 - s1 * s2 * c3,
+        c1 * s2 * c3 + s1 * c2 * s3,
+        s1 * c2 * c3 - c1 * s2 * s3,
+        c1 * c2 * c3 + s1 * s2 * s3,
+    ], axis=1)
+
+
+def quat_to_euler(q):
+    """Vectorized Quaternion.to_euler for (N, 4) x, y, z, w arrays, returns (N, 3) degrees."""
+    x, y, z, w = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    roll = np.arctan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+    pitch = np.arcsin(np.clip(2 * (w * y - z * x), -1.0, 1.0))
+    yaw = np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+    return np.degrees(np.stack([roll, pitch, yaw], axis=1))
+
+
+def quat_to_matrix(q):
+    """Vectorized Quaternion.to_matrix3 for (N, 4) x, y, z, w arrays, returns (N, 3, 3)."""
+    x, y, z, w = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    return np.stack([
+        1 - 2 * y * y - 2 * z * z, 2 * x * y - 2 * z * w, 2 * x * z + 2 * y * w,
+        2 * x * y + 2 * z * w, 1 - 2 * x * x - 2 * z * z, 2 * y * z - 2 * x * w,
+        2 * x * z - 2 * y * w, 2 * y * z + 2 * x * w, 1 - 2 * x * x - 2 * y * y,
+    ], axis=1).reshape(-1, 3, 3)
+
+
+def quat_multiply(a, b):
+    """Vectorized Hamilton product of (N, 4) x, y, z, w arrays."""
+    ax, ay, az, aw = a[:, 0], a[:, 1], a[:, 2], a[:, 3]
+    bx, by, bz, bw = b[:, 0], b[:, 1], b[:, 2], b[:, 3]
+    return np.stack([
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+        aw * bw - ax * bx - ay * by - az * bz,
+    ], axis=1)
+
+
+class BodyStore:
+    """
+    Structure-of-arrays state for every Rigidbody in a World.
+
+    Row i of each array belongs to bodies[i]. Rows are kept packed: removing
+    a body moves the last one into its slot.
+    """
+
+    ARRAYS = {
+        "position": (3,),
+        "quaternion": (4,),
+        "velocity": (3,),
+        "angular_velocity": (3,),
+        "acceleration": (3,),
+        "angular_acceleration": (3,),
+        "force": (3,),
+        "torque": (3,),
+        "mass": (),
+        "inv_mass": (),
+        "inv_inertia": (3, 3),
+        "kinematic": (),
+        "use_gravity": (),
+        "asleep": (),
+        "sleep_timer": (),
+        "sleep_island": (),  # 1 + lowest row of the island it fell asleep with (update_sleep), 0 for none
+        # transform cache, derived from the fields above (see refresh_transforms)
+        "half_size": (3,),
+        "rotation": (3, 3),
+        "aabb_min": (3,),
+        "aabb_max": (3,),
+        "transform_dirty": (),
+    }
+    FLAGS = ("kinematic", "use_gravity", "asleep", "transform_dirty")
+    INTEGERS = ("sleep_timer", "sleep_island")
+    WAKING_FIELDS = ("velocity", "angular_velocity")  # script writes to these wake the body
+    TRANSFORM_FIELDS = ("position", "quaternion")  # writes to these dirty the cache
+
+    def __init__(self, capacity=16):
+        self.count = 0
+        self.capacity = 0
+        self.transforms_stale = False  # some row has transform_dirty set
+        self.generation = 0  # goes up whenever refresh_transforms changes a row
+        self.bodies = []  # Rigidbody per row
+        self.handles = []
+        self._resize(capacity)
+
+    def _resize(self, capacity):
+        for name, shape in self.ARRAYS.items():
+            dtype = bool if name in self.FLAGS else int if name in self.INTEGERS else float
+            array = np.zeros((capacity,) + shape, dtype=dtype)
+            if self.capacity:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.quaternion[self.count:, 3] = 1.0
+        self.capacity = capacity
+        for handle in self.handles:
+            handle.rebind()
+
+    def write_hook(self, field, handle):
+        """Callback run after a script writes `field` of a body, None if not needed."""
+        if field in self.WAKING_FIELDS:
+            return handle.wake
+        if field in self.TRANSFORM_FIELDS:
+            return handle.touch
+        return None
+
+    def write(self, field, index, value):
+        array = getattr(self, field)
+        if field == "mass":
+            array[index] = value
+            self.inv_mass[index] = 1.0 / value if value else 0.0
+        elif field == "quaternion":
+            array[index] = (value.x, value.y, value.z, value.w) if isinstance(value, Quaternion) else value
+        elif isinstance(value, Vector3):
+            array[index] = (value.x, value.y, value.z)
+        else:
+            array[index] = value
+
+    def add(self, rb):
+        """Move rb (and its parent's transform) into the store."""
+        if self.count == self.capacity:
+            self._resize(self.capacity * 2)
+        index = self.count
+        handle = BodyHandle(self, index)
+        self.count += 1
+        self.bodies.append(rb)
+        self.handles.append(handle)
+
+        for owner in (rb.parent, rb):
+            for field in store_fields(type(owner)):
+                self.write(field.field, index, field.__get__(owner))
+                owner.__dict__.pop(field.local, None)
+            owner.__dict__["_body"] = handle
+        self.half_size[index] = rb.parent.size.to_tuple()
+        self.half_size[index] *= 0.5
+        handle.touch()
+        return handle
+
+    def remove(self, rb):
+        """Copy rb's state back onto the instances and release its row."""
+        handle = rb.__dict__["_body"]
+        index = handle.index
+        self.wake(index)  # whatever slept on it has lost its support
+        self.wake(self.count - 1)  # the last row moves into this one, and islands are named after rows
+        for owner in (rb.parent, rb):
+            values = {field.local: field.copy_out(owner) for field in store_fields(type(owner))}
+            del owner.__dict__["_body"]
+            owner.__dict__.update(values)
+        handle.detach()
+
+        last = self.count - 1
+        if index != last:
+            for name in self.ARRAYS:
+                array = getattr(self, name)
+                array[index] = array[last]
+            moved = self.handles[last]
+            moved.index = index
+            moved.rebind()
+            self.bodies[index] = self.bodies[last]
+            self.handles[index] = moved
+        self.bodies.pop()
+        self.handles.pop()
+        self.count = last
+        self.quaternion[last] = (0, 0, 0, 1)
+        self.asleep[last] = False
+        self.sleep_timer[last] = 0
+        self.sleep_island[last] = 0
+        self.transform_dirty[last] = False
+
+    def rows(self, rigidbodies):
+        """Store row of each (registered) rigidbody."""
+        return [rb.__dict__["_body"].index for rb in rigidbodies]
+
+    def awake(self):
+        """Mask of dynamic bodies that are not sleeping."""
+        n = self.count
+        return ~self.kinematic[:n] & ~self.asleep[:n]
+
+    def wake(self, index):
+        """
+        Wake a body and every body that fell asleep in the same island with
+        it, so a hit stack wakes at once rather than one body per tick.
+        Returns the rows woken.
+        """
+        if not self.asleep[index]:
+            return np.zeros(0, dtype=np.int64)
+        island = self.sleep_island[index]
+        n = self.count
+        rows = np.flatnonzero(self.asleep[:n] & (self.sleep_island[:n] == island)) if island else np.array([index])
+        self.asleep[rows] = False
+        self.sleep_timer[rows] = 0
+        self.sleep_island[rows] = 0
+        return rows
+
+    def sleep(self, index):
+        if not self.kinematic[index]:
+            self.asleep[index] = True
+            self.velocity[index] = 0.0
+            self.angular_velocity[index] = 0.0
+            self.force[index] = 0.0
+            self.torque[index] = 0.0
+
+    def update_sleep(self, touching, linear, angular, ticks):
+        """
+        Count how long each awake body has been below the velocity thresholds
+        and put bodies to sleep after `ticks` ticks. A body only falls asleep
+        together with every awake body it touches (`touching` is a list of
+        row pairs), i.e. whole islands fall asleep at once; each island is
+        numbered in `sleep_island` so wake() brings it back at once as well.
+        """
+        n = self.count
+        awake = self.awake()
+        resting = (np.einsum("ij,ij->i", self.velocity[:n], self.velocity[:n]) < linear * linear) & \
+                  (np.einsum("ij,ij->i", self.angular_velocity[:n], self.angular_velocity[:n]) < angular * angular)
+        timer = self.sleep_timer[:n]
+        timer[awake & resting] += 1
+        timer[awake & ~resting] = 0
+        ready = awake & (timer >= ticks)
+        if not ready.any():
+            return
+
+        labels = island_labels(n, touching, awake)
+        blocked = set(labels[awake & ~ready].tolist())
+        islands = {}  # island label -> sleep_island, named after its first row
+        for i in np.flatnonzero(ready):
+            if labels[i] not in blocked:
+                self.sleep(i)
+                self.sleep_island[i] = islands.setdefault(labels[i], i + 1)
+
+    def copy_for(self, rigidbodies):
+        """
+        A new store with copies of these arrays, row i belonging to
+        rigidbodies[i] (copies of self.bodies, in row order, whose fields are
+        not set on the instances). Used by World.fork.
+        """
+        store = BodyStore(0)
+        store.count = self.count
+        store.capacity = self.capacity
+        store.transforms_stale = self.transforms_stale
+        for name in self.ARRAYS:
+            setattr(store, name, getattr(self, name).copy())
+        for index, rb in enumerate(rigidbodies):
+            handle = BodyHandle(store, index)
+            store.bodies.append(rb)
+            store.handles.append(handle)
+            rb.__dict__["_body"] = handle
+            rb.parent.__dict__["_body"] = handle
+        return store
+
+    def sync(self, rigidbodies):
+        """Register new bodies and drop the ones that are no longer in the scene."""
+        current = set(rigidbodies)
+        for rb in [rb for rb in self.bodies if rb not in current]:
+            self.remove(rb)
+        for rb in rigidbodies:
+            if rb.__dict__.get("_body") is None:
+                self.add(rb)
+
+    def sync_sizes(self):
+        """
+        Pick up size changes of the bodies' objects. Object.size is a plain
+        attribute (colliders share it), so it is compared once per tick
+        instead of being moved into the store.
+        """
+        n = self.count
+        if n == 0:
+            return
+        half = np.array([rb.parent.size.to_tuple() for rb in self.bodies], dtype=float) * 0.5
+        changed = np.any(half != self.half_size[:n], axis=1)
+        if changed.any():
+            self.half_size[:n] = half
+            self.transform_dirty[:n] |= changed
+            self.transforms_stale = True
+
+    def refresh_transforms(self):
+        """
+        Recompute the transform cache (rotation matrix, AABB) of every row whose position, rotation or size changed, in one
+        batch. Cheap when nothing moved, so readers call it before every use.
+        """
+        if not self.transforms_stale:
+            return
+        self.transforms_stale = False
+        idx = np.flatnonzero(self.transform_dirty[:self.count])
+        if len(idx) == 0:
+            return
+        self.generation += 1
+        R = quat_to_matrix(self.quaternion[idx]).transpose(0, 2, 1)  # conjugate: world-from-local
+        self.rotation[idx] = R
+        extent = np.einsum("nij,nj->ni", np.abs(R), self.half_size[idx])
+        self.aabb_min[idx] = self.position[idx] - extent
+        self.aabb_max[idx] = self.position[idx] + extent
+        self.transform_dirty[idx] = False
+
+    def apply_gravity(self, gravity):
+        n = self.count
+        mask = self.use_gravity[:n] & self.awake()
+        self.force[:n][mask] += np.array([gravity.x, gravity.y, gravity.z]) * self.mass[:n][mask, None]
+
+    def integrate_velocities(self, dt):
+        """Turn this tick's forces and torques into velocity, before contacts are solved."""
+        idx = np.flatnonzero(self.awake())
+        if len(idx) == 0:
+            return
+
+        acc = self.force[idx] * self.inv_mass[idx, None]
+        ang_acc = np.einsum("nij,nj->ni", self.inv_inertia[idx], self.torque[idx])
+        self.velocity[idx] += acc * dt
+        self.angular_velocity[idx] += ang_acc * dt
+
+        self.acceleration[idx] = acc
+        self.force[idx] = 0.0
+        self.torque[idx] = 0.0
+        self.angular_acceleration[idx] = 0.0
+
+    def integrate_positions(self, dt):
+        """Move every awake dynamic body with its (solved) velocities."""
+        idx = np.flatnonzero(self.awake())
+        if len(idx) == 0:
+            return
+
+        self.quaternion[idx] = quat_multiply(self.quaternion[idx], quat_from_euler(self.angular_velocity[idx] * dt))
+        self.position[idx] += self.velocity[idx] * dt
+        self.transform_dirty[idx] = True
+        self.transforms_stale = True
@@ -1,5 +1,6 @@
 import numpy as np
 
+from bereshit.Contact import reduce_manifold
 from bereshit.Vector3 import Vector3
 from bereshit.Quaternion import Quaternion
 from bereshit.Physics import RaycastHit
@@ -16,26 +17,26 @@ class BoxCollider:
     def OnCollisionEnter(self, other_collider):
         self.enter = True
 
-        for component in self.parent.components.values():
-            if hasattr(component, 'OnCollisionEnter') and component.OnCollisionEnter is not None and component != self:
-                component.OnCollisionEnter(other_collider)
+        for component, handler in self.parent.callbacks["OnCollisionEnter"]:
+            if component is not self:
+                handler(other_collider)
 
     def OnCollisionStay(self, other_collider):
-        for component in self.parent.components.values():
-            if hasattr(component, 'OnCollisionStay') and component.OnCollisionStay is not None and component != self:
-                component.OnCollisionStay(other_collider)
+        for component, handler in self.parent.callbacks["OnCollisionStay"]:
+            if component is not self:
+                handler(other_collider)
 
     def OnCollisionExit(self, other_collider):
         self.enter = False
-        for component in self.parent.components.values():
-            if hasattr(component, 'OnCollisionExit') and component.OnCollisionExit is not None and component != self:
-                component.OnCollisionExit(other_collider)
+        for component, handler in self.parent.callbacks["OnCollisionExit"]:
+            if component is not self:
+                handler(other_collider)
 
     def OnTriggerEnter(self, other_collider):
         """This method can be overwritten by subclasses to handle trigger events."""
-        for component in self.parent.components.values():
-            if hasattr(component, 'OnTriggerEnter') and component.OnTriggerEnter is not None and component != self:
-                component.OnTriggerEnter(other_collider)
+        for component, handler in self.parent.callbacks["OnTriggerEnter"]:
+            if component is not self:
+                handler(other_collider)
 
     def get_bounds(self):
         # Get 8 corners in local space
@@ -69,9 +70,14 @@ class BoxCollider:
         bounds.append([min_bound, max_bound])
         return bounds
 
+    def aabb(self):
+        """World-space axis aligned bounds of the box as (min, max) numpy arrays."""
+        transform = self.obj.world_transform
+        return transform.aabb_min.copy(), transform.aabb_max.copy()
+
     def vertices(self):
-        center, size, rotation = self.parent.position, self.size, self.obj.quaternion.conjugate()
-        R = rotation.to_matrix3()
+        transform = self.obj.world_transform
+        center, size, R = transform.position, self.size, transform.rotation
         w, h, d = np.array(size) / 2
         corners = np.array([
             [-w, -h, -d],
@@ -84,7 +90,7 @@ class BoxCollider:
             [-w, h, d],
         ])
         rotated = corners @ R.T
-        return rotated + center.to_np()
+        return rotated + center
     def triangles(self):
         vertices = self.vertices()
         # --- Define triangles using vertex indices ---
@@ -215,9 +221,10 @@ class BoxCollider:
 
             return RaycastHit(hit_world,normal_world)
 
-        center = self.parent.position.to_np()
+        transform = self.parent.world_transform
+        center = transform.position
         half_size = (self.parent.size/2).to_np()
-        R = self.parent.quaternion.conjugate().to_matrix3()
+        R = transform.rotation
 
         faces = self.temp(center,half_size,R)
 
@@ -240,7 +247,16 @@ class BoxCollider:
 
 
 
-    def check_collision(self, other, single_point=False):
+    def check_collision(self, other, single_point=False, separation=None, method="clip", max_points=4):
+        """
+        Contact points with `other` as [(point, normal, depth), ...] or None,
+        reduced to at most `max_points`, normal pointing from `other` towards this box.
+        `separation` is an (axis, depth, feature) already found by
+        box_sat_batch for this pair, otherwise the SAT is run here.
+        method "clip" builds the manifold from face clipping / edge-edge
+        closest points, "raycast" from edge raycasts (the old way, kept for
+        comparison).
+        """
 
         other_collider = getattr(other, 'collider', other)
         if other_collider is None:
@@ -249,208 +265,22 @@ class BoxCollider:
         # --- Internal Functions ---
         def generate_face_to_face_contact(ref_center, ref_axes, ref_half,
                                           inc_center, inc_axes, inc_half,
-                                          normal_axis, collision_normal, penetration_depth, ref):
+                                          normal_axis, collision_normal):
+            """
+            Face contact: clip the incident box's face most opposed to the
+            reference face against the reference face's side planes, and keep
+            the clipped points that are below the reference face.
+            collision_normal points from the reference box towards the incident one.
+            Returns: ([(point, depth)], gizmos)
+            """
             def get_face_corners(center, axes, half_sizes, normal_axis):
                 u, v = [i for i in range(3) if i != normal_axis]
                 corners = []
-                for i in [-1, 1]:
-                    for j in [-1, 1]:
-                        corner = center + axes[u] * half_sizes[u] * i + axes[v] * half_sizes[v] * j
-                        corners.append(corner)
+                for i, j in ((-1, -1), (-1, 1), (1, 1), (1, -1)):  # in order around the face
+                    corner = center + axes[u] * half_sizes[u] * i + axes[v] * half_sizes[v] * j
+                    corners.append(corner)
                 return corners
 
-            def line_plane_intersection(p1, p2, pA, pB, pC):
-                """
-                Find intersection of line (p1->p2) with plane (defined by pA, pB, pC).
-                Returns intersection point or None if parallel.
-                """
-                # Direction vector of line
-                d = p2 - p1
-                # Normal to plane
-                n = np.cross(pB - pA, pC - pA)
-                denom = np.dot(n, d)
-                if abs(denom) < 1e-9:
-                    return None  # Line parallel to plane
-                t = np.dot(n, pA - p1) / denom
-                return p1 + t * d
-
-            def point_in_triangle(pt, a, b, c):
-                """
-                Check if point pt lies inside triangle (a, b, c) using barycentric coordinates.
-                """
-                v0, v1, v2 = c - a, b - a, pt - a
-                dot00 = np.dot(v0, v0)
-                dot01 = np.dot(v0, v1)
-                dot02 = np.dot(v0, v2)
-                dot11 = np.dot(v1, v1)
-                dot12 = np.dot(v1, v2)
-
-                invDenom = 1 / (dot00 * dot11 - dot01 * dot01 + 1e-12)
-                u = (dot11 * dot02 - dot01 * dot12) * invDenom
-                v = (dot00 * dot12 - dot01 * dot02) * invDenom
-
-                return (u >= 0) and (v >= 0) and (u + v <= 1)
-
-            def coplanar(p1, p2, p3, p4, tol=1e-9):
-                """
-                Check if 4 points are coplanar.
-                """
-                v1, v2, v3 = p2 - p1, p3 - p1, p4 - p1
-                return abs(np.dot(np.cross(v1, v2), v3)) < tol
-
-            def line_shape_intersections(line_pts, shape_pts):
-                """
-                Compute intersections between a line (2 pts) and a shape (4 pts).
-                Returns list of intersection points.
-                """
-                p1, p2 = map(np.array, line_pts)
-                shape = [np.array(p) for p in shape_pts]
-
-                intersections = []
-
-                if coplanar(*shape):
-                    # Treat as quadrilateral: split into 2 triangles
-                    tris = [(shape[0], shape[1], shape[2]),
-                            (shape[0], shape[2], shape[3])]
-                else:
-                    # Treat as tetrahedron: 4 triangular faces
-                    tris = [(shape[0], shape[1], shape[2]),
-                            (shape[0], shape[1], shape[3]),
-                            (shape[0], shape[2], shape[3]),
-                            (shape[1], shape[2], shape[3])]
-
-                for A, B, C in tris:
-                    ipt = line_plane_intersection(p1, p2, A, B, C)
-                    if ipt is not None and point_in_triangle(ipt, A, B, C):
-                        # Check duplicates
-                        if not any(np.allclose(ipt, q, atol=1e-9) for q in intersections):
-                            intersections.append(ipt)
-
-                return intersections
-
-            def point_in_quad(pt, quad, tol=1e-9):
-                """
-                Check if a point lies inside a quadrilateral (assumed coplanar).
-                """
-                A, B, C, D = quad
-                # Ensure pt is in the same plane as the quad
-                n = np.cross(B - A, C - A)
-                if abs(np.dot(n, pt - A)) > tol:
-                    return False  # not in plane
-
-                # Then check triangle membership
-                return point_in_triangle(pt, A, B, C) or point_in_triangle(pt, A, C, D)
-
-            def point_plane_signed_distance(pt, A, B, C):
-                """Signed distance from point to plane defined by triangle ABC."""
-                n = np.cross(B - A, C - A)
-                n = n / np.linalg.norm(n)
-                return np.dot(pt - A, n)
-
-            def point_distance_to_shape_signed(pt, shape_pts):
-                """
-                Return (inside?, signed_depth) for point relative to shape.
-                - For quadrilateral: signed distance to plane (0 if inside polygon).
-                - For tetrahedron: max signed face distance (<=0 inside).
-                """
-                shape = [np.array(p) for p in shape_pts]
-                pt = np.array(pt)
-
-                if coplanar(*shape):  # quadrilateral
-                    A, B, C, D = shape
-                    d = point_plane_signed_distance(pt, A, B, C)
-                    if point_in_quad(pt, shape):
-                        return True, d  # inside → signed depth relative to plane
-                    else:
-                        return False, d  # outside but still signed
-                else:  # tetrahedron
-                    faces = [(shape[0], shape[1], shape[2]),
-                             (shape[0], shape[1], shape[3]),
-                             (shape[0], shape[2], shape[3]),
-                             (shape[1], shape[2], shape[3])]
-                    dists = [point_plane_signed_distance(pt, *f) for f in faces]
-                    inside = all(d <= 0 for d in dists) or all(d >= 0 for d in dists)
-                    return inside, max(dists, key=abs)  # use the most "limiting" face
-
-            # Example usage:
-            def point_in_quad(pt, quad):
-                """
-                Check if a point lies inside a quadrilateral (assumed coplanar).
-                """
-                A, B, C, D = quad
-                return point_in_triangle(pt, A, B, C) or point_in_triangle(pt, A, C, D)
-
-            def point_in_tetrahedron(pt, tet):
-                """
-                Check if a point lies inside a tetrahedron.
-                """
-                A, B, C, D = tet
-
-                def same_side(p, q, a, b, c):
-                    # normal of triangle
-                    n = np.cross(b - a, c - a)
-                    return np.dot(n, p - a) * np.dot(n, q - a) >= 0
-
-                # pick one reference vertex as "inside" point (D)
-                return (same_side(pt, D, A, B, C) and
-                        same_side(pt, C, A, B, D) and
-                        same_side(pt, B, A, C, D) and
-                        same_side(pt, A, B, C, D))
-
-            def point_in_shape(pt, shape_pts):
-                """
-                General check: point inside quadrilateral or tetrahedron.
-                """
-                shape = [np.array(p) for p in shape_pts]
-                pt = np.array(pt)
-
-                if coplanar(*shape):
-                    return point_in_quad(pt, shape)
-                else:
-                    return point_in_tetrahedron(pt, shape)
-
-            def sdf(x, ref):
-                result = []
-                result2 = []
-
-                plane_face, incident_face = x
-                for i in range(4):
-                    shape_points = [p.to_tuple() for p in incident_face]
-
-                    A = plane_face[i].to_tuple()
-                    B = plane_face[(i + 1) % 4].to_tuple()
-                    for j in range(len(incident_face)):
-                        shape_points[j] = incident_face[j].to_tuple()
-                    line_points = [A, B]
-                    for lp in line_points:
-                        inside, depth = point_distance_to_shape_signed(lp, shape_points)
-                        if point_in_shape(lp, shape_points):
-                            result2.append(lp)
-                    p = line_shape_intersections(line_points, shape_points)
-                    if len(p) > 0:
-                        result.append(p[0])
-                if len(result) == 0:
-                    result = result2
-
-                for i in range(4):
-                    shape_points = [p.to_tuple() for p in incident_face]
-
-                    A = incident_face[i].to_tuple()
-                    B = incident_face[(i + 1) % 4].to_tuple()
-                    for j in range(len(incident_face)):
-                        shape_points[j] = incident_face[j].to_tuple()
-                    line_points = [A, B]
-                    for lp in line_points:
-                        inside, depth = point_distance_to_shape_signed(lp, shape_points)
-                        if point_in_shape(lp, shape_points):
-                            result2.append(lp)
-                    p = line_shape_intersections(line_points, shape_points)
-                    if len(p) > 0:
-                        result.append(p[0])
-                if len(result) == 0:
-                    result = result2
-                return result
-
             def clip_polygon_against_plane(polygon, plane_point, plane_normal):
                 clipped = []
                 for i in range(len(polygon)):
@@ -473,55 +303,37 @@ class BoxCollider:
 
             # --- Reference face setup ---
             n_ref = ref_axes[normal_axis]
-            my_normal = (inc_center - ref_center).normalized().dot(collision_normal) * collision_normal
-            sign_inc = 1.0 if (inc_center - ref_center).normalized().dot(collision_normal) < 0.0 else -1.0
-
-            ref_face_center = ref_center + n_ref * ref_half[normal_axis] * -sign_inc
+            if n_ref.dot(collision_normal) < 0.0:
+                n_ref = -n_ref
+            ref_face_center = ref_center + n_ref * ref_half[normal_axis]
 
-            # --- Incident face setup ---
-            incident_axis = max(range(3), key=lambda i: inc_axes[i].dot(collision_normal))
+            # --- Incident face setup: the face whose normal is most against n_ref ---
+            incident_axis = max(range(3), key=lambda i: abs(inc_axes[i].dot(n_ref)))
             n_inc = inc_axes[incident_axis]
-
-            # sign_inc = 1.0 if n_inc.dot(collision_normal) < 0.0 else -1.0
-            incident_face_center = inc_center + n_inc * inc_half[incident_axis] * sign_inc
-
+            if n_inc.dot(n_ref) > 0.0:
+                n_inc = -n_inc
+            incident_face_center = inc_center + n_inc * inc_half[incident_axis]
             incident_face = get_face_corners(incident_face_center, inc_axes, inc_half, incident_axis)
-            plane_face = get_face_corners(ref_face_center, ref_axes, ref_half, normal_axis)
-
-            gizmos = (plane_face, incident_face)
-
-            points = sdf(gizmos, ref)
-            final_points = []
-
-            for p in points:
-                if len(p) > 0:
-                    final_points.append((Vector3.from_np(p), collision_normal * sign_inc, 0))
-            return final_points, gizmos
 
-            side_axes = [i for i in range(3) if i != normal_axis]
+            # --- Clip against the 4 side planes of the reference face ---
             planes = []
-            for i in side_axes:
+            for i in [i for i in range(3) if i != normal_axis]:
                 edge_dir = ref_axes[i]
-                plane_point = ref_face_center + edge_dir * ref_half[i]
-                planes.append((plane_point, -edge_dir))
-                plane_point = ref_face_center - edge_dir * ref_half[i]
-                planes.append((plane_point, edge_dir))
+                planes.append((ref_center + edge_dir * ref_half[i], -edge_dir))
+                planes.append((ref_center - edge_dir * ref_half[i], edge_dir))
             gizmos = (planes, incident_face)
             clipped = incident_face
             for point, normal in planes:
                 clipped = clip_polygon_against_plane(clipped, point, normal)
-                if not clipped:  # back
+                if not clipped:
                     return [], gizmos
 
-            # Filter points below the face
+            # Keep the points below the face, with how deep they are
             final_points = []
             for p in clipped:
-                depth_offset = -(p - ref_face_center).dot(ref_axes[normal_axis])
-                depth = min(penetration_depth, depth_offset)
-                # depth = penetration_depth
+                depth = (ref_face_center - p).dot(n_ref)
                 if depth >= 0:
-                    final_points.append((p, my_normal, depth))
-
+                    final_points.append((p, depth))
             return final_points, gizmos
 
         # def generate_edge_to_edge_contact(a_center, a_axes, a_half, b_center, b_axes, b_half, i, j, collision_axis,
@@ -671,129 +483,14 @@ class BoxCollider:
             ]
             return contact_points, gizmos
 
-        def get_axes(rotation: Quaternion):
-            R = rotation.to_matrix3()  # 3x3 numpy array
-
+        def get_axes(R):
+            # columns of the world-from-local rotation matrix
             right = Vector3(*R[:, 0]).normalized()
             up = Vector3(*R[:, 1]).normalized()
             forward = Vector3(*R[:, 2]).normalized()
 
             return [right, up, forward]
 
-        def project_box(center, axes, half_sizes, axis):
-            projection_center = center.dot(axis)
-            radius = sum(abs(axis.dot(a)) * h for a, h in zip(axes, half_sizes))
-            return projection_center - radius, projection_center + radius
-
-        def overlap_on_axis(proj1, proj2):
-            return not (proj1[1] < proj2[0] or proj2[1] < proj1[0])
-
-        def SAT():
-            def get_axes(rotation: Quaternion):
-                R = rotation.to_matrix3()  # 3x3 numpy array
-
-                right = Vector3(*R[:, 0]).normalized()
-                up = Vector3(*R[:, 1]).normalized()
-                forward = Vector3(*R[:, 2]).normalized()
-
-                return [right, up, forward]
-
-            def project_box(center, axes, half_sizes, axis):
-                projection_center = center.dot(axis)
-                radius = sum(abs(axis.dot(a)) * h for a, h in zip(axes, half_sizes))
-                return projection_center - radius, projection_center + radius
-
-            def overlap_on_axis(proj1, proj2):
-                return not (proj1[1] < proj2[0] or proj2[1] < proj1[0])
-
-            # --- SAT Collision Detection ---
-
-            a_center = self.obj.position
-            b_center = other_collider.obj.position
-
-            a_axes = get_axes(self.obj.quaternion.conjugate())
-            b_axes = get_axes(other_collider.obj.quaternion.conjugate())
-
-            a_half = self.obj.size * 0.5
-            b_half = other_collider.obj.size * 0.5
-
-            a_half_sizes = [a_half.x, a_half.y, a_half.z]
-            b_half_sizes = [b_half.x, b_half.y, b_half.z]
-
-            axes_to_test = []
-
-            # Add 3 axes of A
-            for i in range(3):
-                axes_to_test.append(("a", i, a_axes[i]))
-
-            # Add 3 axes of B
-            for i in range(3):
-                axes_to_test.append(("b", i, b_axes[i]))
-            #
-            # # Add 9 cross-product axes
-            # # Add 9 cross-product axes
-            # for i in range(3):
-            #     for j in range(3):
-            #         cross = a_axes[i].cross(b_axes[j])
-            #         if cross.magnitude() > 1e-6:
-            #             axis = cross.normalized()
-            #
-            #             # Check if this axis is nearly parallel to an existing axis
-            #             is_unique = True
-            #             for _, _, existing in axes_to_test:
-            #                 if abs(existing.dot(axis)) > 1 - 1e-6:  # almost parallel
-            #                     is_unique = False
-            #                     break
-            #
-            #             if is_unique:
-            #                 axes_to_test.append(("edge", (i, j), axis))
-
-            smallest_overlap = float('inf')
-            collision_axis = None
-            for axis_info in axes_to_test:
-                source, indices, axis = axis_info
-                proj_a = project_box(a_center, a_axes, a_half_sizes, axis)
-                proj_b = project_box(b_center, b_axes, b_half_sizes, axis)
-
-                if not overlap_on_axis(proj_a, proj_b):
-                    return None  # Separating axis found
-
-                overlap = min(proj_a[1], proj_b[1]) - max(proj_a[0], proj_b[0])
-                if overlap < smallest_overlap:  # or (overlap == smallest_overlap and source != 'edge')
-                    smallest_overlap = overlap
-                    collision_axis = axis
-                    collision_type = source
-                    collision_axis_indices = indices
-                # elif abs(overlap - smallest_overlap) < 1e-6 and source != 'edge':
-                #     smallest_overlap = overlap
-                #     collision_axis = axis
-                #     collision_type = source
-                #     collision_axis_indices = indices
-            return collision_axis, collision_type, collision_axis_indices
-
-        result = SAT()
-        if result is None:
-            return None
-        collision_axis, collision_type, collision_axis_indices = result
-        hits = set()
-        ver = other_collider.vertices()
-        for i in range(len(ver)):
-            vector = ver[(i + 1) % 8] - ver[i]
-            norm = np.linalg.norm(vector)
-            hit = self.Raycast(ver[i], vector / norm, maxDistance=norm)
-            if hit.point is not None:
-                hits.add((tuple(hit.point), -collision_axis, 0))
-        ver = self.vertices()
-        for i in range(len(ver)):
-            vector = ver[(i + 1) % 8] - ver[i]
-            norm = np.linalg.norm(vector)
-            hit = other_collider.Raycast(ver[i], vector / norm, maxDistance=norm)
-            if hit.point is not None:
-                hits.add((tuple(hit.point), -collision_axis, 0))
-        # if hits == set():
-        #     return None
-        contact_points = list(hits)
-
         def average_contact_data(contact_points):
             if not contact_points:
                 return None  # or raise Exception
@@ -813,6 +510,47 @@ class BoxCollider:
             avg_d = total_d / count
 
             return avg_p, avg_n, avg_d
+
+        a_center = self.obj.position
+        b_center = other_collider.obj.position
+        if separation is None:
+            boxes = (self.obj, other_collider.obj)
+            hit, axis, depth, feature = box_sat_batch(
+                np.array([obj.world_transform.position for obj in boxes]),
+                np.array([obj.world_transform.rotation for obj in boxes]),
+                np.array([obj.size.to_tuple() for obj in boxes], dtype=float) * 0.5,
+                [(0, 1)])
+            if len(hit) == 0:
+                return None  # Separating axis found
+            axis, depth, feature = Vector3.from_np(axis[0]), float(depth[0]), int(feature[0])
+        else:
+            axis, depth, feature = separation
+
+        if method == "raycast":
+            contact_points = self.raycast_contacts(other_collider, axis, depth)
+        else:
+            a_axes = get_axes(self.obj.world_transform.rotation)
+            b_axes = get_axes(other_collider.obj.world_transform.rotation)
+            a_half = self.obj.size * 0.5
+            b_half = other_collider.obj.size * 0.5
+            a_half = [a_half.x, a_half.y, a_half.z]
+            b_half = [b_half.x, b_half.y, b_half.z]
+            if feature < 3:  # face of self, pushing towards other
+                points, _ = generate_face_to_face_contact(a_center, a_axes, a_half, b_center, b_axes, b_half,
+                                                          feature, -axis)
+            elif feature < 6:  # face of other
+                points, _ = generate_face_to_face_contact(b_center, b_axes, b_half, a_center, a_axes, a_half,
+                                                          feature - 3, axis)
+            else:
+                edges = divmod(feature - 6, 3)
+                edge_points, _ = generate_edge_to_edge_contact(a_center, a_axes, a_half, b_center, b_axes, b_half,
+                                                               edges, axis, depth)
+                points = [(p, d) for p, _, d in edge_points]
+            contact_points = [(p.to_tuple(), axis, d) for p, d in points]
+        if len(contact_points) > max_points:
+            keep = reduce_manifold([p for p, _, _ in contact_points], [d for _, _, d in contact_points],
+                                   axis.to_tuple(), max_points)
+            contact_points = [contact_points[k] for k in keep]
         if single_point:
             contact_points = average_contact_data(contact_points)
         if contact_points is None or contact_points == []:
@@ -835,6 +573,25 @@ class BoxCollider:
 
         return contact_points
 
+    def raycast_contacts(self, other_collider, normal, depth):
+        """Contacts where the edges of either box pierce the other, all with the SAT depth."""
+        hits = set()
+        ver = other_collider.vertices()
+        for i in range(len(ver)):
+            vector = ver[(i + 1) % 8] - ver[i]
+            norm = np.linalg.norm(vector)
+            hit = self.Raycast(ver[i], vector / norm, maxDistance=norm)
+            if hit.point is not None:
+                hits.add((tuple(hit.point), normal, depth))
+        ver = self.vertices()
+        for i in range(len(ver)):
+            vector = ver[(i + 1) % 8] - ver[i]
+            norm = np.linalg.norm(vector)
+            hit = other_collider.Raycast(ver[i], vector / norm, maxDistance=norm)
+            if hit.point is not None:
+                hits.add((tuple(hit.point), normal, depth))
+        return list(hits)
+
     def attach(self, owner_object):
         if self.size == None:
             self.size = owner_object.size
@@ -843,4 +600,61 @@ class BoxCollider:
             self.rotation = owner_object.rotation
 
         self.obj = owner_object
-        return "collider"
\ No newline at end of file
+        return "collider"
+
+
+# face axes are preferred unless an edge axis is clearly shallower
+EDGE_TOLERANCE = 0.95
+EDGE_SLACK = 0.005
+
+
+def box_sat_batch(centers, rotations, halves, pairs):
+    """
+    Separating axis test (3 + 3 face axes, 9 edge cross products) for many
+    pairs of oriented boxes at once.
+
+    centers (N, 3), rotations (N, 3, 3) world-from-local (columns are the box
+    axes), halves (N, 3) half extents, pairs (P, 2) indices into them.
+    Returns (hit, axis, depth, feature) for the overlapping pairs: hit indexes
+    `pairs`, axis is the unit axis of least penetration pointing from the
+    second box to the first, feature is 0-2 for a face of the first box, 3-5
+    for a face of the second and 6 + 3 * i + j for edge i of the first crossed
+    with edge j of the second.
+    """
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    P = len(pairs)
+    if P == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 3)), np.zeros(0), np.zeros(0, dtype=np.int64)
+    a, b = pairs[:, 0], pairs[:, 1]
+    Ra, Rb = rotations[a], rotations[b]
+    ha, hb = halves[a], halves[b]
+    d = centers[a] - centers[b]
+
+    axes_a = Ra.transpose(0, 2, 1)  # rows are the axes
+    axes_b = Rb.transpose(0, 2, 1)
+    edges = np.cross(axes_a[:, :, None, :], axes_b[:, None, :, :]).reshape(P, 9, 3)
+    length = np.linalg.norm(edges, axis=2)
+    parallel = length < 1e-6
+    edges /= np.where(parallel, 1.0, length)[:, :, None]
+    L = np.concatenate([axes_a, axes_b, edges], axis=1)  # (P, 15, 3)
+
+    ra = (np.abs(L @ Ra) * ha[:, None, :]).sum(axis=2)
+    rb = (np.abs(L @ Rb) * hb[:, None, :]).sum(axis=2)
+    dist = np.einsum("pkx,px->pk", L, d)
+    overlap = ra + rb - np.abs(dist)
+    overlap[:, 6:][parallel] = np.inf  # parallel edges give no axis
+
+    rows = np.arange(P)
+    face = overlap[:, :6].argmin(axis=1)
+    edge = overlap[:, 6:].argmin(axis=1) + 6
+    face_depth = overlap[rows, face]
+    edge_depth = overlap[rows, edge]
+    use_edge = edge_depth < EDGE_TOLERANCE * face_depth - EDGE_SLACK
+    feature = np.where(use_edge, edge, face)
+    depth = np.where(use_edge, edge_depth, face_depth)
+
+    hit = np.flatnonzero((overlap >= 0).all(axis=1))
+    feature = feature[hit]
+    axis = L[hit, feature]
+    axis *= np.where(dist[hit, feature] < 0, -1.0, 1.0)[:, None]
+    return hit, axis, depth[hit], feature
@@ -0,0 +1,690 @@
+import itertools
+import math
+
+import numpy as np
+
+
+class Broadphase:
+    """
+    Base class for broadphase backends.
+
+    A broadphase gets the world AABB of every physics object each tick and
+    returns the index pairs (i, j), i < j, whose boxes overlap. Only those
+    pairs are handed to the narrowphase.
+    """
+
+    def __init__(self):
+        self.candidate_pairs = 0  # pairs that survived the broadphase last tick
+        self.total_pairs = 0  # pairs an all-pairs loop would have tested
+        self._keys = []
+        self._mins = np.empty((0, 3))
+        self._maxs = np.empty((0, 3))
+
+    def empty(self):
+        """A new broadphase of the same kind and settings, holding nothing (see World.fork)."""
+        return type(self)()
+
+    def update(self, keys, mins, maxs, static=None):
+        """
+        keys:   one hashable per object (used to keep state between ticks)
+        mins:   (N, 3) array of AABB minimum corners
+        maxs:   (N, 3) array of AABB maximum corners
+        static: optional sequence of N bools, pairs of two static objects are skipped
+        Returns a sorted list of (i, j) index pairs with i < j.
+        """
+        raise NotImplementedError
+
+    def query_aabb(self, lo, hi):
+        """Keys whose bounds (as of the last update) overlap the box lo..hi."""
+        lo, hi = np.asarray(lo, dtype=float), np.asarray(hi, dtype=float)
+        hit = np.all(self._mins <= hi, axis=1) & np.all(self._maxs >= lo, axis=1)
+        return [self._keys[i] for i in np.flatnonzero(hit)]
+
+    def query_ray(self, origin, direction, max_distance=float('inf')):
+        """
+        (distance, key) for every object whose bounds the ray enters within
+        max_distance, nearest first. `direction` is expected to be normalized.
+        """
+        if not self._keys:
+            return []
+        t = _ray_aabb_batch(np.asarray(origin, dtype=float), np.asarray(direction, dtype=float),
+                            self._mins, self._maxs, max_distance)
+        hits = np.flatnonzero(np.isfinite(t))
+        hits = hits[np.argsort(t[hits], kind="stable")]
+        return [(float(t[i]), self._keys[i]) for i in hits]
+
+    def _finish(self, keys, mins, maxs, pairs):
+        n = len(keys)
+        self._keys = list(keys)
+        self._mins = mins
+        self._maxs = maxs
+        self.total_pairs = n * (n - 1) // 2
+        self.candidate_pairs = len(pairs)
+
+    @property
+    def pruned_pairs(self):
+        return self.total_pairs - self.candidate_pairs
+
+
+class AllPairs(Broadphase):
+    """Reference backend: tests the AABBs of every i < j pair."""
+
+    def update(self, keys, mins, maxs, static=None):
+        n = len(keys)
+        static = np.zeros(n, dtype=bool) if static is None else np.asarray(static, dtype=bool)
+        pairs = []
+        for i in range(n - 1):
+            hit = np.all(mins[i + 1:] <= maxs[i], axis=1) & np.all(maxs[i + 1:] >= mins[i], axis=1)
+            if static[i]:
+                hit &= ~static[i + 1:]
+            pairs.extend((i, int(j) + i + 1) for j in np.flatnonzero(hit))
+        self._finish(keys, mins, maxs, pairs)
+        return pairs
+
+
+class SweepAndPrune(Broadphase):
+    """
+    Sort-and-sweep along one axis. The sorted order is kept between ticks, so
+    the insertion sort only has to fix the few objects that moved past a
+    neighbour since the last tick.
+    """
+
+    def __init__(self, axis=0):
+        super().__init__()
+        self.axis = axis
+        self._order = []  # keys sorted by AABB min along self.axis
+
+    def empty(self):
+        return SweepAndPrune(self.axis)
+
+    def update(self, keys, mins, maxs, static=None):
+        n = len(keys)
+        index = {key: i for i, key in enumerate(keys)}
+
+        # drop objects that left the world, append new ones at the end
+        order = [index[key] for key in self._order if key in index]
+        if len(order) != n:
+            known = set(order)
+            order.extend(i for i in range(n) if i not in known)
+
+        lo = mins[:, self.axis].tolist()
+        hi = maxs[:, self.axis].tolist()
+
+        # insertion sort, close to O(n) on the nearly sorted order from last tick
+        for a in range(1, n):
+            current = order[a]
+            value = lo[current]
+            b = a - 1
+            while b >= 0 and lo[order[b]] > value:
+                order[b + 1] = order[b]
+                b -= 1
+            order[b + 1] = current
+        self._order = [keys[i] for i in order]
+
+        other_axes = [k for k in range(3) if k != self.axis]
+        lo1, hi1 = mins[:, other_axes[0]].tolist(), maxs[:, other_axes[0]].tolist()
+        lo2, hi2 = mins[:, other_axes[1]].tolist(), maxs[:, other_axes[1]].tolist()
+        static = list(static) if static is not None else [False] * n
+
+        pairs = []
+        for a in range(n):
+            i = order[a]
+            end = hi[i]
+            for b in range(a + 1, n):
+                j = order[b]
+                if lo[j] > end:
+                    break  # everything after j starts even further along the axis
+                if static[i] and static[j]:
+                    continue
+                if lo1[i] > hi1[j] or lo1[j] > hi1[i]:
+                    continue
+                if lo2[i] > hi2[j] or lo2[j] > hi2[i]:
+                    continue
+                pairs.append((i, j) if i < j else (j, i))
+
+        pairs.sort()
+        self._finish(keys, mins, maxs, pairs)
+        return pairs
+
+
+class _Node:
+    __slots__ = ("lo", "hi", "parent", "child1", "child2", "height", "key", "index", "tree")
+
+    def __init__(self, lo, hi, key=None):
+        self.lo = lo
+        self.hi = hi
+        self.parent = None
+        self.child1 = None
+        self.child2 = None
+        self.height = 0
+        self.key = key
+        self.index = -1  # position of the leaf in the last update() call
+        self.tree = None
+
+
+def _union(lo1, hi1, lo2, hi2):
+    return ((min(lo1[0], lo2[0]), min(lo1[1], lo2[1]), min(lo1[2], lo2[2])),
+            (max(hi1[0], hi2[0]), max(hi1[1], hi2[1]), max(hi1[2], hi2[2])))
+
+
+def _area(lo, hi):
+    dx, dy, dz = hi[0] - lo[0], hi[1] - lo[1], hi[2] - lo[2]
+    return dx * dy + dy * dz + dz * dx
+
+
+def _overlaps(lo1, hi1, lo2, hi2):
+    return not (lo1[0] > hi2[0] or lo2[0] > hi1[0] or
+                lo1[1] > hi2[1] or lo2[1] > hi1[1] or
+                lo1[2] > hi2[2] or lo2[2] > hi1[2])
+
+
+def _contains(lo1, hi1, lo2, hi2):
+    """True if box 2 lies inside box 1."""
+    return (lo1[0] <= lo2[0] and lo1[1] <= lo2[1] and lo1[2] <= lo2[2] and
+            hi1[0] >= hi2[0] and hi1[1] >= hi2[1] and hi1[2] >= hi2[2])
+
+
+def _ray_aabb(origin, direction, lo, hi, max_distance):
+    """Slab test, returns the entry distance or None."""
+    t0, t1 = 0.0, max_distance
+    for k in range(3):
+        d = direction[k]
+        if d == 0.0:
+            if origin[k] < lo[k] or origin[k] > hi[k]:
+                return None
+            continue
+        ta = (lo[k] - origin[k]) / d
+        tb = (hi[k] - origin[k]) / d
+        if ta > tb:
+            ta, tb = tb, ta
+        if ta > t0:
+            t0 = ta
+        if tb < t1:
+            t1 = tb
+        if t0 > t1:
+            return None
+    return t0
+
+
+def _ray_aabb_batch(origin, direction, mins, maxs, max_distance):
+    """Vectorized slab test against N boxes, inf where the ray misses."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv = 1.0 / direction
+        ta = (mins - origin) * inv
+        tb = (maxs - origin) * inv
+    parallel = direction == 0.0
+    inside = (origin >= mins) & (origin <= maxs)
+    near = np.where(parallel, np.where(inside, -np.inf, np.inf), np.minimum(ta, tb))
+    far = np.where(parallel, np.where(inside, np.inf, -np.inf), np.maximum(ta, tb))
+    t_enter = np.maximum(near.max(axis=1), 0.0)
+    t_exit = np.minimum(far.min(axis=1), max_distance)
+    return np.where(t_enter <= t_exit, t_enter, np.inf)
+
+
+class _Tree:
+    """Dynamic AABB tree (incremental insert/remove with AVL style rotations)."""
+
+    def __init__(self):
+        self.root = None
+
+    def insert(self, leaf):
+        leaf.tree = self
+        if self.root is None:
+            self.root = leaf
+            leaf.parent = None
+            return
+
+        # find the cheapest sibling using the surface area heuristic
+        lo, hi = leaf.lo, leaf.hi
+        node = self.root
+        while node.child1 is not None:
+            area = _area(node.lo, node.hi)
+            combined = _area(*_union(node.lo, node.hi, lo, hi))
+            cost = 2.0 * combined
+            inheritance = 2.0 * (combined - area)
+            cost1 = self._descend_cost(node.child1, lo, hi) + inheritance
+            cost2 = self._descend_cost(node.child2, lo, hi) + inheritance
+            if cost < cost1 and cost < cost2:
+                break
+            node = node.child1 if cost1 < cost2 else node.child2
+
+        sibling = node
+        old_parent = sibling.parent
+        parent = _Node(*_union(sibling.lo, sibling.hi, lo, hi))
+        parent.tree = self
+        parent.parent = old_parent
+        parent.height = sibling.height + 1
+        if old_parent is None:
+            self.root = parent
+        elif old_parent.child1 is sibling:
+            old_parent.child1 = parent
+        else:
+            old_parent.child2 = parent
+        parent.child1 = sibling
+        parent.child2 = leaf
+        sibling.parent = parent
+        leaf.parent = parent
+        self._refit(parent)
+
+    def remove(self, leaf):
+        leaf.tree = None
+        if leaf is self.root:
+            self.root = None
+            return
+        parent = leaf.parent
+        grand = parent.parent
+        sibling = parent.child2 if parent.child1 is leaf else parent.child1
+        leaf.parent = None
+        if grand is None:
+            self.root = sibling
+            sibling.parent = None
+            return
+        if grand.child1 is parent:
+            grand.child1 = sibling
+        else:
+            grand.child2 = sibling
+        sibling.parent = grand
+        self._refit(grand)
+
+    def query(self, lo, hi, out):
+        """Append every leaf whose box overlaps lo..hi to out."""
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            if not _overlaps(node.lo, node.hi, lo, hi):
+                continue
+            if node.child1 is None:
+                out.append(node)
+            else:
+                stack.append(node.child1)
+                stack.append(node.child2)
+        return out
+
+    def ray(self, origin, direction, max_distance, out):
+        """Append (distance, leaf) for every leaf box the ray enters."""
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            t = _ray_aabb(origin, direction, node.lo, node.hi, max_distance)
+            if t is None:
+                continue
+            if node.child1 is None:
+                out.append((t, node))
+            else:
+                stack.append(node.child1)
+                stack.append(node.child2)
+        return out
+
+    @staticmethod
+    def _descend_cost(child, lo, hi):
+        combined = _area(*_union(child.lo, child.hi, lo, hi))
+        if child.child1 is None:
+            return combined
+        return combined - _area(child.lo, child.hi)
+
+    def _refit(self, node):
+        # walk back to the root fixing heights and bounds
+        while node is not None:
+            node = self._balance(node)
+            c1, c2 = node.child1, node.child2
+            node.height = 1 + max(c1.height, c2.height)
+            node.lo, node.hi = _union(c1.lo, c1.hi, c2.lo, c2.hi)
+            node = node.parent
+
+    def _replace_child(self, parent, old, new):
+        if parent is None:
+            self.root = new
+        elif parent.child1 is old:
+            parent.child1 = new
+        else:
+            parent.child2 = new
+
+    def _balance(self, a):
+        if a.child1 is None or a.height < 2:
+            return a
+        b, c = a.child1, a.child2
+        balance = c.height - b.height
+
+        if balance > 1:
+            # rotate c up
+            f, g = c.child1, c.child2
+            c.child1 = a
+            c.parent = a.parent
+            a.parent = c
+            self._replace_child(c.parent, a, c)
+            if f.height > g.height:
+                c.child2, a.child2, g.parent = f, g, a
+                a.lo, a.hi = _union(b.lo, b.hi, g.lo, g.hi)
+                c.lo, c.hi = _union(a.lo, a.hi, f.lo, f.hi)
+                a.height = 1 + max(b.height, g.height)
+                c.height = 1 + max(a.height, f.height)
+            else:
+                c.child2, a.child2, f.parent = g, f, a
+                a.lo, a.hi = _union(b.lo, b.hi, f.lo, f.hi)
+                c.lo, c.hi = _union(a.lo, a.hi, g.lo, g.hi)
+                a.height = 1 + max(b.height, f.height)
+                c.height = 1 + max(a.height, g.height)
+            return c
+
+        if balance < -1:
+            # rotate b up
+            d, e = b.child1, b.child2
+            b.child1 = a
+            b.parent = a.parent
+            a.parent = b
+            self._replace_child(b.parent, a, b)
+            if d.height > e.height:
+                b.child2, a.child1, e.parent = d, e, a
+                a.lo, a.hi = _union(c.lo, c.hi, e.lo, e.hi)
+                b.lo, b.hi = _union(a.lo, a.hi, d.lo, d.hi)
+                a.height = 1 + max(c.height, e.height)
+                b.height = 1 + max(a.height, d.height)
+            else:
+                b.child2, a.child1, d.parent = e, d, a
+                a.lo, a.hi = _union(c.lo, c.hi, d.lo, d.hi)
+                b.lo, b.hi = _union(a.lo, a.hi, e.lo, e.hi)
+                a.height = 1 + max(c.height, d.height)
+                b.height = 1 + max(a.height, e.height)
+            return b
+
+        return a
+
+
+_HUGE = 1e30
+
+
+def _fatten(lo, hi, margin):
+    return (tuple(max(v - margin, -_HUGE) for v in lo),
+            tuple(min(v + margin, _HUGE) for v in hi))
+
+
+class DynamicAABBTree(Broadphase):
+    """
+    Bounding volume hierarchy broadphase.
+
+    Leaves store AABBs fattened by `margin`, so an object is only removed and
+    reinserted once it leaves its fat box. Static (kinematic) objects live in
+    their own tree which almost never changes. The pairs whose fat boxes
+    overlap are kept between ticks: only leaves that were reinserted query
+    the trees again, and each tick the kept pairs are re-tested against the
+    tight boxes in one vectorized pass. A scene where bodies settle in place
+    therefore costs about one fat-box check per body per tick. The same trees
+    answer query_aabb/query_ray.
+    """
+
+    def __init__(self, margin=0.1):
+        super().__init__()
+        self.margin = margin
+        self.dynamic = _Tree()
+        self.static = _Tree()
+        self.reinserted = 0  # leaves that left their fat box last tick
+        self._leaves = {}
+        self._near = {}  # key -> keys of the leaves its fat box overlaps (never two static ones)
+        self._moved = []  # leaves (re)inserted by the last _refit_leaves
+        self._pair_index = None  # (i, j) arrays of the fat pairs, i < j, valid until a leaf moves
+
+    def empty(self):
+        return DynamicAABBTree(self.margin)
+
+    def update(self, keys, mins, maxs, static=None):
+        n = len(keys)
+        static = list(static) if static is not None else [False] * n
+        if self._keys != list(keys):
+            self._pair_index = None  # indices moved
+        self._refit_leaves(keys, mins, maxs, static)
+
+        near = self._near
+        if self._moved:
+            self._pair_index = None
+        found = []
+        for leaf in self._moved:
+            found.clear()
+            self.dynamic.query(leaf.lo, leaf.hi, found)
+            if leaf.tree is self.dynamic:
+                self.static.query(leaf.lo, leaf.hi, found)
+            for other in near.pop(leaf.key, ()):
+                near[other].discard(leaf.key)
+            mine = near[leaf.key] = set()
+            for other in found:
+                if other is not leaf:
+                    mine.add(other.key)
+                    near.setdefault(other.key, set()).add(leaf.key)
+
+        if self._pair_index is None:
+            leaves = self._leaves
+            first, second = [], []
+            for key, others in near.items():
+                i = leaves[key].index
+                for other in others:
+                    j = leaves[other].index
+                    if i < j:
+                        first.append(i)
+                        second.append(j)
+            first, second = np.array(first, dtype=np.int64), np.array(second, dtype=np.int64)
+            order = np.lexsort((second, first))
+            self._pair_index = (first[order], second[order])
+
+        # the kept fat pairs, re-tested against this tick's tight boxes
+        first, second = self._pair_index
+        lo1, hi1, lo2, hi2 = mins[first], maxs[first], mins[second], maxs[second]
+        hit = (lo1[:, 0] <= hi2[:, 0]) & (lo2[:, 0] <= hi1[:, 0]) & (lo1[:, 1] <= hi2[:, 1]) & \
+              (lo2[:, 1] <= hi1[:, 1]) & (lo1[:, 2] <= hi2[:, 2]) & (lo2[:, 2] <= hi1[:, 2])
+        pairs = list(zip(first[hit].tolist(), second[hit].tolist()))
+        self._finish(keys, mins, maxs, pairs)
+        return pairs
+
+    def refit(self, keys, mins, maxs, static=None):
+        """Like update() for a tree that only answers queries: moves the leaves, finds no pairs."""
+        static = list(static) if static is not None else [False] * len(keys)
+        self._refit_leaves(keys, mins, maxs, static)
+        self._finish(keys, mins, maxs, [])
+
+    def _refit_leaves(self, keys, mins, maxs, static):
+        lo_list = [tuple(row) for row in mins.tolist()]
+        hi_list = [tuple(row) for row in maxs.tolist()]
+
+        alive = set(keys)
+        for key in [key for key in self._leaves if key not in alive]:
+            leaf = self._leaves.pop(key)
+            leaf.tree.remove(leaf)
+            for other in self._near.pop(key, ()):
+                self._near[other].discard(key)
+            self._pair_index = None
+
+        self.reinserted = 0
+        self._moved = []
+        for i, key in enumerate(keys):
+            lo, hi = lo_list[i], hi_list[i]
+            tree = self.static if static[i] else self.dynamic
+            leaf = self._leaves.get(key)
+            if leaf is None:
+                leaf = _Node(lo, hi, key)
+                self._leaves[key] = leaf
+            elif leaf.tree is tree and _contains(leaf.lo, leaf.hi, lo, hi):
+                leaf.index = i
+                continue
+            else:
+                leaf.tree.remove(leaf)
+                self.reinserted += 1
+            leaf.lo, leaf.hi = _fatten(lo, hi, self.margin)
+            leaf.index = i
+            tree.insert(leaf)
+            self._moved.append(leaf)
+        return lo_list, hi_list
+
+    def query_aabb(self, lo, hi):
+        lo, hi = tuple(float(v) for v in lo), tuple(float(v) for v in hi)
+        found = self.static.query(lo, hi, self.dynamic.query(lo, hi, []))
+        mins, maxs = self._mins, self._maxs
+        return [leaf.key for leaf in found
+                if _overlaps(lo, hi, mins[leaf.index], maxs[leaf.index])]
+
+    def query_ray(self, origin, direction, max_distance=float('inf')):
+        origin = tuple(float(v) for v in origin)
+        direction = tuple(float(v) for v in direction)
+        found = self.static.ray(origin, direction, max_distance,
+                                self.dynamic.ray(origin, direction, max_distance, []))
+        hits = []
+        for _, leaf in found:
+            # the tree holds fat boxes, re-test against the tight one
+            t = _ray_aabb(origin, direction, self._mins[leaf.index], self._maxs[leaf.index], max_distance)
+            if t is not None:
+                hits.append((t, leaf.index, leaf.key))
+        hits.sort(key=lambda hit: (hit[0], hit[1]))
+        return [(t, key) for t, _, key in hits]
+
+
+class SpatialHashGrid(Broadphase):
+    """
+    Uniform grid hashed by integer cell coordinates, best for many bodies of
+    about the same size. An object is inserted in every cell its AABB touches,
+    so large objects (floors) live in many cells. Static objects are kept in
+    their own cell map and only re-hashed when their bounds change; objects
+    covering more than `max_cells` cells are tested against everything.
+    """
+
+    def __init__(self, cell_size=1.0, max_cells=1 << 16):
+        super().__init__()
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        self._static_cells = {}  # cell -> [key, ...]
+        self._static_bounds = {}  # key -> (lo, hi, cells or None when oversized)
+        self._static_oversized = set()
+
+    def empty(self):
+        return SpatialHashGrid(self.cell_size, self.max_cells)
+
+    def _cells(self, lo, hi):
+        inv = 1.0 / self.cell_size
+        try:
+            x0, y0, z0 = math.floor(lo[0] * inv), math.floor(lo[1] * inv), math.floor(lo[2] * inv)
+            x1, y1, z1 = math.floor(hi[0] * inv), math.floor(hi[1] * inv), math.floor(hi[2] * inv)
+        except (OverflowError, ValueError):
+            return None  # infinite or nan bounds
+        if (x1 - x0 + 1) * (y1 - y0 + 1) * (z1 - z0 + 1) > self.max_cells:
+            return None
+        return itertools.product(range(x0, x1 + 1), range(y0, y1 + 1), range(z0, z1 + 1))
+
+    def _unhash_static(self, key):
+        lo, hi, cells = self._static_bounds.pop(key)
+        if cells is None:
+            self._static_oversized.discard(key)
+            return
+        for cell in cells:
+            bucket = self._static_cells[cell]
+            bucket.remove(key)
+            if not bucket:
+                del self._static_cells[cell]
+
+    def _hash_static(self, key, lo, hi):
+        cells = self._cells(lo, hi)
+        if cells is None:
+            self._static_bounds[key] = (lo, hi, None)
+            self._static_oversized.add(key)
+            return
+        cells = list(cells)
+        self._static_bounds[key] = (lo, hi, cells)
+        for cell in cells:
+            self._static_cells.setdefault(cell, []).append(key)
+
+    def update(self, keys, mins, maxs, static=None):
+        n = len(keys)
+        static = list(static) if static is not None else [False] * n
+        lo_list = [tuple(row) for row in mins.tolist()]
+        hi_list = [tuple(row) for row in maxs.tolist()]
+        index = {key: i for i, key in enumerate(keys)}
+
+        # keep the static map in sync, re-hashing only objects that changed
+        for key in [key for key in self._static_bounds if key not in index or not static[index[key]]]:
+            self._unhash_static(key)
+        for i, key in enumerate(keys):
+            if not static[i]:
+                continue
+            known = self._static_bounds.get(key)
+            if known is not None and known[0] == lo_list[i] and known[1] == hi_list[i]:
+                continue
+            if known is not None:
+                self._unhash_static(key)
+            self._hash_static(key, lo_list[i], hi_list[i])
+        static_oversized = list(self._static_oversized)
+
+        pairs = []
+        cells_map = {}
+        oversized = []
+        static_cells = self._static_cells
+        for i in range(n):
+            if static[i]:
+                continue
+            lo, hi = lo_list[i], hi_list[i]
+            cells = self._cells(lo, hi)
+            if cells is None:
+                oversized.append(i)
+                continue
+            near = set()
+            near_static = set(static_oversized)
+            for cell in cells:
+                bucket = cells_map.get(cell)
+                if bucket is None:
+                    cells_map[cell] = [i]
+                else:
+                    near.update(bucket)
+                    bucket.append(i)
+                bucket = static_cells.get(cell)
+                if bucket:
+                    near_static.update(bucket)
+            near.update(index[key] for key in near_static)
+            for j in near:
+                if _overlaps(lo, hi, lo_list[j], hi_list[j]):
+                    pairs.append((j, i) if j < i else (i, j))
+
+        if oversized:
+            # objects too big to hash are checked against everything
+            found = set(pairs)
+            for i in oversized:
+                for j in range(n):
+                    if j != i and not (static[j] and static[i]) and \
+                            _overlaps(lo_list[i], hi_list[i], lo_list[j], hi_list[j]):
+                        found.add((i, j) if i < j else (j, i))
+            pairs = list(found)
+
+        pairs.sort()
+        self._finish(keys, mins, maxs, pairs)
+        return pairs
+
+
+BROADPHASES = {
+    "sap": SweepAndPrune,
+    "bvh": DynamicAABBTree,
+    "grid": SpatialHashGrid,
+    "all": AllPairs,
+}
+
+
+def make_broadphase(kind="sap", **options):
+    """
+    Build a broadphase from its name in BROADPHASES, or pass an instance
+    through. Extra options go to the backend, e.g. cell_size for "grid".
+    """
+    if isinstance(kind, Broadphase):
+        return kind
+    backend = BROADPHASES.get(kind)
+    if backend is None:
+        raise ValueError(f"No broadphase found for name: {kind}")
+    return backend(**options)
+
+
+def collect_bounds(objects):
+    """
+    World AABBs of `objects` as two (N, 3) arrays. Objects whose collider
+    can't report bounds get an infinite box so they are never pruned.
+    """
+    mins = np.empty((len(objects), 3))
+    maxs = np.empty((len(objects), 3))
+    for i, obj in enumerate(objects):
+        collider = obj.get_component("collider")
+        if hasattr(collider, "aabb"):
+            mins[i], maxs[i] = collider.aabb()
+        else:
+            mins[i] = -np.inf
+            maxs[i] = np.inf
+    return mins, maxs
@@ -0,0 +1,173 @@
+import numpy as np
+
+
+def tangent_basis(normal):
+    """Two unit tangents orthogonal to `normal` (and to each other), stable for a given normal."""
+    n = np.asarray(normal, dtype=float)
+    helper = np.array([1.0, 0.0, 0.0]) if abs(n[0]) < 0.57735 else np.array([0.0, 1.0, 0.0])
+    t1 = np.cross(n, helper)
+    t1 /= np.linalg.norm(t1)
+    return t1, np.cross(n, t1)
+
+
+def reduce_manifold(points, depths, normal, count=4):
+    """
+    Indices of at most `count` contact points that keep the manifold's shape:
+    the deepest point, the point farthest from it, the point making the
+    largest triangle with those two, then the point lying farthest outside
+    that triangle. Past four, the point farthest from the ones kept is added.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    if len(points) <= count:
+        return list(range(len(points)))
+    if count <= 0:
+        return []
+    normal = np.asarray(normal, dtype=float)
+
+    keep = [int(np.argmax(depths))]
+    if count >= 2:
+        keep.append(int(np.argmax(np.linalg.norm(points - points[keep[0]], axis=1))))
+    if count >= 3:
+        a, b = points[keep[0]], points[keep[1]]
+        area = np.abs(np.cross(b - a, points - a) @ normal)
+        area[keep] = -1.0
+        keep.append(int(np.argmax(area)))
+    if count >= 4:
+        # signed area against each edge of the triangle, wound to be positive inside it
+        a, b, c = points[keep]
+        winding = 1.0 if np.dot(np.cross(b - a, c - a), normal) >= 0 else -1.0
+        outside = np.min([winding * (np.cross(q - p, points - p) @ normal)
+                          for p, q in ((a, b), (b, c), (c, a))], axis=0)
+        outside[keep] = np.inf
+        keep.append(int(np.argmin(outside)))
+    while len(keep) < count:
+        dist = np.min(np.linalg.norm(points[:, None, :] - points[keep][None, :, :], axis=2), axis=1)
+        keep.append(int(np.argmax(dist)))
+    return keep
+
+
+class ContactManifold:
+    """
+    Contact points between one pair of colliders. Kept by the World from one
+    tick to the next while the pair stays in contact, so the impulses the
+    solver accumulated for a point can warm start the same point next tick.
+    """
+
+    def __init__(self, rb1, rb2):
+        self.rb1 = rb1
+        self.rb2 = rb2
+        self.points = np.zeros((0, 3))   # world space
+        self.local = np.zeros((0, 3))    # same points in rb1's local frame, used to match ticks
+        self.normal = np.zeros(3)        # from rb2 towards rb1
+        self.depth = np.zeros(0)         # penetration per point
+        self.impulse = np.zeros((0, 3))  # accumulated normal, tangent1, tangent2 impulse per point
+
+    def __len__(self):
+        return len(self.points)
+
+    def update(self, points, normal, depth, position, rotation, tolerance):
+        """
+        Replace the points with this tick's ones. A new point inherits the
+        impulse of the old point closest to it (in rb1's frame) if it is within
+        `tolerance` and the normal has not turned away.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        local = (points - position) @ rotation
+        impulse = np.zeros((len(points), 3))
+        if len(self.local) and len(points) and np.dot(normal, self.normal) > 0.95:
+            dist = np.linalg.norm(local[:, None, :] - self.local[None, :, :], axis=2)
+            nearest = dist.argmin(axis=1)
+            close = dist[np.arange(len(points)), nearest] < tolerance
+            impulse[close] = self.impulse[nearest[close]]
+
+        self.points = points
+        self.local = local
+        self.normal = np.asarray(normal, dtype=float)
+        self.depth = np.asarray(depth, dtype=float).reshape(-1)
+        self.impulse = impulse
+
+
+class ContactBuffer:
+    """
+    Solver rows for all contact points of a tick, one row per point, as
+    parallel arrays. The World keeps one buffer for its whole life: clear()
+    only resets `count`, and the arrays double in size when they run out,
+    so a steady scene stops allocating after its first few ticks.
+
+    Between ticks it also holds every manifold point packed in one place,
+    which is what world snapshots copy.
+    """
+
+    FIELDS = {
+        "row1": ((), np.int64),       # body rows of the two sides
+        "row2": ((), np.int64),
+        "point": ((3,), float),       # world space
+        "local": ((3,), float),       # in row1's frame
+        "normal": ((3,), float),      # from row2 towards row1
+        "tangent1": ((3,), float),
+        "tangent2": ((3,), float),
+        "depth": ((), float),
+        "restitution": ((), float),
+        "mu": ((), float),
+        "bias": ((), float),          # target separating speed
+        "impulse": ((3,), float),     # accumulated normal, tangent1, tangent2
+    }
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.capacity = 0
+        self.slices = []  # (manifold, start, stop) in the order they were added
+        self._grow(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self, capacity):
+        for name, (shape, dtype) in self.FIELDS.items():
+            array = np.zeros((capacity,) + shape, dtype=dtype)
+            if self.count:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def clear(self):
+        self.count = 0
+        self.slices.clear()
+
+    def reserve(self, count):
+        """Make room for `count` rows (keeping the ones in use)."""
+        if count > self.capacity:
+            self._grow(max(count, 2 * self.capacity))
+
+    def add(self, manifold, row1, row2, restitution, mu):
+        """
+        Append the rows of one manifold. Its points, depths and warm start
+        impulses are copied in (the manifold keeps its own arrays to match
+        next tick's points against); store_impulses copies the solved
+        impulses back.
+        """
+        start = self.count
+        stop = start + len(manifold)
+        self.reserve(stop)
+        rows = slice(start, stop)
+        self.row1[rows] = row1
+        self.row2[rows] = row2
+        self.point[rows] = manifold.points
+        self.local[rows] = manifold.local
+        self.normal[rows] = manifold.normal
+        self.tangent1[rows], self.tangent2[rows] = tangent_basis(manifold.normal)
+        self.depth[rows] = manifold.depth
+        self.restitution[rows] = restitution
+        self.mu[rows] = mu
+        self.impulse[rows] = manifold.impulse
+        self.slices.append((manifold, start, stop))
+        self.count = stop
+
+    def view(self, name):
+        """The used part of one field."""
+        return getattr(self, name)[:self.count]
+
+    def store_impulses(self):
+        """Copy the solved impulses back to their manifolds for next tick's warm start."""
+        for manifold, start, stop in self.slices:
+            manifold.impulse[...] = self.impulse[start:stop]
@@ -3,13 +3,25 @@ import threading
 import time
 # from builtins import range
 
-from bereshit import Object, render, World,Vector3
+from bereshit import Object, World,Vector3
+from bereshit.Interpolation import TransformFrames
+from bereshit.Replay import Recorder
 
 
 # import old_render as render
 
 
-def run(scene,speed=1, gizmos=False, scriptRefreshRate=60,tick=1/60, Render=True, ForceRenderInitialize=True, gravity=Vector3(0,-9.8,0)):
+def run(scene,speed=1, gizmos=False, scriptRefreshRate=60,tick=1/60, Render=True, ForceRenderInitialize=True, gravity=Vector3(0,-9.8,0), broadphase="sap", cell_size=1.0, workers=0,
+        substeps=1, max_steps=5, record=None):
+    """
+    Build a World from `scene` and run it: scripts every `tick` seconds of
+    simulated time, physics `substeps` times per tick, `speed` times real
+    time. When a frame falls behind, at most `max_steps` ticks are run to
+    catch up and the rest of the backlog is dropped.
+
+    `record` is a file path to log every physics step and its inputs to,
+    for Replay.Replayer to re-run headless.
+    """
     if not Render:
         ForceRenderInitialize = False
 
@@ -23,40 +35,51 @@ def run(scene,speed=1, gizmos=False, scriptRefreshRate=60,tick=1/60, Render=True
     if gizmos:
         hit_points = [Object(size=(0.1,0.1,0.1),position=(100,100,100),children=[Object(size=(0.1,0.1,0.1),position=(100,100,100)) for i in range(8)]) for i in range(8)]
         gizmos_container = Object(size=(0,0,0),children=hit_points)
-        world = World(children=scene+[gizmos_container],gizmos=gizmos_container,gravity=gravity)
+        world = World(children=scene+[gizmos_container],gizmos=gizmos_container,gravity=gravity,broadphase=broadphase,cell_size=cell_size,workers=workers)
 
     else:
-        world = World(children=scene,gravity=gravity)
+        world = World(children=scene,gravity=gravity,broadphase=broadphase,cell_size=cell_size,workers=workers)
     async def main_logic(Initialize):
-        start_wall_time = time.time()
-        steps = 0
         # speed = 1  # real time slip
         # bereshit.dt = (10 / ((1 / dt) / 60) * speed)
         while not Initialize[0]:
             await asyncio.sleep(0.01)
         world.Start()
+        if record:
+            Recorder(record, world, dt / substeps)
+
+        # fixed timestep: wall clock time (times speed) piles up in the
+        # accumulator and is spent in whole ticks
+        substep = dt / substeps
+        previous = current = world.transform_snapshot()
+        last = time.perf_counter()
+        accumulator = 0.0
         while True:
-            steps += 1
-            simulated_time = steps * dt
-
-            if steps % scriptRefreshRate == 0:
-                world.update(dt, check=True,gizmos=gizmos)
-            else:
-                # Update simulation
-                world.update(dt,gizmos=gizmos)
-            # Compute when, in wall clock time, this simulated time should happen
-            # For double speed: simulated_time advances twice as fast as real time
-            target_wall_time = start_wall_time + (simulated_time / speed)
-            now = time.time()
-            sleep_time = target_wall_time - now
-
-            if sleep_time > 0:
-                await asyncio.sleep(sleep_time)
+            now = time.perf_counter()
+            accumulator += (now - last) * speed
+            last = now
+
+            steps = 0
+            while accumulator >= dt and steps < max_steps:
+                for k in range(substeps):
+                    world.update(substep, check=k == 0, gizmos=gizmos)  # scripts once per tick
+                accumulator -= dt
+                steps += 1
+                previous, current = current, world.transform_snapshot()
+            if accumulator >= dt:
+                accumulator %= dt  # too far behind to catch up, drop the backlog
+
+            # published for the renderer, which draws between previous and current
+            world.frames = TransformFrames(previous, current, accumulator, time.perf_counter(), dt, speed)
+
+            await asyncio.sleep(max(dt - accumulator, 0.0) / speed)
 
     def start_async_loop(Initialize=[True]):
         asyncio.run(main_logic(Initialize))
 
     if Render:
+        from bereshit import render  # only windowed runs need the renderer
+
         if ForceRenderInitialize:
             Initialize = [False]
 
@@ -1,3 +1,6 @@
+import copy
+
+
 class FixJoint:
     def __init__(self, other_object):
         """
@@ -21,8 +24,8 @@ class FixJoint:
             raise ValueError("can not joint a Kinematic body")
         self.local_offset = self.bodyB.parent.position - self.bodyA.parent.position
         self.anchor_world = self.bodyA.parent.position + self.local_offset
-        self.defaultA = self.bodyA.parent.quaternion
-        self.defaultB = self.bodyB.parent.quaternion
+        self.defaultA = copy.copy(self.bodyA.parent.quaternion)
+        self.defaultB = copy.copy(self.bodyB.parent.quaternion)
         return "joint"
 
     def solve(self, dt):
@@ -0,0 +1,51 @@
+import numpy as np
+
+from bereshit.BodyStore import quat_to_matrix
+
+
+class TransformFrames:
+    """
+    The last two stepped states of a World's renderables, published by the
+    logic loop after every frame of fixed steps. The render thread blends
+    them by how far the clock has got into the next step, so the picture
+    moves smoothly even when physics runs slower than the display.
+
+    `previous` and `current` are (index, positions, quaternions) snapshots
+    from World.transform_snapshot. A new instance is published each time, so
+    the renderer never sees a half-written one.
+    """
+
+    def __init__(self, previous, current, accumulator, published, step, speed=1.0):
+        index, positions, quaternions = current
+        if previous[0] is not index:  # the scene changed in between: nothing to blend from
+            previous = current
+        self.index = index  # object -> row
+        self.previous = previous
+        self.current = current
+        self.accumulator = accumulator  # simulated time not stepped yet when published
+        self.published = published  # perf_counter() at publish time
+        self.step = step
+        self.speed = speed
+
+    def alpha(self, now):
+        """How far from the previous state towards the current one to draw, 0..1."""
+        elapsed = self.accumulator + (now - self.published) * self.speed
+        return min(max(elapsed / self.step, 0.0), 1.0)
+
+    def blend(self, now):
+        """
+        Blended (positions, quaternions, rotation_T) for every row of
+        `index`, with rotation_T the transposed world-from-local matrix
+        the renderer's model matrix uses.
+        """
+        alpha = self.alpha(now)
+        _, p0, q0 = self.previous
+        _, p1, q1 = self.current
+        positions = p0 + (p1 - p0) * alpha
+
+        # nlerp along the short way round
+        q1 = np.where((np.einsum("ij,ij->i", q0, q1) < 0)[:, None], -q1, q1)
+        quaternions = q0 + (q1 - q0) * alpha
+        norm = np.linalg.norm(quaternions, axis=1, keepdims=True)
+        quaternions /= np.where(norm > 0, norm, 1.0)
+        return positions, quaternions, quat_to_matrix(quaternions)
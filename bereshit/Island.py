@@ -0,0 +1,246 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def island_labels(count, links, mask):
+    """
+    Union-find over `links` (pairs of body rows). Only rows where `mask` is
+    set take part, everything else (kinematic, sleeping) gets label -1 and
+    never joins two islands together.
+    """
+    parent = list(range(count))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in links:
+        if mask[a] and mask[b]:
+            parent[find(a)] = find(b)
+    labels = np.array([find(i) for i in range(count)], dtype=np.int64)
+    labels[~mask[:count]] = -1
+    return labels
+
+
+def build_islands(labels):
+    """List of body-row arrays, one per island."""
+    rows = np.flatnonzero(labels >= 0)
+    if len(rows) == 0:
+        return []
+    order = rows[np.argsort(labels[rows], kind="stable")]
+    cuts = np.flatnonzero(np.diff(labels[order])) + 1
+    return np.split(order, cuts)
+
+
+def contact_islands(labels, row1, row2):
+    """
+    Group contact indices by island, keeping each island's contacts in
+    their original order. A contact belongs to the island of its dynamic body.
+    """
+    owner = np.where(labels[row1] >= 0, labels[row1], labels[row2])
+    order = np.argsort(owner, kind="stable")
+    cuts = np.flatnonzero(np.diff(owner[order])) + 1
+    return np.split(order, cuts)
+
+
+def solve_contacts(order, row1, row2, normal, tangent1, tangent2, bias, mu, impulse,
+                   velocity, inv_mass, iterations=10, tolerance=1e-4):
+    """
+    Sequential impulse over the contacts in `order` (one island). Starts from
+    the accumulated impulses in `impulse` (normal, tangent1, tangent2 per
+    contact, carried over from last tick), applies them, then iterates until
+    no impulse changes by more than `tolerance` or `iterations` is reached.
+    `velocity` and `impulse` are updated in place. Returns the iterations run.
+    """
+    order = [int(i) for i in order]
+    if not order:
+        return 0
+
+    # island-local copies as plain floats; kinematic bodies have inv_mass 0 and act as still
+    v = {}
+    w = {}
+    pairs = []
+    for i in order:
+        a, b = int(row1[i]), int(row2[i])
+        for r in (a, b):
+            if r not in v:
+                w[r] = float(inv_mass[r])
+                v[r] = velocity[r].tolist() if w[r] > 0 else [0.0, 0.0, 0.0]
+        pairs.append((a, b))
+    n = normal[order].tolist()
+    t1 = tangent1[order].tolist()
+    t2 = tangent2[order].tolist()
+    target = bias[order].tolist()
+    friction = mu[order].tolist()
+    P = impulse[order].tolist()
+    k = [1.0 / (w[a] + w[b]) if w[a] + w[b] > 0 else 0.0 for a, b in pairs]
+
+    def apply(a, b, d, x, y, z):
+        wa, wb = w[a] * d, w[b] * d
+        va, vb = v[a], v[b]
+        va[0] += x * wa
+        va[1] += y * wa
+        va[2] += z * wa
+        vb[0] -= x * wb
+        vb[1] -= y * wb
+        vb[2] -= z * wb
+
+    # warm start
+    for c in range(len(pairs)):
+        a, b = pairs[c]
+        jn, j1, j2 = P[c]
+        nx, ny, nz = n[c]
+        ax, ay, az = t1[c]
+        bx, by, bz = t2[c]
+        apply(a, b, 1.0, nx * jn + ax * j1 + bx * j2, ny * jn + ay * j1 + by * j2, nz * jn + az * j1 + bz * j2)
+
+    used = 0
+    for used in range(1, iterations + 1):
+        change = 0.0
+        for c in range(len(pairs)):
+            if k[c] == 0.0:
+                continue
+            a, b = pairs[c]
+            va, vb = v[a], v[b]
+            accumulated = P[c]
+
+            # normal: push apart until the relative speed reaches the bias, never pull
+            nx, ny, nz = n[c]
+            vn = (va[0] - vb[0]) * nx + (va[1] - vb[1]) * ny + (va[2] - vb[2]) * nz
+            old = accumulated[0]
+            new = old + (target[c] - vn) * k[c]
+            if new < 0.0:
+                new = 0.0
+            d = new - old
+            if d:
+                accumulated[0] = new
+                apply(a, b, d, nx, ny, nz)
+                change = max(change, abs(d))
+
+            # Coulomb friction on both tangents, bounded by the normal impulse
+            limit = friction[c] * new
+            tx, ty, tz = t1[c]
+            vt = (va[0] - vb[0]) * tx + (va[1] - vb[1]) * ty + (va[2] - vb[2]) * tz
+            old = accumulated[1]
+            new_t = max(-limit, min(old - vt * k[c], limit))
+            d = new_t - old
+            if d:
+                accumulated[1] = new_t
+                apply(a, b, d, tx, ty, tz)
+                change = max(change, abs(d))
+
+            tx, ty, tz = t2[c]
+            vt = (va[0] - vb[0]) * tx + (va[1] - vb[1]) * ty + (va[2] - vb[2]) * tz
+            old = accumulated[2]
+            new_t = max(-limit, min(old - vt * k[c], limit))
+            d = new_t - old
+            if d:
+                accumulated[2] = new_t
+                apply(a, b, d, tx, ty, tz)
+                change = max(change, abs(d))
+        if change < tolerance:
+            break
+
+    for r, value in v.items():
+        if w[r] > 0:
+            velocity[r] = value
+    impulse[order] = P
+    return used
+
+
+# ---------------------------------------------------------------- worker pool
+
+_attached = {}  # worker side: shared memory name -> SharedMemory
+
+
+def _view(spec):
+    name, shape, dtype = spec
+    shm = _attached.get(name)
+    if shm is None:
+        shm = _attached[name] = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _solve_shared(specs, bounds, params):
+    arrays = {key: _view(spec) for key, spec in specs.items()}
+    order = arrays.pop("order")
+    return max(solve_contacts(order[start:stop], **arrays, **params) for start, stop in bounds)
+
+
+class IslandPool:
+    """
+    Solves islands on a pool of worker processes. Body and contact arrays are
+    copied into shared memory blocks (grown geometrically, reused between
+    ticks); workers get only block names and index ranges, update their
+    islands' rows in place, and the `outputs` are copied back.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._executor = None
+        self._blocks = {}  # key -> SharedMemory
+
+    def _share(self, key, array):
+        array = np.ascontiguousarray(array)
+        shm = self._blocks.get(key)
+        if shm is None or shm.size < array.nbytes:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            size = max(array.nbytes, 2 * shm.size if shm is not None else 4096)
+            shm = self._blocks[key] = shared_memory.SharedMemory(create=True, size=size)
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+        view[...] = array
+        return view, (shm.name, array.shape, array.dtype.str)
+
+    def solve(self, islands, arrays, outputs, **params):
+        """
+        Run solve_contacts for every island (an array of contact indices).
+        `arrays` holds its array arguments by name, `outputs` names the ones
+        written back. Returns the most iterations any island needed.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        # deal whole islands out to workers, biggest first, least loaded worker next
+        chunks = [[] for _ in range(self.workers)]
+        load = [0] * self.workers
+        for island in sorted(islands, key=len, reverse=True):
+            k = load.index(min(load))
+            chunks[k].append(island)
+            load[k] += len(island)
+
+        bounds = []
+        start = 0
+        for chunk in chunks:
+            ranges = []
+            for island in chunk:
+                ranges.append((start, start + len(island)))
+                start += len(island)
+            bounds.append(ranges)
+
+        specs = {}
+        views = {}
+        arrays = dict(arrays, order=np.concatenate([island for chunk in chunks for island in chunk]))
+        for key, array in arrays.items():
+            views[key], specs[key] = self._share(key, array)
+
+        futures = [self._executor.submit(_solve_shared, specs, ranges, params) for ranges in bounds if ranges]
+        used = max(future.result() for future in futures)
+
+        for key in outputs:
+            arrays[key][...] = views[key]
+        return used
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        for shm in self._blocks.values():
+            shm.close()
+            shm.unlink()
+        self._blocks = {}
@@ -22,10 +22,17 @@ class MeshRander:
     def attach(self, owner_object):
         return "Mesh"
 
+    @property
+    def ctx(self):
+        """GL context, created on first use so headless worlds never open one."""
+        if self._ctx is None:
+            self._ctx = moderngl.create_standalone_context()
+        return self._ctx
+
     def __init__(self, vertices=None, edges=None, shape=None, triangles=None, obj_path=None):
         self.shape = shape
         self.colors = None
-        self.ctx = moderngl.create_standalone_context()
+        self._ctx = None
         if obj_path:
             self.vertices, self.triangles, self.edges, self.colors, self.vertex_shader, self.fragment_shader = self.load_model(
                 obj_path)
@@ -4,6 +4,7 @@ import traceback
 
 import numpy as np
 
+from bereshit.BodyStore import StoreField, Transform, detached_state
 from bereshit.Material import Material
 from bereshit.MeshRander import MeshRander
 from bereshit.Quaternion import Quaternion
@@ -26,6 +27,15 @@ class Size(Vector3):
         super().__init__(x, y, z)
 
 class Object:
+    # moved into the World's BodyStore once the object is a physics body
+    position = StoreField("position")
+    quaternion = StoreField("quaternion", "quaternion")
+
+    # components a World.fork keeps; everything else (mesh, scripts, camera) is left out
+    PHYSICS_COMPONENTS = ("Rigidbody", "collider", "joint", "material")
+
+    # component methods the engine calls, looked up once per add/remove_component
+    CALLBACKS = ("Start", "Update", "OnCollisionEnter", "OnCollisionStay", "OnCollisionExit", "OnTriggerEnter")
 
     def _compute_quaternion(self):
         roll = math.radians(self.rotation.x)
@@ -46,6 +56,17 @@ class Object:
 
         return Quaternion(x, y, z, w)
 
+    @property
+    def world_transform(self):
+        """Cached world rotation matrix, its transpose and AABB (see Transform)."""
+        handle = self.__dict__.get("_body")
+        if handle is not None:
+            return handle.transform()
+        cache = self.__dict__.get("_transform")
+        if cache is None:
+            cache = self.__dict__["_transform"] = Transform()
+        return cache.update(self.position, self.quaternion, self.size)
+
     @property
     def local_position(self):
         if self.parent is None:
@@ -74,6 +95,11 @@ class Object:
     def __copy__(self):
         return Object(self.value)
 
+    def __getstate__(self):
+        state = detached_state(self)
+        state["registry"] = None
+        return state
+
     def __deepcopy__(self, memo):
         obj_copy = type(self)(
             position=copy.deepcopy(self.position, memo),
@@ -97,6 +123,7 @@ class Object:
             obj_copy.components[name] = comp_copy
             if hasattr(comp_copy, 'parent'):
                 comp_copy.parent = obj_copy
+        obj_copy._bind_callbacks()
         # Fix component references
         # for comp in obj_copy.components.values():
 
@@ -105,6 +132,53 @@ class Object:
 
         return obj_copy
 
+    def physics_clone(self, memo):
+        """
+        Copy of this subtree with only its PHYSICS_COMPONENTS, for World.fork.
+        Components are shallow copies; size, material and collider shape are
+        shared with the original, and bodies get their state from a copy of
+        the BodyStore (BodyStore.copy_for). No Object.__init__ runs, so no
+        MeshRander is built. `memo` maps id() of every original object and
+        component to its copy; call relink() on the copies once the whole
+        scene is cloned.
+        """
+        state = dict(self.__dict__)
+        state.pop("_transform", None)
+        if state.pop("_body", None) is None:
+            state = detached_state(self)
+        clone = type(self).__new__(type(self))
+        memo[id(self)] = clone
+        state["registry"] = None
+        state["rotation"] = copy.copy(self.rotation)
+        state["local_rotation"] = copy.copy(self.local_rotation)
+        components = {}
+        for name in self.PHYSICS_COMPONENTS:
+            component = self.components.get(name)
+            if component is None:
+                continue
+            if name != "material":
+                original, component = component, type(component).__new__(type(component))
+                component.__dict__.update(original.__dict__)
+                component.__dict__.pop("_body", None)  # store fields come with the fork's store
+                memo[id(original)] = component
+            components[name] = component
+        state["components"] = components
+        state["children"] = [child.physics_clone(memo) for child in self.children]
+        clone.__dict__.update(state)
+        for child in clone.children:
+            child.parent = clone
+        return clone
+
+    def relink(self, memo):
+        """Point this copy's references to other originals (parent, joint bodies...) at their copies."""
+        for owner in (self, *self.components.values()):
+            attributes = owner.__dict__
+            for key, value in attributes.items():
+                copied = memo.get(id(value))
+                if copied is not None:
+                    attributes[key] = copied
+        self._bind_callbacks()
+
     def add_child(self, new_child):
         if new_child.parent == None:
             new_child.parent = self
@@ -112,12 +186,25 @@ class Object:
         for i, child in enumerate(self.children):
             if child.name == new_child.name:
                 self.children[i] = new_child
+                if self.registry is not None:
+                    self.registry.remove(child)
 
                 # render.prepare_mesh_for_object(new_child)
                 break
         else:
             # render.prepare_mesh_for_object(new_child)
             self.children.append(new_child)
+        if self.registry is not None:
+            self.registry.add(new_child)
+
+    def remove_child(self, child):
+        """Detach child (and everything below it) from this object and its World."""
+        if child in self.children:
+            self.children.remove(child)
+            if child.parent is self:
+                child.parent = None
+            if self.registry is not None:
+                self.registry.remove(child)
 
     def add_component(self, component, name=None):
         # --- handle list input first ---
@@ -139,6 +226,9 @@ class Object:
 
         self.components[name] = component
         component.parent = self  # optional back-reference
+        self._bind_callbacks()
+        if self.registry is not None:
+            self.registry.refresh(self)
 
         if hasattr(component, 'start') and component.start is not None:
             component.start()
@@ -148,10 +238,12 @@ class Object:
     def __init__(self, position=None, rotation=None, size=None, children=None, components=None,
                  name=""):
         self.parent = None
+        self.registry = None  # the World's SceneRegistry once the object is in a scene
         self.children = children or []
         self.name = name
         self.size = Size(*size) if isinstance(size, tuple) else size or Size()
         self.components = components or {}
+        self._bind_callbacks()
         self.local_rotation = LocalRotation()
 
         for child in self.children:
@@ -207,6 +299,19 @@ class Object:
     def remove_component(self, name):
         if name in self.components:
             del self.components[name]
+            self._bind_callbacks()
+            if self.registry is not None:
+                self.registry.refresh(self)
+
+    def _bind_callbacks(self):
+        """Rebuild self.callbacks: callback name -> [(component, bound method), ...]."""
+        callbacks = {name: [] for name in self.CALLBACKS}
+        for component in self.components.values():
+            for name in self.CALLBACKS:
+                method = getattr(component, name, None)
+                if method is not None:
+                    callbacks[name].append((component, method))
+        self.callbacks = callbacks
 
     def get_component(self, name):
         return self.components.get(name, None)
@@ -1,17 +1,496 @@
 import numpy as np
 
+from bereshit.Broadphase import DynamicAABBTree, collect_bounds
+
 
 class RaycastHit:
+    """What a ray hit. Falsy (point None) when it hit nothing."""
+
     def __init__(self, point=None, normal=None, distance=None, collider=None, transform=None, rigidbody=None):
         self.point = point
         self.normal = normal
         self.distance = distance
         self.collider = collider
-        self.transform = transform
+        self.transform = transform  # the Object the collider belongs to
         self.rigidbody = rigidbody
 
-class Physics:
+    def __bool__(self):
+        return self.point is not None
+
+    def set(self, distance, point, normal, obj):
+        self.point = point
+        self.normal = normal
+        self.distance = distance
+        self.collider = obj.get_component("collider")
+        self.transform = obj
+        self.rigidbody = obj.get_component("Rigidbody")
+        return self
+
+
+def ray_obb(origins, directions, centers, rotations, half_sizes, max_distance=float('inf'), normals=True):
+    """
+    Slab test of rays against oriented boxes. Every argument broadcasts:
+    origins, directions, centers and half_sizes are (..., 3), the
+    world-from-local rotations (..., 3, 3) and max_distance a scalar or
+    (...). E.g. one ray against N boxes, or (R, 1, 3) rays against (1, M, 3)
+    boxes for all R x M pairs. Returns the entry distances, inf where a ray
+    misses or starts inside the box, and (with normals=True) the world-space
+    normals of the faces the rays enter through.
+    """
+    local_origin = ((origins - centers)[..., :, None] * rotations).sum(axis=-2)  # R^T v
+    local_direction = (directions[..., :, None] * rotations).sum(axis=-2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv = 1.0 / local_direction
+        ta = (-half_sizes - local_origin) * inv
+        tb = (half_sizes - local_origin) * inv
+    parallel = local_direction == 0.0
+    inside = np.abs(local_origin) <= half_sizes
+    near = np.where(parallel, np.where(inside, -np.inf, np.inf), np.minimum(ta, tb))
+    far = np.where(parallel, np.where(inside, np.inf, -np.inf), np.maximum(ta, tb))
+    t_enter = near.max(axis=-1)
+    t_exit = np.minimum(far.min(axis=-1), max_distance)
+    t = np.where((t_enter >= 0.0) & (t_enter <= t_exit), t_enter, np.inf)
+    if not normals:
+        return t
+
+    axis = near.argmax(axis=-1)[..., None]
+    sign = -np.sign(np.take_along_axis(local_direction, axis, axis=-1))
+    rotations = np.broadcast_to(rotations, t.shape + (3, 3))
+    faces = np.take_along_axis(rotations, np.broadcast_to(axis[..., None, :], t.shape + (3, 1)), axis=-1)[..., 0]
+    return t, faces * sign
+
+
+class SceneIndex:
+    """
+    Every collider of a World in a DynamicAABBTree, for scene queries. It is
+    refitted lazily, on the first query after bodies moved or the scene
+    changed, and only reinserts leaves that left their fat boxes. A ray or
+    box query then only visits tree nodes it touches, so its cost grows with
+    the number of hits, not with the number of colliders.
+
+    Colliders without a BodyStore row (no Rigidbody, or not a box) aren't
+    covered by the store's generation, so their bounds are read again on
+    every query and the tree is refitted when any of them moved.
+    """
+
+    def __init__(self, world, margin=0.1):
+        self.world = world
+        self.tree = DynamicAABBTree(margin)
+        self.key = None  # (registry version, BodyStore generation) the index was built for
+        self.objects = []
+        self.rows = np.zeros(0, dtype=np.int64)  # BodyStore row, -1 for colliders without one
+        self.boxes = np.zeros(0, dtype=bool)
+        self.unbounded = []  # colliders without finite bounds, tested every time
+        self.mins = np.zeros((0, 3))
+        self.maxs = np.zeros((0, 3))
+        self.collider_index = np.zeros(0, dtype=np.int64)  # position in registry.colliders
+        self.unbounded_index = np.zeros(0, dtype=np.int64)
+        self.detached = np.zeros(0, dtype=np.int64)  # colliders whose bounds aren't read from the store
+        self.static = []
+        self._clusters = None  # (members, mins, maxs) for raycast_batch, rebuilt after a refit
+
+    def refresh(self):
+        world = self.world
+        world.sync_bodies()
+        store = world.bodies  # sizes are picked up by the tick (BodyStore.sync_sizes)
+        store.refresh_transforms()
+        key = (world.registry.version, store.generation)
+        if key == self.key:
+            if self._refit_detached():
+                return self
+        self.key = key
+
+        from bereshit.BoxCollider import BoxCollider
+        objects = list(world.registry.colliders)
+        bodies = [obj.get_component("Rigidbody") for obj in objects]
+        rows = np.array([rb.__dict__["_body"].index if rb is not None and "_body" in rb.__dict__ else -1
+                         for rb in bodies], dtype=np.int64)
+        boxes = np.array([isinstance(obj.get_component("collider"), BoxCollider) for obj in objects], dtype=bool)
+        mins = np.empty((len(objects), 3))
+        maxs = np.empty((len(objects), 3))
+        stored = (rows >= 0) & boxes
+        mins[stored] = store.aabb_min[rows[stored]]
+        maxs[stored] = store.aabb_max[rows[stored]]
+        others = np.flatnonzero(~stored)
+        if len(others):
+            mins[others], maxs[others] = collect_bounds([objects[i] for i in others])
+
+        bounded = np.all(np.isfinite(mins) & np.isfinite(maxs), axis=1)
+        keep = np.flatnonzero(bounded)
+        self.objects = [objects[i] for i in keep]
+        self.rows = rows[keep]
+        self.boxes = boxes[keep]
+        self.unbounded = [objects[i] for i in np.flatnonzero(~bounded)]
+        self.mins, self.maxs = mins[keep], maxs[keep]
+        self.collider_index = keep
+        self.unbounded_index = np.flatnonzero(~bounded)
+        self.detached = np.flatnonzero(~stored[keep])
+        self.static = [bodies[i] is None or bodies[i].isKinematic for i in keep]
+        self._clusters = None
+        self.tree.refit(list(range(len(keep))), self.mins, self.maxs, self.static)
+        return self
+
+    def _refit_detached(self):
+        """Pick up moves of the colliders without a store row; False if the index needs a rebuild."""
+        if not len(self.detached):
+            return True
+        mins, maxs = collect_bounds([self.objects[i] for i in self.detached])
+        if np.array_equal(mins, self.mins[self.detached]) and np.array_equal(maxs, self.maxs[self.detached]):
+            return True
+        if not np.all(np.isfinite(mins) & np.isfinite(maxs)):
+            return False  # lost its bounds: it moves to the unbounded list
+        self.mins[self.detached] = mins
+        self.maxs[self.detached] = maxs
+        self._clusters = None
+        self.tree.refit(list(range(len(self.objects))), self.mins, self.maxs, self.static)
+        return True
+
+    def clusters(self, size=16):
+        """
+        The box colliders split into groups of at most `size` neighbours
+        (median cuts along the longest axis), as (members, mins, maxs):
+        a (groups, size) index array padded with -1 and the bounds around
+        each group. The coarse level raycast_batch culls rays with.
+        """
+        if self._clusters is not None:
+            return self._clusters
+        centers = (self.mins + self.maxs) * 0.5
+        pending, members = [np.flatnonzero(self.boxes)], []
+        while pending:
+            group = pending.pop()
+            if len(group) <= size:
+                if len(group):
+                    members.append(group)
+                continue
+            points = centers[group]
+            axis = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+            order = np.argpartition(points[:, axis], len(group) // 2)
+            pending.append(group[order[:len(group) // 2]])
+            pending.append(group[order[len(group) // 2:]])
+        mins = np.array([self.mins[group].min(axis=0) for group in members]).reshape(-1, 3)
+        maxs = np.array([self.maxs[group].max(axis=0) for group in members]).reshape(-1, 3)
+        padded = np.full((len(members), size), -1, dtype=np.int64)
+        for k, group in enumerate(members):
+            padded[k, :len(group)] = group
+        self._clusters = (padded, mins, maxs)
+        return self._clusters
+
+    def box_shapes(self, indices):
+        """(centers, rotations, half_sizes) of the box colliders at `indices`."""
+        store = self.world.bodies
+        rows = self.rows[indices]
+        centers = np.empty((len(indices), 3))
+        rotations = np.empty((len(indices), 3, 3))
+        half_sizes = np.empty((len(indices), 3))
+        stored = rows >= 0
+        centers[stored] = store.position[rows[stored]]
+        rotations[stored] = store.rotation[rows[stored]]
+        half_sizes[stored] = store.half_size[rows[stored]]
+        for k in np.flatnonzero(~stored):
+            obj = self.objects[indices[k]]
+            transform = obj.world_transform
+            centers[k] = transform.position
+            rotations[k] = transform.rotation
+            half_sizes[k] = obj.size.to_tuple()
+            half_sizes[k] *= 0.5
+        return centers, rotations, half_sizes
+
+    def raycast(self, origin, direction, max_distance=float('inf'), nearest=False):
+        """(distance, point, normal, object) for the colliders the ray hits, nearest first."""
+        origin = np.array(_as_tuple(origin), dtype=float)
+        direction = np.array(_as_tuple(direction), dtype=float)
+        length = np.linalg.norm(direction)
+        if length == 0:
+            raise ValueError("raycast direction is zero")
+        direction /= length
+        self.refresh()
+
+        candidates = self.tree.query_ray(origin, direction, max_distance)  # (aabb entry, index), nearest first
+        hits = []
+        boxes = [i for _, i in candidates if self.boxes[i]]
+        if boxes:
+            t, normals = ray_obb(origin, direction, *self.box_shapes(boxes), max_distance)
+            for k in np.flatnonzero(np.isfinite(t)):
+                hits.append((float(t[k]), origin + direction * t[k], normals[k], self.objects[boxes[k]]))
+        others = [self.objects[i] for _, i in candidates if not self.boxes[i]] + self.unbounded
+        for obj in others:
+            hit = _collider_raycast(obj, origin, direction, max_distance)
+            if hit is not None:
+                hits.append(hit)
+        hits.sort(key=lambda hit: hit[0])
+        return hits[:1] if nearest else hits
+
+    def _shapes(self, indices):
+        """box_shapes for any colliders: those that are not boxes stand in as their bounds."""
+        centers, rotations, half_sizes = self.box_shapes(indices)
+        others = np.flatnonzero(~self.boxes[indices])
+        if len(others):
+            mins, maxs = self.mins[indices[others]], self.maxs[indices[others]]
+            centers[others] = (mins + maxs) * 0.5
+            rotations[others] = np.eye(3)
+            half_sizes[others] = (maxs - mins) * 0.5
+        return centers, rotations, half_sizes
+
+    def overlap_box(self, center, half_extents, rotation=None, results=None, first=False):
+        """
+        The objects whose colliders overlap a box (rotation: world-from-local
+        3x3, None for axis aligned), in registry order. Candidates come from
+        a tree query of the box's bounds and are confirmed with the separating
+        axis test; colliders that are not boxes are tested as their bounds,
+        and those without bounds are always included. Nothing else is touched:
+        no callbacks run and no contacts are kept.
+
+        With `results` (a list) the objects are written into it instead, up
+        to its length, and the count is returned; with `first`, whether any
+        collider overlaps, stopping at the first one confirmed.
+        """
+        from bereshit.BoxCollider import box_sat_batch
+        center = np.array(_as_tuple(center), dtype=float)
+        half = np.abs(np.array(_as_tuple(half_extents), dtype=float))
+        rotation = np.eye(3) if rotation is None else np.asarray(rotation, dtype=float)
+        extent = np.abs(rotation) @ half
+        self.refresh()
+
+        def confirm(candidates):
+            centers, rotations, half_sizes = self._shapes(candidates)
+            pairs = np.stack([np.arange(1, len(candidates) + 1), np.zeros(len(candidates), dtype=np.int64)], axis=1)
+            hit, _, _, _ = box_sat_batch(np.vstack([center[None], centers]), np.concatenate([rotation[None], rotations]),
+                                         np.vstack([half[None], half_sizes]), pairs)
+            return candidates[hit]
+
+        return self._overlap(center - extent, center + extent, confirm, results, first)
+
+    def overlap_sphere(self, center, radius, results=None, first=False):
+        """
+        The objects whose colliders overlap a sphere, in registry order: a
+        tree query of its bounds, then the distance from the centre to the
+        closest point of each box. Like overlap_box otherwise.
+        """
+        center = np.array(_as_tuple(center), dtype=float)
+        self.refresh()
+
+        def confirm(candidates):
+            centers, rotations, half_sizes = self._shapes(candidates)
+            local = np.einsum("nji,nj->ni", rotations, center - centers)  # centre in each box's frame
+            outside = local - np.clip(local, -half_sizes, half_sizes)
+            return candidates[np.einsum("ij,ij->i", outside, outside) <= radius * radius]
+
+        return self._overlap(center - radius, center + radius, confirm, results, first)
+
+    def _overlap(self, lo, hi, confirm, results, first, chunk=16):
+        """
+        Run `confirm` on the colliders whose bounds meet lo..hi and hand the
+        objects it keeps back as overlap_box does. The candidates are
+        confirmed all at once for a list, and a chunk at a time when only the
+        first one, or as many as `results` holds, are wanted.
+        """
+        if first and self.unbounded:
+            return True
+        candidates = np.sort(np.array(self.tree.query_aabb(lo, hi), dtype=np.int64))
+        if results is None and not first:
+            found = confirm(candidates) if len(candidates) else candidates
+            return [self.objects[i] for i in found] + list(self.unbounded)
+
+        size = chunk if first else max(len(results), 1)
+        count = 0
+        for start in range(0, len(candidates), size):
+            for i in confirm(candidates[start:start + size]):
+                if first:
+                    return True
+                if count == len(results):
+                    return count
+                results[count] = self.objects[i]
+                count += 1
+        if first:
+            return False
+        for obj in self.unbounded:
+            if count == len(results):
+                break
+            results[count] = obj
+            count += 1
+        return count
+
+    def raycast_batch(self, origins, directions, max_distance=float('inf'), chunk=4096):
+        """
+        Nearest hit of each of N rays, as arrays: distances (N,) (inf for a
+        miss), points (N, 3) (nan for a miss), normals (N, 3) and the hit
+        collider's position in world.registry.colliders (N,) (-1 for a miss).
+
+        Rays are tested in chunks against the clusters() bounds first; the
+        boxes of the clusters a ray reaches are tested against its AABB, and
+        only the (ray, box) pairs left get the ray/OBB test, all of them in
+        one vectorized call per chunk. Colliders that are not boxes fall back
+        to their own Raycast for the rays that reach their bounds.
+        """
+        origins = np.asarray(origins, dtype=float).reshape(-1, 3)
+        directions = np.array(directions, dtype=float).reshape(-1, 3)
+        n = len(origins)
+        length = np.linalg.norm(directions, axis=1)
+        if np.any(length == 0):
+            raise ValueError("raycast direction is zero")
+        directions /= length[:, None]
+        with np.errstate(divide="ignore"):
+            inverse = 1.0 / directions
+        limit = np.broadcast_to(np.asarray(max_distance, dtype=float), (n,)).copy()
+        self.refresh()
+
+        best = limit.copy()  # nearest hit so far
+        index = np.full(n, -1, dtype=np.int64)  # position in self.objects
+        members, cluster_mins, cluster_maxs = self.clusters()
+        if len(members):
+            centers, rotations, half_sizes = self.box_shapes(np.arange(len(self.objects)))
+            for start in range(0, n, chunk):
+                stop = min(start + chunk, n)
+                # clusters outside the box around the chunk's ray segments can't be hit (sensor scans
+                # from one pose with a finite range only keep the few around them)
+                near = np.arange(len(members))
+                with np.errstate(invalid="ignore"):  # 0 * inf for an axis a ray runs across
+                    ends = origins[start:stop] + directions[start:stop] * best[start:stop, None]
+                if np.isfinite(ends).all():
+                    lo = np.minimum(origins[start:stop].min(axis=0), ends.min(axis=0))
+                    hi = np.maximum(origins[start:stop].max(axis=0), ends.max(axis=0))
+                    near = np.flatnonzero(np.all((cluster_mins <= hi) & (cluster_maxs >= lo), axis=1))
+                reach = _ray_aabb(origins[start:stop, None], inverse[start:stop, None], cluster_mins[near][None],
+                                  cluster_maxs[near][None], best[start:stop, None])
+                ray, cluster = np.nonzero(reach)
+                cluster = near[cluster]
+                boxes = members[cluster]  # (pairs, size), -1 padded
+                ray = np.broadcast_to((ray + start)[:, None], boxes.shape)[boxes >= 0]
+                boxes = boxes[boxes >= 0]
+                near = _ray_aabb(origins[ray], inverse[ray], self.mins[boxes], self.maxs[boxes], best[ray])
+                ray, boxes = ray[near], boxes[near]
+                t = ray_obb(origins[ray], directions[ray], centers[boxes], rotations[boxes], half_sizes[boxes],
+                            best[ray], normals=False)
+                np.minimum.at(best, ray, t)
+                won = (t == best[ray]) & np.isfinite(t)
+                index[ray[won]] = boxes[won]
+        return self._resolve(origins, directions, inverse, best, index, limit)
 
+    def scan(self, origin, directions, max_distance=float('inf'), slab=64):
+        """
+        raycast_batch for rays that all start at `origin`, as a sensor fires
+        them. Only the boxes whose bounds are within max_distance of the
+        origin are kept, and they are visited near to far, `slab` at a time:
+        with a shared origin the rays still looking are tested against a
+        slab's bounding spheres with one matrix product, and the pairs that
+        pass get the ray/OBB test. A ray drops out once its hit is nearer
+        than the next slab, so a scan in a cluttered scene stops early.
+        """
+        origin = np.array(_as_tuple(origin), dtype=float)
+        directions = np.array(directions, dtype=float).reshape(-1, 3)
+        n = len(directions)
+        length = np.linalg.norm(directions, axis=1)
+        if np.any(length == 0):
+            raise ValueError("raycast direction is zero")
+        directions /= length[:, None]
+        limit = float(max_distance)
+        self.refresh()
+
+        best = np.full(n, limit)
+        index = np.full(n, -1, dtype=np.int64)
+        # the box around the range covers a good part of the scene, so one vectorized test of the
+        # index's bounds beats walking the tree for it
+        lo, hi = origin - limit, origin + limit
+        candidates = np.flatnonzero(self.boxes & np.all((self.mins <= hi) & (self.maxs >= lo), axis=1))
+        if len(candidates):
+            centers, rotations, half_sizes = self.box_shapes(candidates)
+            offsets = centers - origin
+            radius2 = np.einsum("ij,ij->i", half_sizes, half_sizes)
+            distance2 = np.einsum("ij,ij->i", offsets, offsets)
+            # a ray from outside a sphere meets it when it points at it (along > 0) and passes
+            # within its radius (along ** 2 >= distance2 - radius2); from inside it always does
+            threshold = np.where(distance2 > radius2, distance2 - radius2, -np.inf)
+            nearest = np.sqrt(distance2) - np.sqrt(radius2)  # distance to the sphere
+            order = np.argsort(nearest)
+            order = order[nearest[order] < limit]
+            active = np.arange(n)
+            for start in range(0, len(order), slab):
+                near = order[start:start + slab]
+                active = active[best[active] > nearest[near[0]]]
+                if not len(active):
+                    break
+                along = directions[active] @ offsets[near].T
+                ray, box = np.nonzero(along * np.abs(along) >= threshold[near])
+                if not len(ray):
+                    continue
+                ray, box = active[ray], near[box]
+                t = ray_obb(origin, directions[ray], centers[box], rotations[box], half_sizes[box],
+                            best[ray], normals=False)
+                np.minimum.at(best, ray, t)
+                won = (t == best[ray]) & np.isfinite(t)
+                index[ray[won]] = candidates[box[won]]
+        with np.errstate(divide="ignore"):
+            inverse = 1.0 / directions
+        origins = np.broadcast_to(origin, directions.shape)
+        return self._resolve(origins, directions, inverse, best, index, np.full(n, limit))
+
+    def _resolve(self, origins, directions, inverse, best, index, limit):
+        """The arrays raycast_batch returns, from the nearest box hits; other colliders are tested here."""
+        n = len(origins)
+        hit = index >= 0
+        distances = np.where(hit, best, np.inf)
+        points = np.full((n, 3), np.nan)
+        normals = np.zeros((n, 3))
+        colliders = np.full(n, -1, dtype=np.int64)
+        if hit.any():
+            r, m = np.flatnonzero(hit), index[hit]
+            points[r] = origins[r] + directions[r] * distances[r, None]
+            _, normals[r] = ray_obb(origins[r], directions[r], *self.box_shapes(m), np.inf)
+            colliders[r] = self.collider_index[m]
+
+        # the rest one ray at a time: anything that is not a box, and colliders without bounds
+        others = [(i, self.objects[i], self.collider_index[i]) for i in np.flatnonzero(~self.boxes)]
+        others += [(None, obj, position) for obj, position in zip(self.unbounded, self.unbounded_index)]
+        for i, obj, position in others:
+            if i is None:
+                rays = np.arange(n)
+            else:
+                rays = np.flatnonzero(_ray_aabb(origins, inverse, self.mins[i], self.maxs[i], best))
+            for r in rays:
+                hit = _collider_raycast(obj, origins[r], directions[r], min(best[r], limit[r]))
+                if hit is not None and hit[0] < distances[r]:
+                    best[r] = distances[r] = hit[0]
+                    points[r], normals[r], colliders[r] = hit[1], hit[2], position
+        return distances, points, normals, colliders
+
+
+def _ray_aabb(origins, inverse_directions, mins, maxs, max_distance):
+    """
+    Mask of which rays enter which axis aligned boxes within max_distance
+    (arguments broadcast). Takes 1 / direction; for a direction parallel to
+    a slab that is +-inf, and fmin/fmax skip the nan a ray exactly on the
+    slab's plane gives.
+    """
+    with np.errstate(invalid="ignore"):
+        ta = (mins - origins) * inverse_directions
+        tb = (maxs - origins) * inverse_directions
+    near = np.fmin(ta, tb)
+    far = np.fmax(ta, tb)
+    # per axis by hand: reductions over a length 3 axis are slow in numpy
+    near = np.fmax(np.fmax(near[..., 0], near[..., 1]), near[..., 2])
+    far = np.fmin(np.fmin(far[..., 0], far[..., 1]), far[..., 2])
+    return np.maximum(near, 0.0) <= np.minimum(far, max_distance)
+
+
+def _as_tuple(v):
+    return (v.x, v.y, v.z) if hasattr(v, "x") else tuple(v)
+
+
+def _collider_raycast(obj, origin, direction, max_distance):
+    """The collider's own Raycast, for shapes the batched box test doesn't cover."""
+    collider = obj.get_component("collider")
+    if not hasattr(collider, "Raycast"):
+        return None
+    hit = collider.Raycast(origin, direction, max_distance)
+    if hit is None or hit.point is None:
+        return None
+    point = np.asarray(hit.point, dtype=float)
+    distance = hit.distance if hit.distance is not None else float(np.linalg.norm(point - origin))
+    return distance, point, hit.normal, obj
+
+
+class Physics:
+    world = None  # World that scene queries run against by default, set by World.Start
 
     def __init__(self, origin, direction, maxDistance=float('inf'), hit=None):
         self.origin = origin
@@ -20,10 +499,24 @@ class Physics:
         # self.hit = hit if hit is not None else Raycast.RaycastHit()
 
     @staticmethod
-    def Raycast(origin, direction, layerMask, maxDistance=float('inf')):
+    def _index(world):
+        world = world if world is not None else Physics.world
+        if world is None:
+            raise RuntimeError("no World to query: pass world= or Start() one first")
+        return world.scene_index
+
+    @staticmethod
+    def Raycast(origin, direction, layerMask=None, maxDistance=float('inf'), world=None):
+        """
+        Nearest collider along the ray, as a RaycastHit (falsy when nothing
+        was hit). With a collider as `layerMask` only that collider is tested,
+        the way this used to work; otherwise every collider of `world`
+        (default Physics.world). Rays starting inside a box don't hit it.
+        """
         if layerMask is not None:
-            hit = layerMask.Raycast(origin, direction, maxDistance)
-        return hit
+            return layerMask.Raycast(origin, direction, maxDistance)
+        hits = Physics._index(world).raycast(origin, direction, maxDistance, nearest=True)
+        return RaycastHit().set(*hits[0]) if hits else RaycastHit()
         # def ray_triangle_intersect(orig, dir, triangle, eps=1e-90):
         #     v0, v1, v2 = triangle
         #     # Compute edges
@@ -67,4 +560,79 @@ class Physics:
         #     temp_hit = ray_triangle_intersect(origin, direction, triangle)
         #     if temp_hit is not None and np.linalg.norm(temp_hit - origin) < dis:
         #         hit = temp_hit
-        # return hit
\ No newline at end of file
+        # return hit
+
+    @staticmethod
+    def RaycastAll(origin, direction, maxDistance=float('inf'), world=None):
+        """Every collider along the ray, as RaycastHits sorted by distance."""
+        return [RaycastHit().set(*hit) for hit in Physics._index(world).raycast(origin, direction, maxDistance)]
+
+    @staticmethod
+    def RaycastNonAlloc(origin, direction, results, maxDistance=float('inf'), world=None):
+        """
+        Fill the RaycastHits in `results` (a list kept between calls) with the
+        nearest hits, and return how many were written. Hits beyond
+        len(results) are dropped.
+        """
+        hits = Physics._index(world).raycast(origin, direction, maxDistance)
+        count = min(len(hits), len(results))
+        for k in range(count):
+            results[k].set(*hits[k])
+        return count
+
+    @staticmethod
+    def RaycastBatch(origins, directions, maxDistance=float('inf'), world=None):
+        """
+        Nearest hit of many rays at once: origins and directions are (N, 3)
+        arrays, maxDistance a number or (N,) array. Returns the arrays
+        (distances, points, normals, colliders) of SceneIndex.raycast_batch;
+        `colliders` indexes world.registry.colliders, -1 where a ray hit
+        nothing.
+        """
+        return Physics._index(world).raycast_batch(origins, directions, maxDistance)
+
+    @staticmethod
+    def _rotation(orientation):
+        """World-from-local matrix of a Quaternion (as an object's quaternion turns it) or a 3x3 array."""
+        if orientation is None:
+            return None
+        if hasattr(orientation, "to_matrix3"):
+            return orientation.conjugate().to_matrix3()
+        return np.asarray(orientation, dtype=float)
+
+    @staticmethod
+    def OverlapBox(center, halfExtents, orientation=None, world=None):
+        """
+        Every object whose collider overlaps the box, as a list. `orientation`
+        is a Quaternion or a 3x3 rotation matrix, None for axis aligned. Only
+        reads the scene: no OnCollisionEnter or other callbacks are fired.
+        """
+        return Physics._index(world).overlap_box(center, halfExtents, Physics._rotation(orientation))
+
+    @staticmethod
+    def OverlapSphere(center, radius, world=None):
+        """Every object whose collider overlaps the sphere, as a list."""
+        return Physics._index(world).overlap_sphere(center, radius)
+
+    @staticmethod
+    def OverlapBoxNonAlloc(center, halfExtents, results, orientation=None, world=None):
+        """
+        OverlapBox into `results` (a list kept between calls); returns how
+        many were written. Objects beyond len(results) are dropped.
+        """
+        return Physics._index(world).overlap_box(center, halfExtents, Physics._rotation(orientation), results=results)
+
+    @staticmethod
+    def OverlapSphereNonAlloc(center, radius, results, world=None):
+        """OverlapSphere into `results`; returns how many were written."""
+        return Physics._index(world).overlap_sphere(center, radius, results=results)
+
+    @staticmethod
+    def CheckBox(center, halfExtents, orientation=None, world=None):
+        """Whether any collider overlaps the box."""
+        return Physics._index(world).overlap_box(center, halfExtents, Physics._rotation(orientation), first=True)
+
+    @staticmethod
+    def CheckSphere(center, radius, world=None):
+        """Whether any collider overlaps the sphere."""
+        return Physics._index(world).overlap_sphere(center, radius, first=True)
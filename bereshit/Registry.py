@@ -0,0 +1,99 @@
+class SceneRegistry:
+    """
+    Every object under a World, sorted into the lists the tick loop and the
+    renderer need. Kept up to date by add_child / remove_child and
+    add_component / remove_component, so nothing walks the tree per tick.
+
+    objects      all objects, parents before children
+    physics      objects with a Rigidbody and a collider (simulated bodies)
+    colliders    objects with a collider
+    joints       physics objects with a joint
+    scripts      (component, bound Update) pairs, see Object.callbacks
+    renderables  objects with a Mesh
+
+    Objects added after the World was built go to the end of the lists.
+    `version` goes up on every change, so anything derived from the lists
+    can be cached against it.
+    """
+
+    CATEGORIES = ("physics", "colliders", "joints", "scripts", "renderables")
+
+    def __init__(self, roots=()):
+        self.objects = []
+        for name in self.CATEGORIES:
+            setattr(self, name, [])
+        self.version = 0
+        self.world = None  # the World that owns this registry, set by it
+        self._scripts = {}  # object -> its components in `scripts`
+        for root in roots:
+            self.add(root)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __contains__(self, obj):
+        return getattr(obj, "registry", None) is self
+
+    @property
+    def dynamic(self):
+        return [obj for obj in self.physics if not obj.Rigidbody.isKinematic]
+
+    @property
+    def kinematic(self):
+        return [obj for obj in self.physics if obj.Rigidbody.isKinematic]
+
+    def add(self, obj):
+        """Register obj and everything below it."""
+        for item in walk(obj):
+            if item.registry is self:
+                continue
+            item.registry = self
+            self.objects.append(item)
+            self._classify(item)
+        self.version += 1
+
+    def remove(self, obj):
+        """Forget obj and everything below it."""
+        for item in walk(obj):
+            if item.registry is not self:
+                continue
+            item.registry = None
+            self.objects.remove(item)
+            self._unclassify(item)
+        self.version += 1
+
+    def refresh(self, obj):
+        """Sort obj again after one of its components was added or removed."""
+        self._unclassify(obj)
+        self._classify(obj)
+        self.version += 1
+
+    def _classify(self, obj):
+        physics = obj.get_component("Rigidbody") is not None and obj.get_component("collider") is not None
+        if physics:
+            self.physics.append(obj)
+            if obj.get_component("joint") is not None:
+                self.joints.append(obj)
+        if obj.get_component("collider") is not None:
+            self.colliders.append(obj)
+        if obj.get_component("Mesh") is not None:
+            self.renderables.append(obj)
+        scripts = obj.callbacks["Update"]
+        if scripts:
+            self._scripts[obj] = scripts
+            self.scripts.extend(scripts)
+
+    def _unclassify(self, obj):
+        for name in ("physics", "colliders", "joints", "renderables"):
+            items = getattr(self, name)
+            if obj in items:
+                items.remove(obj)
+        for handler in self._scripts.pop(obj, ()):
+            self.scripts.remove(handler)
+
+
+def walk(obj):
+    """obj and all objects below it, parents first."""
+    yield obj
+    for child in obj.children:
+        yield from walk(child)
@@ -0,0 +1,249 @@
+import mmap
+import pickle
+import zlib
+
+import numpy as np
+
+from bereshit.Snapshot import split
+
+MAGIC = b"BRPL"
+VERSION = 1
+
+FILE_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u4"),
+    ("dt", "<f8"),
+    ("used", "<u8"),      # bytes of the file holding records (the rest is preallocated)
+    ("records", "<u8"),
+])
+
+# one record per tick: the world state after the tick, and the inputs the tick ran with
+RECORD_DTYPE = np.dtype([
+    ("tick", "<u8"),
+    ("kind", "<u1"),      # KEYFRAME: the snapshot, DELTA: XOR with the previous tick's snapshot
+    ("state", "<u4"),     # compressed state bytes that follow
+    ("size", "<u4"),      # snapshot size once decompressed
+    ("inputs", "<u4"),    # pickled inputs bytes after the state, 0 for none
+    ("scripts", "?"),     # whether the tick ran the scripts
+])
+KEYFRAME, DELTA = 0, 1
+
+
+class Recorder:
+    """
+    Appends every tick of a World to a memory-mapped log: the state after
+    the tick (a snapshot, stored as a zlib-compressed XOR against the
+    previous tick, with a full keyframe every `keyframe_every` ticks) and the
+    inputs scripts saw during it (World.inputs). The file is grown
+    geometrically and trimmed on close().
+
+        recorder = Recorder("run.bin", world, dt)
+        world.step_many(6000, dt)
+        recorder.close()
+    """
+
+    def __init__(self, path, world, dt, keyframe_every=120, capacity=1 << 20):
+        self.path = path
+        self.world = world
+        self.keyframe_every = keyframe_every
+        self.file = open(path, "w+b")
+        self.file.truncate(max(capacity, FILE_DTYPE.itemsize))
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.header = None
+        self._view_header()
+        self.header["magic"] = MAGIC
+        self.header["version"] = VERSION
+        self.header["dt"] = dt
+        self.header["used"] = FILE_DTYPE.itemsize
+        self.header["records"] = 0
+
+        self.previous = None  # last tick's snapshot bytes
+        self.since_keyframe = 0
+        self._snapshot = np.empty(0, dtype=np.uint8)  # reused snapshot buffer
+        world.recorder = self
+        self.capture()  # the starting state
+
+    def _view_header(self):
+        self.header = np.frombuffer(self.map, dtype=FILE_DTYPE, count=1)[0]
+
+    def _reserve(self, size):
+        used = int(self.header["used"])
+        if used + size > len(self.map):
+            capacity = max(used + size, 2 * len(self.map))
+            self.header = None  # no exported views while resizing
+            self.map.resize(capacity)
+            self._view_header()
+
+    def capture(self):
+        """Append the world's current state and inputs; World.update calls this after each tick."""
+        world = self.world
+        snapshot = world.snapshot(self._snapshot)
+        if snapshot.base is not self._snapshot and len(snapshot) > len(self._snapshot):
+            self._snapshot = np.empty(2 * len(snapshot), dtype=np.uint8)
+            snapshot = world.snapshot(self._snapshot)
+
+        if self.previous is None or len(self.previous) != len(snapshot) or \
+                self.since_keyframe >= self.keyframe_every:
+            kind, payload = KEYFRAME, snapshot
+            self.since_keyframe = 0
+        else:
+            kind, payload = DELTA, np.bitwise_xor(snapshot, self.previous)
+            self.since_keyframe += 1
+        self.previous = snapshot.copy()
+
+        state = zlib.compress(payload.tobytes(), 1)
+        inputs = pickle.dumps(world.inputs) if world.inputs else b""
+        size = RECORD_DTYPE.itemsize + len(state) + len(inputs)
+        self._reserve(size)
+
+        start = int(self.header["used"])
+        record = np.zeros(1, dtype=RECORD_DTYPE)
+        record["tick"] = world.tick
+        record["kind"] = kind
+        record["state"] = len(state)
+        record["size"] = len(snapshot)
+        record["inputs"] = len(inputs)
+        record["scripts"] = world.ran_scripts
+        offset = start + RECORD_DTYPE.itemsize
+        self.map[start:offset] = record.tobytes()
+        self.map[offset:offset + len(state)] = state
+        self.map[offset + len(state):start + size] = inputs
+        self.header["used"] = start + size
+        self.header["records"] += 1
+
+    def close(self):
+        if self.map is None:
+            return
+        if self.world.recorder is self:
+            self.world.recorder = None
+        used = int(self.header["used"])
+        self.header = None
+        self.map.flush()
+        self.map.close()
+        self.map = None
+        self.file.truncate(used)
+        self.file.close()
+
+
+class Replayer:
+    """
+    Re-drives a World built from the same scene through a Recorder log.
+    Only the record headers are read up front; states are decoded from the
+    nearest keyframe on demand, so seeking in a long session touches only
+    the pages it needs.
+
+        replay = Replayer("run.bin", world)
+        bad = replay.verify()   # first tick whose state differs, or None
+        replay.seek(3000)       # restore tick 3000 and continue from there
+    """
+
+    def __init__(self, path, world, tolerance=0.0):
+        self.world = world
+        self.tolerance = tolerance  # largest position error still counted as the same state
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = np.frombuffer(self.map, dtype=FILE_DTYPE, count=1)[0]
+        if header["magic"] != MAGIC or header["version"] != VERSION:
+            raise ValueError(f"{path} is not a replay log (or from another version)")
+        self.dt = float(header["dt"])
+
+        ticks, offsets, kinds = [], [], []
+        offset, used = FILE_DTYPE.itemsize, int(header["used"])
+        while offset < used:
+            record = np.frombuffer(self.map, dtype=RECORD_DTYPE, count=1, offset=offset)[0]
+            ticks.append(int(record["tick"]))
+            offsets.append(offset)
+            kinds.append(int(record["kind"]))
+            offset += RECORD_DTYPE.itemsize + int(record["state"]) + int(record["inputs"])
+        self.ticks = np.array(ticks, dtype=np.int64)
+        self.offsets = np.array(offsets, dtype=np.int64)
+        self.keyframes = np.flatnonzero(np.array(kinds) == KEYFRAME)
+
+        self.tick = None  # tick the world is at
+        self._cached = (None, None)  # (record index, decoded state)
+        self.max_error = 0.0  # largest position error seen by step()
+        self.divergence = None  # first tick past the tolerance
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def _record(self, k):
+        offset = int(self.offsets[k])
+        record = np.frombuffer(self.map, dtype=RECORD_DTYPE, count=1, offset=offset)[0]
+        start = offset + RECORD_DTYPE.itemsize
+        return record, start
+
+    def _index(self, tick):
+        k = int(np.searchsorted(self.ticks, tick))
+        if k >= len(self.ticks) or self.ticks[k] != tick:
+            raise KeyError(f"tick {tick} is not in the log")
+        return k
+
+    def state(self, tick):
+        """The recorded snapshot after `tick`, as a uint8 array."""
+        k = self._index(tick)
+        cached, state = self._cached
+        if cached is not None and cached <= k and not (self.keyframes[(self.keyframes > cached)] <= k).any():
+            first = cached + 1  # walk forward from the cached state
+        else:
+            first = int(self.keyframes[np.searchsorted(self.keyframes, k, side="right") - 1])
+            state = None
+        for i in range(first, k + 1):
+            record, start = self._record(i)
+            data = np.frombuffer(zlib.decompress(self.map[start:start + int(record["state"])]), dtype=np.uint8)
+            state = data.copy() if record["kind"] == KEYFRAME else np.bitwise_xor(state, data)
+        self._cached = (k, state)
+        return state
+
+    def inputs(self, tick):
+        """The inputs recorded for `tick` (a dict, empty if there were none)."""
+        record, start = self._record(self._index(tick))
+        count = int(record["inputs"])
+        if not count:
+            return {}
+        start += int(record["state"])
+        return pickle.loads(self.map[start:start + count])
+
+    def seek(self, tick):
+        """Put the world in the recorded state after `tick`."""
+        self.world.restore(self.state(tick))
+        self.world.tick = tick
+        self.tick = tick
+
+    def step(self):
+        """
+        Run the next tick with its recorded inputs and compare the result with
+        the log. Returns the largest position error of any body.
+        """
+        if self.tick is None:
+            self.seek(int(self.ticks[0]))
+        tick = self.tick + 1
+        record, _ = self._record(self._index(tick))
+        self.world.update(self.dt, check=bool(record["scripts"]), inputs=self.inputs(tick))
+        self.tick = tick
+
+        expected = self.state(tick)
+        actual = self.world.snapshot()
+        if np.array_equal(actual, expected):
+            return 0.0
+        _, want, _ = split(expected)
+        _, got, _ = split(actual)
+        if len(want) != len(got):
+            error = float("inf")
+        else:
+            error = float(np.abs(want["position"] - got["position"]).max(initial=0.0))
+        self.max_error = max(self.max_error, error)
+        if error > self.tolerance and self.divergence is None:
+            self.divergence = tick
+        return error
+
+    def verify(self, until=None):
+        """Step through the log (up to tick `until`); the first diverging tick, or None."""
+        last = int(self.ticks[-1]) if until is None else until
+        while (self.tick is None or self.tick < last) and self.divergence is None:
+            self.step()
+        return self.divergence
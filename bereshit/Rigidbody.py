@@ -1,4 +1,5 @@
 import numpy as np
+from bereshit.BodyStore import StoreField, detached_state
 from bereshit.Vector3 import Vector3
 
 
@@ -17,6 +18,18 @@ class Rigidbody:
     }
     _default_friction = 0.6
 
+    # live in the World's BodyStore arrays once the body is registered
+    mass = StoreField("mass", "scalar")
+    isKinematic = StoreField("kinematic", "flag")
+    useGravity = StoreField("use_gravity", "flag")
+    velocity = StoreField("velocity")
+    angular_velocity = StoreField("angular_velocity")
+    acceleration = StoreField("acceleration")
+    angular_acceleration = StoreField("angular_acceleration")
+    force = StoreField("force")
+    torque = StoreField("torque")
+    inverse_inertia = StoreField("inv_inertia", "matrix")
+
     def __init__(self, obj=None, mass=1.0, size=Vector3(1, 1, 1), position=Vector3(0, 0, 0),
                  center_of_mass=Vector3(0, 0, 0), velocity=None, angular_velocity=None, force=None,
                  isKinematic=False, useGravity=True, drag=0.98, friction_coefficient=0.6, restitution=0.6,COM=None):
@@ -44,6 +57,9 @@ class Rigidbody:
 
         self.normal_force = Vector3()
 
+    def __getstate__(self):
+        return detached_state(self)
+
     def _get_friction(self, other_rb):
         """
         Returns the friction coefficient for the pair of materials.
@@ -65,7 +81,22 @@ class Rigidbody:
         else:
             return Rigidbody._default_friction
 
+    def IsSleeping(self):
+        handle = self.__dict__.get("_body")
+        return handle is not None and bool(handle.store.asleep[handle.index])
+
+    def Sleep(self):
+        handle = self.__dict__.get("_body")
+        if handle is not None:
+            handle.store.sleep(handle.index)
+
+    def WakeUp(self):
+        handle = self.__dict__.get("_body")
+        if handle is not None:
+            handle.wake()
+
     def AddForce(self, force, ContactPoint=None):
+        self.WakeUp()
         # Linear force always contributes directly to acceleration
         self.force += force
 
@@ -0,0 +1,185 @@
+import time
+
+import numpy as np
+
+EMPTY = np.iinfo(np.int64).min  # slot_tick of a slot that holds nothing yet
+
+
+class Rollback:
+    """
+    Rollback netcode on top of a World. Each advance() runs one tick and
+    keeps its snapshot and inputs in a ring buffer of the last `history`
+    ticks. When an input for a past tick arrives late (add_input) or an
+    authoritative state replaces a predicted one (correct), the next
+    advance() restores the tick before it and re-runs every tick up to the
+    present with the stored inputs, before running the new tick.
+
+        rollback = Rollback(world, dt, budget=0.004)
+        # every frame:
+        for tick, player, keys in late_packets:
+            rollback.add_input(tick, player, keys)
+        rollback.advance()
+
+    All late inputs of a frame share one re-simulation, however many players
+    they came from. Its cost is at most `window` ticks: `max_rollback`, or
+    fewer when `budget` (seconds per frame) divided by the measured
+    `tick_cost` allows less. Inputs older than the window are applied at the
+    oldest tick it still reaches. For 8 players at 60 Hz, pick `budget` as
+    what is left of the 16.7 ms frame after rendering and read `resim_time`
+    / `window` to see how far back late packets can still be honoured.
+
+    Only the physics state is rolled back. Scripts run again during
+    re-simulation with `world.resimulating` set, and should take their input
+    from world.inputs (see World.push_input) and skip side effects such as
+    sending packets while it is set.
+    """
+
+    def __init__(self, world, dt, history=64, max_rollback=None, budget=None, check=True):
+        self.world = world
+        self.dt = dt
+        self.history = history
+        self.max_rollback = history - 1 if max_rollback is None else min(max_rollback, history - 1)
+        self.budget = budget  # seconds a frame may spend re-simulating, None for no limit
+        self.check = check  # run scripts (world.update's check) every tick
+
+        self.buffers = [np.empty(0, dtype=np.uint8) for _ in range(history)]  # snapshot storage, reused
+        self.sizes = np.zeros(history, dtype=np.int64)
+        self.inputs = [{} for _ in range(history)]
+        self.slot_tick = np.full(history, EMPTY, dtype=np.int64)  # tick each slot holds
+        self.future = {}  # tick -> inputs that arrived before their tick
+        self.dirty = None  # earliest tick to re-run
+
+        self.tick_cost = 0.0  # seconds per tick (moving average)
+        self.resim_time = 0.0  # seconds the last advance() spent re-simulating
+        self.resim_ticks = 0  # ticks it re-ran
+        self.total_resim_time = 0.0
+        self.rollbacks = 0
+        self.clamped = 0  # inputs and corrections that were older than the window
+        self._store(world.tick, {})
+
+    @property
+    def tick(self):
+        return self.world.tick
+
+    @property
+    def window(self):
+        """How many ticks a rollback may re-run right now."""
+        window = self.max_rollback
+        if self.budget is not None and self.tick_cost > 0:
+            window = min(window, int(self.budget / self.tick_cost))
+        return window
+
+    @property
+    def oldest(self):
+        """The earliest tick a rollback can re-run: the one after the oldest state kept."""
+        return int(self.slot_tick[self.slot_tick != EMPTY].min()) + 1
+
+    def _store(self, tick, inputs):
+        slot = tick % self.history
+        buffer = self.buffers[slot]
+        state = self.world.snapshot(buffer)
+        if not np.shares_memory(state, buffer):  # grew: keep room for more contacts
+            self.buffers[slot] = np.empty(2 * len(state), dtype=np.uint8)
+            self.buffers[slot][:len(state)] = state
+        self.sizes[slot] = len(state)
+        self.inputs[slot] = inputs
+        self.slot_tick[slot] = tick
+
+    def _measure(self, seconds, ticks):
+        cost = seconds / ticks
+        self.tick_cost = cost if self.tick_cost == 0 else 0.9 * self.tick_cost + 0.1 * cost
+
+    def state(self, tick):
+        """The snapshot kept for the state after `tick`."""
+        slot = tick % self.history
+        if self.slot_tick[slot] != tick:
+            raise KeyError(f"tick {tick} is no longer in the history")
+        return self.buffers[slot][:self.sizes[slot]]
+
+    def add_input(self, tick, name, value):
+        """
+        An input that belongs to `tick` (world.inputs[name] gets `value`
+        appended). Returns the tick it was applied at: `tick`, the oldest one
+        the window and the history reach, or the next tick when no rollback
+        is allowed.
+        """
+        present = self.world.tick
+        oldest = max(present - self.window + 1, self.oldest)
+        if tick < oldest:
+            self.clamped += 1
+            tick = oldest
+        if tick > present:
+            self.future.setdefault(tick, {}).setdefault(name, []).append(value)
+            return tick
+        self.inputs[tick % self.history].setdefault(name, []).append(value)
+        self.dirty = tick if self.dirty is None else min(self.dirty, tick)
+        return tick
+
+    def correct(self, tick, snapshot):
+        """
+        Authoritative state after `tick` (a World.snapshot from the server),
+        replacing the predicted one. Returns False if it is older than the
+        window and was dropped.
+        """
+        present = self.world.tick
+        if tick > present:
+            raise ValueError(f"correction for tick {tick} is ahead of the world (tick {present})")
+        if tick < present - self.window or self.slot_tick[tick % self.history] != tick:
+            self.clamped += 1
+            return False
+        slot = tick % self.history
+        snapshot = np.frombuffer(snapshot, dtype=np.uint8) if not isinstance(snapshot, np.ndarray) else snapshot
+        if len(self.buffers[slot]) < len(snapshot):
+            self.buffers[slot] = np.empty(2 * len(snapshot), dtype=np.uint8)
+        self.buffers[slot][:len(snapshot)] = snapshot
+        self.sizes[slot] = len(snapshot)
+        if tick == present:
+            self.world.restore(snapshot)
+        else:
+            self.dirty = tick + 1 if self.dirty is None else min(self.dirty, tick + 1)
+        return True
+
+    def resimulate(self):
+        """Re-run the ticks from the earliest changed one up to the present. Returns how many ran."""
+        self.resim_time = 0.0
+        self.resim_ticks = 0
+        if self.dirty is None:
+            return 0
+        world = self.world
+        present = world.tick
+        first = self.dirty
+        start = time.perf_counter()
+
+        recorder, world.recorder = world.recorder, None  # the log already has these ticks
+        world.resimulating = True
+        try:
+            world.restore(self.state(first - 1))
+            self.dirty = None  # only once restored: a failed restore keeps the inputs queued
+            world.tick = first - 1
+            for tick in range(first, present + 1):
+                inputs = self.inputs[tick % self.history]
+                world.update(self.dt, check=self.check, inputs=inputs)
+                self._store(tick, inputs)
+        finally:
+            world.resimulating = False
+            world.recorder = recorder
+
+        self.resim_ticks = present - first + 1
+        self.resim_time = time.perf_counter() - start
+        self.total_resim_time += self.resim_time
+        self.rollbacks += 1
+        self._measure(self.resim_time, self.resim_ticks)
+        return self.resim_ticks
+
+    def advance(self):
+        """Re-simulate whatever changed, then run the next tick (call instead of world.step)."""
+        self.resimulate()
+        world = self.world
+        start = time.perf_counter()
+        early = self.future.pop(world.tick + 1, None)
+        for name, values in (early or {}).items():
+            for value in values:
+                world.push_input(name, value)
+        world.update(self.dt, check=self.check)
+        self._store(world.tick, world.inputs)
+        self._measure(time.perf_counter() - start, 1)
@@ -0,0 +1,179 @@
+import numpy as np
+
+from bereshit.BodyStore import quat_to_euler
+from bereshit.Contact import ContactManifold
+from bereshit.Vector3 import Vector3
+
+MAGIC = b"BSNP"
+VERSION = 2
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u4"),
+    ("bodies", "<u4"),
+    ("contacts", "<u4"),
+])
+
+# one record per physics body, in registry order
+BODY_DTYPE = np.dtype([
+    ("position", "<f8", 3),
+    ("quaternion", "<f8", 4),
+    ("velocity", "<f8", 3),
+    ("angular_velocity", "<f8", 3),
+    ("acceleration", "<f8", 3),
+    ("angular_acceleration", "<f8", 3),
+    ("force", "<f8", 3),
+    ("torque", "<f8", 3),
+    ("sleep_timer", "<i8"),
+    ("sleep_island", "<i8"),
+    ("asleep", "?"),
+    ("enter", "?"),  # collider enter-state
+])
+STORE_FIELDS = ("position", "quaternion", "velocity", "angular_velocity", "acceleration", "angular_acceleration",
+                "force", "torque", "sleep_timer", "sleep_island", "asleep")
+
+# one record per contact point of the persistent manifolds, so warm starting resumes exactly
+CONTACT_DTYPE = np.dtype([
+    ("body1", "<i4"),
+    ("body2", "<i4"),
+    ("point", "<f8", 3),
+    ("local", "<f8", 3),
+    ("normal", "<f8", 3),
+    ("depth", "<f8"),
+    ("impulse", "<f8", 3),
+])
+CONTACT_FIELDS = ("point", "local", "normal", "depth", "impulse")  # same names in ContactBuffer
+
+
+def snapshot_size(bodies, contacts):
+    return HEADER_DTYPE.itemsize + bodies * BODY_DTYPE.itemsize + contacts * CONTACT_DTYPE.itemsize
+
+
+def split(buffer):
+    """(header, bodies, contacts) record views of a snapshot buffer."""
+    buffer = np.frombuffer(buffer, dtype=np.uint8) if not isinstance(buffer, np.ndarray) else buffer
+    header = buffer[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)[0]
+    if header["magic"] != MAGIC or header["version"] != VERSION:
+        raise ValueError("not a world snapshot (or from another version)")
+    start = HEADER_DTYPE.itemsize
+    stop = start + int(header["bodies"]) * BODY_DTYPE.itemsize
+    bodies = buffer[start:stop].view(BODY_DTYPE)
+    contacts = buffer[stop:stop + int(header["contacts"]) * CONTACT_DTYPE.itemsize].view(CONTACT_DTYPE)
+    return header, bodies, contacts
+
+
+class SnapshotLayout:
+    """
+    Where each registry physics body lives in the BodyStore, and which body
+    each store row is. Rebuilt only when the World's registry changes.
+    """
+
+    def __init__(self, world):
+        registry = world.registry
+        world.sync_bodies()
+        self.version = registry.version
+        self.objects = list(registry.physics)
+        self.colliders = [obj.get_component("collider") for obj in self.objects]
+        self.rows = np.array(world.bodies.rows([obj.get_component("Rigidbody") for obj in self.objects]),
+                             dtype=np.int64)
+        self.body_of_row = np.full(world.bodies.count, -1, dtype=np.int64)
+        self.body_of_row[self.rows] = np.arange(len(self.rows))
+
+    @classmethod
+    def of(cls, world):
+        layout = world._snapshot_layout
+        if layout is None or layout.version != world.registry.version:
+            layout = world._snapshot_layout = cls(world)
+        return layout
+
+
+def take_snapshot(world, out=None):
+    """
+    The dynamic state of `world` as one contiguous uint8 buffer: a header,
+    a BODY_DTYPE record per physics body in registry order, then a
+    CONTACT_DTYPE record per manifold point (copied from the World's
+    ContactBuffer). `out`, when big enough, is filled instead of allocating
+    (the returned array is a view of it).
+    """
+    layout = SnapshotLayout.of(world)
+    store = world.bodies
+    packed = world.contacts  # every manifold point, packed by the last tick (or restore)
+    points = packed.count
+
+    size = snapshot_size(len(layout.rows), points)
+    if out is None or len(out) < size:
+        out = np.empty(size, dtype=np.uint8)
+    buffer = out[:size]
+    header = buffer[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    header["bodies"] = len(layout.rows)
+    header["contacts"] = points
+    _, bodies, contacts = split(buffer)
+
+    rows = layout.rows
+    for name in STORE_FIELDS:
+        bodies[name] = getattr(store, name)[rows]
+    bodies["enter"] = [getattr(collider, "enter", False) for collider in layout.colliders]
+
+    contacts["body1"] = layout.body_of_row[packed.row1[:points]]
+    contacts["body2"] = layout.body_of_row[packed.row2[:points]]
+    for name in CONTACT_FIELDS:
+        contacts[name] = packed.view(name)
+    return buffer
+
+
+def restore_snapshot(world, buffer):
+    """Write a snapshot taken from this world (same registry) back into it, in place."""
+    layout = SnapshotLayout.of(world)
+    header, bodies, contacts = split(buffer)
+    if int(header["bodies"]) != len(layout.rows):
+        raise ValueError(f"snapshot has {int(header['bodies'])} bodies, the world has {len(layout.rows)}")
+
+    store = world.bodies
+    rows = layout.rows
+    for name in STORE_FIELDS:
+        getattr(store, name)[rows] = bodies[name]
+    store.transform_dirty[rows] = True
+    store.transforms_stale = True
+    # islands are named after a row of theirs; rename them for this world's rows
+    islands = bodies["sleep_island"]
+    for island in np.unique(islands[islands > 0]).tolist():
+        store.sleep_island[rows[islands == island]] = rows[islands == island].min() + 1
+    for collider, enter in zip(layout.colliders, bodies["enter"].tolist()):
+        if collider is not None:
+            collider.enter = enter
+    for obj, angles in zip(layout.objects, quat_to_euler(bodies["quaternion"]).tolist()):
+        obj.rotation = Vector3(*angles)
+
+    # manifolds, and the packed copy of them the next snapshot reads
+    packed = world.contacts
+    packed.clear()
+    packed.reserve(len(contacts))
+    packed.count = len(contacts)
+    body1, body2 = contacts["body1"], contacts["body2"]
+    packed.row1[:packed.count] = rows[body1]
+    packed.row2[:packed.count] = rows[body2]
+    for name in CONTACT_FIELDS:
+        packed.view(name)[...] = contacts[name]
+
+    manifolds = {}
+    cuts = np.flatnonzero((body1[1:] != body1[:-1]) | (body2[1:] != body2[:-1])) + 1
+    for start, stop in zip([0, *cuts.tolist()], [*cuts.tolist(), len(contacts)]):
+        if start == stop:
+            continue
+        i, j = int(body1[start]), int(body2[start])
+        key = (layout.colliders[i], layout.colliders[j])
+        manifold = world.manifolds.get(key)
+        if manifold is None:
+            obj1, obj2 = layout.objects[i], layout.objects[j]
+            manifold = ContactManifold(obj1.get_component("Rigidbody"), obj2.get_component("Rigidbody"))
+        manifold.points = packed.point[start:stop].copy()
+        manifold.local = packed.local[start:stop].copy()
+        manifold.normal = packed.normal[start].copy()
+        manifold.depth = packed.depth[start:stop].copy()
+        manifold.impulse = packed.impulse[start:stop].copy()
+        manifold.rows = (int(rows[i]), int(rows[j]))
+        manifolds[key] = manifold
+        packed.slices.append((manifold, start, stop))
+    world.manifolds = manifolds
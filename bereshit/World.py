@@ -1,18 +1,78 @@
+import threading
 import traceback
 
 import numpy as np
 
+from bereshit.BodyStore import BodyStore
+from bereshit.BoxCollider import BoxCollider, box_sat_batch
+from bereshit.Broadphase import make_broadphase, collect_bounds
+from bereshit.Contact import ContactBuffer, ContactManifold
+from bereshit.Island import IslandPool, island_labels, build_islands, contact_islands, solve_contacts
+from bereshit.Physics import Physics, SceneIndex
 from bereshit.Quaternion import Quaternion
+from bereshit.Registry import SceneRegistry
 from bereshit.Rigidbody import Rigidbody
+from bereshit.Snapshot import take_snapshot, restore_snapshot
 from bereshit.Vector3 import Vector3
 
 
 class World:
-    def __init__(self, children=None,gizmos=None,gravity=Vector3(0, -9.8, 0)):
+    def __init__(self, children=None,gizmos=None,gravity=Vector3(0, -9.8, 0), broadphase="sap", cell_size=1.0,
+                 allow_sleep=True, sleep_velocity=0.2, sleep_angular_velocity=0.2, sleep_ticks=30,
+                 workers=0, parallel_threshold=512, solver_iterations=10, solver_tolerance=1e-4, max_contacts=4):
         self.children = children or []
+        self.registry = SceneRegistry(self.children)  # flat, per-category view of the scene
+        self.registry.world = self  # how scripts reach the World: self.parent.registry.world
+        self._synced = None  # registry version the BodyStore rows were last synced with
+        self._riders = (None, [])  # (registry version, objects) for the carry-along step in update
+        self._snapshot = (None, {}, [])  # (registry version, index, renderables) for transform_snapshot
+        self.frames = None  # TransformFrames published by Core.run for render interpolation
+        self._snapshot_layout = None  # SnapshotLayout, rebuilt when the registry changes
+        self.tick = 0  # ticks run so far
+        self.ran_scripts = False  # whether the last tick ran the scripts (update's check)
+        # script-visible inputs (keys, mouse, packets): sources push_input() them,
+        # and they become `inputs` for the whole of the next tick
+        self.inputs = {}
+        self.pending_inputs = {}
+        self._input_lock = threading.Lock()
+        self.recorder = None  # Replay.Recorder logging every tick, if any
+        self._scene_index = None  # SceneIndex for Physics queries, built on first use
+        self.resimulating = False  # a Rollback is re-running past ticks (scripts may skip side effects)
         self.Camera = self.search_by_component('Camera')
         self.gizmos = gizmos
         self.gravity = gravity
+        # "sap", "bvh", "grid", "all" or a Broadphase instance
+        options = {"cell_size": cell_size} if broadphase == "grid" else {}
+        self.broadphase = make_broadphase(broadphase, **options)
+        self.bodies = BodyStore()  # rigidbody state as contiguous arrays
+
+        # bodies slower than the thresholds for sleep_ticks ticks stop being simulated
+        self.allow_sleep = allow_sleep
+        self.sleep_velocity = sleep_velocity
+        self.sleep_angular_velocity = sleep_angular_velocity
+        self.sleep_ticks = sleep_ticks
+        self.touching = []  # store-row pairs in contact (or jointed) this tick
+        self.awake_bodies = 0
+        self.sleeping_bodies = 0
+
+        # groups of bodies linked by contacts or joints, rebuilt every tick
+        self.islands = []
+        # with workers > 0, ticks with at least parallel_threshold contacts
+        # solve their islands on a process pool
+        self.pool = IslandPool(workers) if workers else None
+        self.parallel_threshold = parallel_threshold
+
+        # contact solver: warm-started sequential impulse over persistent manifolds
+        self.manifolds = {}  # (collider, collider) -> ContactManifold, kept while touching
+        self.contacts = ContactBuffer()  # solver rows, reused every tick
+        self.solver_iterations = solver_iterations
+        self.solver_tolerance = solver_tolerance  # stop once no impulse changes more than this
+        self.iterations_used = 0
+        self.max_contacts = max_contacts  # points kept per manifold
+        self.contact_tolerance = 0.05  # how far a point may drift and still be the same contact
+        self.baumgarte = 0.2  # fraction of the penetration pushed out per tick
+        self.slop = 0.01  # penetration left alone so resting contacts stay in contact
+        self.restitution_velocity = 1.0  # slower impacts do not bounce
 
 
 
@@ -27,322 +87,194 @@ class World:
                 if result:
                     return result
         return None
-    def get_all_children(self):
-        all_objs = []
-        for child in self.children:
-            target = child
-            all_objs.append(target)
-            all_objs.extend(target.get_all_children())
-        return all_objs
-    def get_all_children_physics(self):
-        all_objs = []
-        for child in self.children:
-            rb = child.get_component("Rigidbody")
-            collider = child.get_component("collider")
-            if rb and collider:
-                all_objs.append(child)
-            all_objs.extend(child.get_all_children_physics())
-        return all_objs
-
-    def apply_gravity(self,children):
-        for child in children:
-            rb = child.get_component("Rigidbody")
-            # # === 2) APPLY GRAVITY (AND TORSOUE DUE TO GRAVITY) ===
-            if rb.useGravity:
-                rb.force += self.gravity * rb.mass
-
-    def solve_collections(self, children, dt, gizmos):
-
-        contacts = []
-        contacts2 = []
-
-        beta = 0.0  # softness factor for positional correction
-
-        # STEP 1: Collect all contacts (use ALL manifold points)
-        for i in range(len(children)):
-            obj1 = children[i]
-            rb1 = obj1.get_component("Rigidbody")
-
-            for j in range(i + 1, len(children)):
-                obj2 = children[j]
-                rb2 = obj2.get_component("Rigidbody")
-
-                # Skip if neither has a Rigidbody or both are kinematic
-                if (rb1 is None or rb1.isKinematic) and (rb2 is None or rb2.isKinematic):
-                    continue
-
-                result = obj1.collider.check_collision(obj2, single_point=False)
-                if result is None:
-                    continue
-
-                contact_points = result  # contact_points = [(cp, n, pn), ...]
-
-                # Optional extra data (same per manifold)
-                # rb1, rb2 = ref
-                # ref_face_center, incident_face = arr[0], arr[1] if isinstance(arr, (list, tuple)) and len(
-                #     arr) >= 2 else (None, None)
-                if type(contact_points[0]) == tuple:  # For each point in the manifold, add a separate constraint
-                    N = len(contact_points)
-                    for (contact_point, normal, penetration) in contact_points:
-                        contact_point = Vector3(contact_point)
-                        r1 = contact_point - rb1.parent.position
-                        r2 = contact_point - rb2.parent.position
-
-                        v1 = (rb1.velocity + rb1.angular_velocity.cross(r1)* 0.0) if (
-                                rb1 and not rb1.isKinematic) else Vector3(0, 0, 0)
-                        v2 = (rb2.velocity + rb2.angular_velocity.cross(r2)* 0.0) if (
-                                rb2 and not rb2.isKinematic) else Vector3(0, 0, 0)
-
-                        v_rel = v1 - v2  # B minus A (matches normal pointing A->B)
-                        v_norm = v_rel.dot(normal)
-
-                        contacts2.append({
-                            "j1" : 0,
-                            "r1": r1,
-                            "r2": r2,
-                            "rb1": rb1,
-                            "rb2": rb2,
-                            "normal": normal,
-                            "v_norm": v_norm,
-                            "penetration": penetration,
-                            "contact_point": contact_point,
-                            # "ref_face_center": ref_face_center,
-                            # "incident_face": incident_face,
-                        })
-                    contacts.append(contacts2)
-                elif type(contact_points[0]) == Vector3:
-                    contact_point, normal, penetration = contact_points
-                    r1 = contact_point - rb1.parent.position
-                    r2 = contact_point - rb2.parent.position
-
-                    v1 = (rb1.velocity + rb1.angular_velocity.cross(r1)) if (
-                            rb1 and not rb1.isKinematic) else Vector3(0, 0, 0)
-                    v2 = (rb2.velocity + rb2.angular_velocity.cross(r2)) if (
-                            rb2 and not rb2.isKinematic) else Vector3(0, 0, 0)
-
-                    v_rel = v1 - v2  # B minus A (matches normal pointing A->B)
-                    v_norm = v_rel.dot(normal)
-
-                    contacts.append([{
-                        "j1": 0,
-                        "r1": r1,
-                        "r2": r2,
-                        "rb1": rb1,
-                        "rb2": rb2,
-                        "normal": normal,
-                        "v_norm": v_norm,
-                        "penetration": penetration,
-                        "contact_point": contact_point,
-                        # "ref_face_center": ref_face_center,
-                        # "incident_face": incident_face,
-                    }])
-        if gizmos:
-            self.set_gizmos(contacts=contacts)
-        N = 0
-        for i in range(len(contacts)):
-            N += len(contacts[i])
-        if N == 0:
-            return contacts
-
-        k = np.zeros((N, 2))
-        for contact_point in contacts:
-            length = len(contact_point)
-            for i, c in enumerate(contact_point):
-                rb1 = c["rb1"]
-                rb2 = c["rb2"]
-                restitution = 0.0
-
-                if c["v_norm"] > -0.1 and c["v_norm"] < 0:
-                    restitution
-                elif rb1 and rb2:
-                    restitution = min(rb1.restitution, rb2.restitution)
-                elif rb1:
-                    restitution = rb1.restitution
-                elif rb2:
-                    restitution = rb2.restitution
-
-                rn1 = c["r1"].cross(c["normal"])  # Vector3
-                rn2 = c["r2"].cross(c["normal"])
-
-                if not rb1.isKinematic:
-                    term1 = (Vector3.from_np(Iinv_world(rb1) @ rn1.to_np())).cross(c["r1"])
-                else:
-                    term1 = Vector3(0, 0, 0)
-
-                if not rb2.isKinematic:
-                    term2 = (Vector3.from_np(Iinv_world(rb2) @ rn2.to_np())).cross(c["r2"])
-                else:
-                    term2 = Vector3(0, 0, 0)
-                denominator = (0 if rb1.isKinematic else 1 / rb1.mass) \
-                              + (0 if rb2.isKinematic else 1 / rb2.mass) \
-                              + c["normal"].dot(term1 + term2)
-                denominator2 = (0 if rb1.isKinematic else 1 / rb1.mass) \
-                               + (0 if rb2.isKinematic else 1 / rb2.mass)
-                c["J1"] = (-(1 + restitution) * c["v_norm"]) / (denominator2 * length)
-                # k[i, 0] = (-(1 + restitution) * c["v_norm"]) / (denominator2 * length)
-                # c["J1"] = (-(1 + restitution) * c["v_norm"]) / denominator
-                # k[i] /= length
-
-        # STEP 4: Solve impulses (nonnegative)
-
-        # impulses = np.linalg.pinv(A) @ b
-        # impulses = np.maximum(impulses, 0.0)
-        # STEP 5: Apply impulses for each contact point
-        for contact_point in contacts:
-            for i, contact in enumerate(contact_point):
-                J1 = contact["J1"]
-
-                if contact["v_norm"] >= 0:
-                    continue
-                #     J = 0
-                #
-                #
-                #     continue  # separating
-                flage = (restitution == 0)
-                # flage = False
-                n = contact["normal"]
-
-                if contact["rb1"] and contact["rb2"]:
-                    rb1 = contact["rb1"]
-                    rb2 = contact["rb2"]
-                    # rb1.isKinematic = True
-                    # rb2.isKinematic = True
-
-                    if not rb1.isKinematic and not rb2.isKinematic:
-                        self.resolve_dynamic_collision(contact, J1,0, flage)
-                        self.apply_friction_impulse(contact, n, J1)
-                    elif (not rb1.isKinematic) or (not rb2.isKinematic):
-                        self.resolve_kinematic_collision(contact, J1, 0, flage)
-                        self.apply_friction_impulse(contact, n, J1)
-
-        return contacts
-
-    def apply_friction_impulse(self, contact, normal, Jn):
-        """
-        Applies Coulomb friction impulse based on the relative velocity,
-        including angular friction effect.
-        """
-        rb1 = contact["rb1"]
-        rb2 = contact["rb2"]
-        contact_point = contact["contact_point"]  # required for torque calculation
+    def add_child(self, new_child):
+        """Add a top-level object (and everything below it) to the scene."""
+        new_child.world = self
+        self.children.append(new_child)
+        self.registry.add(new_child)
+
+    def remove_child(self, child):
+        """Take a top-level object (and everything below it) out of the scene."""
+        if child in self.children:
+            self.children.remove(child)
+            self.registry.remove(child)
 
-        v1 = rb1.velocity if rb1 and not rb1.isKinematic else Vector3(0, 0, 0)
-        v2 = rb2.velocity if rb2 and not rb2.isKinematic else Vector3(0, 0, 0)
-        v_rel = v1 - v2
-
-        tangent = v_rel - normal * v_rel.dot(normal)
-        tangent_length = tangent.magnitude()
-
-        if tangent_length < 1e-6:
-            return  # No significant tangential motion
+    def get_all_children(self):
+        return list(self.registry.objects)
 
-        tangent = tangent.normalized()
+    def get_all_children_physics(self):
+        return list(self.registry.physics)
 
-        # Friction coefficient
-        if rb1 and rb2:
-            mu = rb1._get_friction(rb2)
-        elif rb1:
-            mu = rb1.friction_coefficient
-        elif rb2:
-            mu = rb2.friction_coefficient
-        else:
-            mu = Rigidbody._default_friction
-
-        # Compute friction impulse scalar
-        Jt_magnitude = -v_rel.dot(tangent)
-        denom = 0.0
-        if rb1 and not rb1.isKinematic:
-            denom += 1.0 / rb1.mass
-        if rb2 and not rb2.isKinematic:
-            denom += 1.0 / rb2.mass
-
-        if denom == 0.0:
-            return
-
-        Jt_magnitude /= denom
-        max_friction = mu * Jn
-        Jt_magnitude = max(-max_friction, min(Jt_magnitude, max_friction))
-
-        Jt = tangent * Jt_magnitude
-
-        # Apply linear and angular friction impulses
-        if rb1 and not rb1.isKinematic:
-            rb1.velocity += Jt / rb1.mass
-            r1 = contact_point - rb1.parent.position
-            angular_impulse1 = r1.cross(Jt)
-            # rb1.angular_velocity += Vector3.from_np(rb1.inverse_inertia @ angular_impulse1.to_np())
-
-        if rb2 and not rb2.isKinematic:
-            rb2.velocity -= Jt / rb2.mass
-            r2 = contact["r2"]
-            angular_impulse2 = r2.cross(-Jt)
-            # rb2.angular_velocity += Vector3.from_np(rb2.inverse_inertia @ angular_impulse2.to_np())
-
-    def resolve_dynamic_collision(self, contact, J,J2, flage):
+    def transform_snapshot(self):
         """
-        Applies linear and angular impulse to both dynamic bodies, factoring restitution.
+        (index, positions, quaternions) of every renderable, `index` mapping
+        each object to its row. The same index object is reused while the
+        scene is unchanged, so two snapshots can be blended row by row.
         """
-        n = contact["normal"]
-        contact_point = contact["contact_point"]  # world-space contact point
-        rb1 = contact["rb1"]
-        rb2 = contact["rb2"]
-
-        impulse_vec = n * J
-        impulse_vec2 = n * J2
-        # impulse_vec = np.maximum(impulse_vec, 0.0)
-        if rb1 and not rb1.isKinematic:
-            rb1.velocity += impulse_vec / rb1.mass
-            if flage:
-                rb1.force = Vector3()
-                # rb1.velocity = Vector3()
-
-            # Angular impulse for rb1
-            r1 = contact["r1"]
-            angular_impulse1 = r1.cross(impulse_vec2)
-            rb1.angular_velocity += -Vector3.from_np(rb1.inverse_inertia @ angular_impulse1.to_np())
-
-        if rb2 and not rb2.isKinematic:
-            rb2.velocity -= impulse_vec / rb2.mass
-            if flage:
-                rb2.force = Vector3()
-                # rb2.velocity = Vector3()
-            # Angular impulse for rb2
-            r2 = contact["r2"]
-            angular_impulse2 = r2.cross(impulse_vec2)
-            rb2.angular_velocity += -Vector3.from_np(rb2.inverse_inertia @ angular_impulse2.to_np())
-
-    def resolve_kinematic_collision(self, contact, J, J2, flage):
+        registry = self.registry
+        if self._snapshot[0] != registry.version:
+            objects = list(registry.renderables)
+            self._snapshot = (registry.version, {obj: i for i, obj in enumerate(objects)}, objects)
+        _, index, objects = self._snapshot
+        positions = np.array([obj.position.to_tuple() for obj in objects], dtype=float).reshape(-1, 3)
+        quaternions = np.array([(q.x, q.y, q.z, q.w) for q in (obj.quaternion for obj in objects)],
+                               dtype=float).reshape(-1, 4)
+        return index, positions, quaternions
+
+    def riders(self):
         """
-        Applies linear and angular impulse to the dynamic body only, factoring restitution.
+        Physics objects nested at least two levels below another physics
+        object, once per such ancestor. update() carries them along with
+        their own velocity a second time. Rebuilt only when the scene changes.
         """
-        n = contact["normal"]
-        contact_point = contact["contact_point"]  # world-space contact point
-        rb1 = contact["rb1"]
-        rb2 = contact["rb2"]
-
-        impulse_vec = n * J
-        impulse_vec2 = n * J2
+        version, riders = self._riders
+        if version != self.registry.version:
+            riders = []
+            for child in self.registry.physics:
+                for child_of_child in child.get_all_children_not_physics():
+                    if child_of_child.get_component("Rigidbody") is not None:
+                        riders.append(child_of_child)
+            self._riders = (self.registry.version, riders)
+        return riders
 
-        if rb1 and not rb1.isKinematic:
-            velocity = impulse_vec / rb1.mass
-            r1 = contact["r1"]
+    def apply_gravity(self,children):
+        # # === 2) APPLY GRAVITY (AND TORSOUE DUE TO GRAVITY) ===
+        self.bodies.apply_gravity(self.gravity)
 
-            rb1.velocity += velocity
-            # rb1.angular_velocity += r1.cross(velocity)
+    def collect_manifolds(self, children, bodies, rows, static, boxes, candidates, manifolds):
+        """
+        Narrowphase for broadphase pairs (indices into children): the pairs
+        in contact get their manifold in `manifolds`, and an awake body
+        touching a sleeping one wakes it. Returns whether anything woke.
+        """
+        asleep = self.bodies.asleep
+        woken = False
+        # box pairs go through one batched SAT, only overlapping ones get contacts
+        separations = self.separate_boxes(children, rows, [(i, j) for i, j in candidates if boxes[i] and boxes[j]])
+
+        for i, j in candidates:
+            obj1, obj2 = children[i], children[j]
+            rb1, rb2 = bodies[i], bodies[j]
+            row1, row2 = rows[i], rows[j]
+            awake1 = not static[i] and not asleep[row1]
+            awake2 = not static[j] and not asleep[row2]
+
+            separation = None
+            if boxes[i] and boxes[j]:
+                separation = separations.get((i, j))
+                if separation is None:
+                    continue
+            result = obj1.collider.check_collision(obj2, single_point=False, separation=separation,
+                                                   max_points=self.max_contacts)
+            if result is None:
+                continue
+
+            # an awake body touching a sleeping one wakes it up
+            if awake1 and not static[j]:
+                woken |= len(self.bodies.wake(row2)) > 0
+                self.touching.append((row1, row2))
+            elif awake2 and not static[i]:
+                woken |= len(self.bodies.wake(row1)) > 0
+                self.touching.append((row1, row2))
+
+            # contact_points = [(cp, n, pn), ...], one normal (obj2 -> obj1) for the whole manifold
+            points = [contact_point for contact_point, _, _ in result]
+            depth = [penetration for _, _, penetration in result]
+            normal = np.array(result[0][1].to_tuple(), dtype=float)
+
+            key = (obj1.collider, obj2.collider)
+            manifold = self.manifolds.get(key) or ContactManifold(rb1, rb2)
+            transform = obj1.world_transform
+            manifold.update(points, normal, depth, transform.position, transform.rotation, self.contact_tolerance)
+            manifold.rows = (row1, row2)
+            manifolds[key] = manifold
+        return woken
 
+    def solve_collections(self, children, dt, gizmos):
 
-        if rb2 and not rb2.isKinematic:
-            velocity = -impulse_vec / rb2.mass
-            r2 = contact["r2"]
+        # STEP 1: Collect contact manifolds (use ALL manifold points)
+        # only pairs whose world AABBs overlap reach the narrowphase
+        bodies = [child.get_component("Rigidbody") for child in children]
+        static = [rb is None or rb.isKinematic for rb in bodies]
+        rows = self.bodies.rows(bodies)
+        asleep = self.bodies.asleep
+        boxes = [isinstance(child.collider, BoxCollider) for child in children]
+        self.bodies.refresh_transforms()
+        mins, maxs = self.bodies.aabb_min[rows], self.bodies.aabb_max[rows]
+        others = [i for i, box in enumerate(boxes) if not box]
+        if others:
+            mins[others], maxs[others] = collect_bounds([children[i] for i in others])
+        candidates, dormant = [], []
+        for i, j in self.broadphase.update(children, mins, maxs, static):
+            if (static[i] or asleep[rows[i]]) and (static[j] or asleep[rows[j]]):
+                dormant.append((i, j))  # nothing here can move, unless a contact wakes it below
+            else:
+                candidates.append((i, j))
+
+        manifolds = {}
+        while candidates:
+            woken = self.collect_manifolds(children, bodies, rows, static, boxes, candidates, manifolds)
+            if not woken:
+                break
+            # a woken body brings its whole sleeping island along (BodyStore.wake): the pairs
+            # skipped because both sides slept get their contacts this tick, not one tick later
+            sleeping = [(static[i] or asleep[rows[i]]) and (static[j] or asleep[rows[j]]) for i, j in dormant]
+            candidates = [pair for pair, still in zip(dormant, sleeping) if not still]
+            dormant = [pair for pair, still in zip(dormant, sleeping) if still]
+        self.manifolds = manifolds
+        if gizmos:
+            self.set_gizmos(contacts=list(manifolds.values()))
+
+        store = self.bodies
+        n = store.count
+        labels = island_labels(n, self.touching, store.awake())
+        self.islands = build_islands(labels)
+        self.iterations_used = 0
+        if not manifolds:
+            self.contacts.clear()
+            return []
+
+        # STEP 2: one solver row per contact point, in the reused contact buffer
+        contacts = self.contacts
+        contacts.clear()
+        active = list(manifolds.values())
+        for m in active:
+            contacts.add(m, m.rows[0], m.rows[1],
+                         min(m.rb1.restitution, m.rb2.restitution), m.rb1._get_friction(m.rb2))
+        row1, row2 = contacts.view("row1"), contacts.view("row2")
+        normal, depth = contacts.view("normal"), contacts.view("depth")
+
+        inv_mass = np.where(store.kinematic[:n], 0.0, store.inv_mass[:n])
+        velocity = store.velocity[:n]
+        moving = velocity * (inv_mass > 0)[:, None]
+        v_norm = np.einsum("ij,ij->i", moving[row1] - moving[row2], normal)
+
+        # target separating speed: bounce off fast impacts, push out deep penetration
+        bias = contacts.view("bias")
+        bias[...] = np.where(v_norm < -self.restitution_velocity, -contacts.view("restitution") * v_norm, 0.0)
+        bias += self.baumgarte / dt * np.maximum(depth - self.slop, 0.0)
+
+        # STEP 3: sequential impulse, island by island
+        arrays = {name: contacts.view(name) for name in
+                  ("row1", "row2", "normal", "tangent1", "tangent2", "bias", "mu", "impulse")}
+        arrays.update(velocity=velocity, inv_mass=inv_mass)
+        params = dict(iterations=self.solver_iterations, tolerance=self.solver_tolerance)
+        groups = contact_islands(labels, row1, row2)
+        if self.pool is not None and len(row1) >= self.parallel_threshold and len(groups) > 1:
+            self.iterations_used = self.pool.solve(groups, arrays, ("velocity", "impulse"), **params)
+        else:
+            for group in groups:
+                self.iterations_used = max(self.iterations_used, solve_contacts(group, **arrays, **params))
 
-            rb2.velocity += velocity
-            # rb2.angular_velocity += r2.cross(impulse_vec) / rb2.inertia
+        # keep the accumulated impulses for next tick's warm start
+        contacts.store_impulses()
+        return active
 
     def set_gizmos(self, contacts=[]):
         g = False
-        for contact_point in contacts:
-            for i, contact in enumerate(contact_point):
-                self.gizmos.children[i].position = contact['contact_point']
+        for manifold in contacts:
+            for i, contact_point in enumerate(manifold.points):
+                self.gizmos.children[i].position = Vector3.from_np(contact_point)
                 # self.children[1].children[i].quaternion = Quaternion.look_rotation(contact["normal"], Vector3(0,1,0))
                 g = True
 
@@ -356,101 +288,214 @@ class World:
         #     pass
         # Object(position=contacts['contact_point'])
 
+    def separate_boxes(self, children, rows, pairs):
+        """Batched SAT over box pairs: {(i, j): (axis, depth, feature)} for the ones that overlap."""
+        if not pairs:
+            return {}
+        store = self.bodies
+        store.refresh_transforms()
+        rows = np.asarray(rows)
+        hit, axis, depth, feature = box_sat_batch(store.position[rows], store.rotation[rows], store.half_size[rows], pairs)
+        return {pairs[k]: (Vector3.from_np(axis[n]), float(depth[n]), int(feature[n])) for n, k in enumerate(hit)}
+
     @staticmethod
-    def solve_joints(children, dt):
+    def joint_links(children):
+        """Store-row pairs of every FixJoint between registered bodies."""
+        links = []
+        for child in children:
+            joint = child.get_component("joint")
+            if joint is not None:
+                handleA = joint.bodyA.__dict__.get("_body")
+                handleB = joint.bodyB.__dict__.get("_body")
+                if handleA is not None and handleB is not None:
+                    links.append((handleA.index, handleB.index))
+        return links
+
+    def solve_joints(self, children, dt):
         """
         Go through all objects, find joints, and solve their constraints.
         """
         for child in children:
             joint = child.get_component("joint")
             if joint is not None:
+                handleA = joint.bodyA.__dict__.get("_body")
+                handleB = joint.bodyB.__dict__.get("_body")
+                if handleA is not None and handleB is not None:
+                    if (joint.bodyA.isKinematic or joint.bodyA.IsSleeping()) and joint.bodyB.IsSleeping():
+                        continue
+                    # jointed bodies sleep and wake together
+                    handleA.wake()
+                    handleB.wake()
                 joint.solve(dt)
 
+    def update_sleep(self):
+        if self.allow_sleep:
+            self.bodies.update_sleep(self.touching, self.sleep_velocity,
+                                     self.sleep_angular_velocity, self.sleep_ticks)
+        awake = self.bodies.awake()
+        self.awake_bodies = int(awake.sum())
+        self.sleeping_bodies = int(self.bodies.asleep[:self.bodies.count].sum())
+
+    @property
+    def scene_index(self):
+        """The SceneIndex Physics.Raycast and friends query (it refits itself on use)."""
+        if self._scene_index is None:
+            self._scene_index = SceneIndex(self)
+        return self._scene_index
+
     def Start(self):
-        children1 = self.get_all_children()
-        for child in children1:
-            for component in child.components.values():
-                if hasattr(component, 'Start') and component.Start is not None:
+        Physics.world = self  # scene queries from scripts default to this world
+        for child in list(self.registry.objects):
+            for component, start in child.callbacks["Start"]:
+                try:
+                    start()
+                except:
+                    print(f"[Error] Exception in {component.__class__.__name__}.Start():")
+                    traceback.print_exc()
+
+    def push_input(self, name, value):
+        """
+        Queue an input for the next tick's scripts, which read it as
+        world.inputs[name] (a list, in arrival order). Safe to call from other
+        threads. Inputs are what a Recorder logs and a Replayer feeds back, so
+        scripts that take input this way replay exactly.
+        """
+        with self._input_lock:
+            self.pending_inputs.setdefault(name, []).append(value)
+
+    def update(self, dt, check=True, gizmos=False, inputs=None):
+        """
+        Run one tick. `inputs`, when given, are this tick's inputs instead of
+        the pushed ones (which then wait for the next tick), for re-running a
+        recorded or rolled back tick.
+        """
+        registry = self.registry
+        if inputs is None:
+            with self._input_lock:
+                self.inputs, self.pending_inputs = self.pending_inputs, {}
+        else:
+            self.inputs = inputs
+        self.ran_scripts = check
+        if check:
+            # a copy: scripts may add or remove objects while they run
+            for component, update in registry.scripts[:]:
+                if getattr(component, "Active", True):
                     try:
-                        component.Start()
-                    except:
-                        print(f"[Error] Exception in {component.__class__.__name__}.Start():")
+                        update(dt)
+                    except Exception as e:
+                        print(f"[Error] Exception in {component.__class__.__name__}.Update(): {e}")
                         traceback.print_exc()
 
-    def update(self, dt, check=True, gizmos=False):
-        allchildren = self.get_all_children()
-        if check:
-            for child in allchildren:
-                for component in child.components.values():
-                    if hasattr(component, 'Update') and component.Update is not None and component.Active:
-                        try:
-                            component.Update(dt)
-                        except Exception as e:
-                            print(f"[Error] Exception in {component.__class__.__name__}.Update(): {e}")
-                            traceback.print_exc()
-
-        children = self.get_all_children_physics()
+        children = registry.physics
+        self.sync_bodies()
+        self.bodies.sync_sizes()
+        self.touching = self.joint_links(children)  # contacts are added by solve_collections
         self.apply_gravity(children)  # APPLY GRAVITY and external forces
+        self.bodies.integrate_velocities(dt)  # contacts are solved against this tick's velocities
         self.solve_collections(children, dt, gizmos)  # handel collisions and friction
         self.solve_joints(children, dt)
+        self.update_sleep()  # before integration, while resting contacts are cancelled
 
-        for child in children:
-            rb = child.get_component("Rigidbody")
-            if rb is not None:
-                child_children = child.get_all_children_not_physics()
-                for child_of_child in child_children:
-                    if child_of_child.get_component("Rigidbody") is not None:
-                        child_of_child.position += child_of_child.Rigidbody.velocity * dt \
-                                                   + 0.5 * child_of_child.Rigidbody.acceleration * dt * dt
-                if not rb.isKinematic:
-                    self.integrat(child,dt)
+        for child_of_child in self.riders():
+            child_of_child.position += child_of_child.Rigidbody.velocity * dt \
+                                       + 0.5 * child_of_child.Rigidbody.acceleration * dt * dt
+        self.integrat(dt)
 
-        for child in allchildren:
+        for child in registry.objects:
             child.rotation = child.quaternion.to_euler()
-    @staticmethod
+
+        self.tick += 1
+        if self.recorder is not None:
+            self.recorder.capture()
+
+    def sync_bodies(self):
+        """Give every physics body its BodyStore row, if the scene changed since last time."""
+        if self._synced != self.registry.version:
+            self.bodies.sync([child.get_component("Rigidbody") for child in self.registry.physics])
+            self._synced = self.registry.version
+
+    def snapshot(self, out=None):
+        """Dynamic state of every physics body and contact as one byte buffer (see Snapshot.py)."""
+        return take_snapshot(self, out)
+
+    def restore(self, snapshot):
+        """Put the world back to a snapshot it produced, without rebuilding any object."""
+        restore_snapshot(self, snapshot)
+
+    # settings a fork copies from its world
+    TUNING = ("allow_sleep", "sleep_velocity", "sleep_angular_velocity", "sleep_ticks", "solver_iterations",
+              "solver_tolerance", "max_contacts", "contact_tolerance", "baumgarte", "slop", "restitution_velocity")
+
+    def fork(self):
+        """
+        A physics-only copy of this world in its current state, for looking
+        ahead: step_many() it and throw it away, the original is not touched.
+
+            ahead = world.fork()
+            ahead.step_many(120, dt, check=False)
+            where = ahead.registry.physics[k].position
+
+        Objects keep their names and order (registry lists match this
+        world's), meshes and scripts are left out, and shapes and materials
+        are shared. Contacts carry over, so warm starting and sleep pick up
+        exactly where this world is.
+        """
+        self.sync_bodies()  # every body in the store, so clones find their state there
+        memo = {}
+        roots = [child.physics_clone(memo) for child in self.children]
+        clones = [memo[id(obj)] for obj in self.registry.objects]
+        for clone in clones:
+            clone.relink(memo)
+
+        fork = World(children=roots, gravity=self.gravity, broadphase=self.broadphase.empty())
+        for name in self.TUNING:
+            setattr(fork, name, getattr(self, name))
+        for clone in clones:
+            if clone.world is self:  # top-level objects added with add_child
+                clone.world = fork
+        registry = fork.registry
+        registry.objects = clones  # same order as here, so snapshots line up
+        for name in ("physics", "colliders", "joints"):
+            setattr(registry, name, [memo[id(obj)] for obj in getattr(self.registry, name)])
+        registry.version += 1
+        fork.bodies = self.bodies.copy_for([memo[id(rb)] for rb in self.bodies.bodies])
+        fork._synced = registry.version
+        fork.tick = self.tick
+        fork.restore(self.snapshot())  # contacts and collider state
+        return fork
+
+    def step(self, dt, check=True):
+        """Advance one tick (scripts, then physics) right away, without pacing to the clock."""
+        self.update(dt, check=check)
+
+    def step_many(self, n, dt, stop=None, callback=None, every=1, check=True):
+        """
+        Run up to `n` ticks back to back. After each tick `stop(world)` may
+        end the run early (e.g. World.all_asleep, or
+        lambda world: box.position.y < 0), and `callback(world, steps)` runs
+        every `every` ticks. Start() is not called here. Returns the number of
+        ticks run.
+        """
+        steps = 0
+        while steps < n:
+            self.update(dt, check=check)
+            steps += 1
+            if callback is not None and steps % every == 0:
+                callback(self, steps)
+            if stop is not None and stop(self):
+                break
+        return steps
+
+    def all_asleep(self):
+        """True when no dynamic body is awake (a stop predicate for step_many)."""
+        return not self.bodies.awake().any()
+
+    def close(self):
+        """Shut down the island worker pool, if any."""
+        if self.pool is not None:
+            self.pool.close()
+
     def integrat(self, dt):
-        rb = self.get_component("Rigidbody")
         # === 4) INTEGRATION PHASE ===
-        # 4.1) Linear acceleration & velocity:
-        rb.acceleration = rb.force / rb.mass
-
-        # 4.2) Angular acceleration & velocity (component‐wise):
-        rb.angular_acceleration = Vector3(
-            rb.torque.x / rb.inertia.x if rb.inertia.x != 0 else 0,
-            rb.torque.y / rb.inertia.y if rb.inertia.y != 0 else 0,
-            rb.torque.z / rb.inertia.z if rb.inertia.z != 0 else 0
-        )
-        rb.angular_velocity += rb.angular_acceleration * dt
-        # 4.3) Integrate rotation
-        ang_disp = rb.angular_velocity * dt \
-                   + 0.5 * rb.angular_acceleration * dt * dt
-
-        self.quaternion *= Quaternion.euler(ang_disp)
-
-        self.position += rb.velocity * dt \
-                         + 0.5 * rb.acceleration * dt * dt
-
-        rb.velocity += rb.acceleration * dt
-
-        rb.force = Vector3(0, 0, 0)
-        rb.torque = Vector3(0, 0, 0)
-
-        rb.angular_acceleration = Vector3(0, 0, 0)
-        rb.torque = Vector3(0, 0, 0)
-
-        # rb.energy = 0.5 * self.parent.Rigidbody.mass * self.parent.Rigidbody.velocity.magnitude() ** 2 +
-        # self.parent.Rigidbody.mass * 9.8 * self.parent.position.y
-def Iinv_world(rb):
-    if not rb or rb.isKinematic:
-        # return identity-like mapper
-        class _Zero:
-            def __matmul__(self, x): return x  # won't be used
-
-        return _Zero()
-    # If rb.inverse_inertia is BODY-space, rotate it:
-    # expected fields: rb.inv_inertia_body (3x3), rb.rotation_matrix (R)
-    if hasattr(rb, "inverse_inertia") and hasattr(rb.parent.quaternion, "to_matrix3"):
-        R = rb.parent.quaternion.to_matrix3()  # 3x3 world-from-body
-        return R @ rb.inverse_inertia @ R.T
-    # else assume the given one is already world
-    return rb.inverse_inertia
\ No newline at end of file
+        # one batched pass over every dynamic body in the store
+        self.bodies.integrate_positions(dt)
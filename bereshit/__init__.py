@@ -8,10 +8,21 @@ from .Camera import Camera
 from .MeshRander import MeshRander
 from .World import World
 from .FixJoint import FixJoint
-from .render import BereshitRenderer as Render
-from .render import Text as Text
+from .Broadphase import SweepAndPrune, DynamicAABBTree, SpatialHashGrid
+from .Batch import simulate_batch
+from .Replay import Recorder, Replayer
+from .Rollback import Rollback
 
 from .Physics import Physics
 from .Physics import RaycastHit
 
-__all__ = ["Vector3", "Quaternion", "Object", "Rigidbody", "BoxCollider", "Material", "Camera", "MeshRander", "World", "FixJoint", "Render"]
+
+def __getattr__(name):
+    # the renderer pulls in moderngl_window, pyrr and PIL; headless code never asks for it
+    if name in ("Render", "Text"):
+        from . import render
+        return render.BereshitRenderer if name == "Render" else render.Text
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["Vector3", "Quaternion", "Object", "Rigidbody", "BoxCollider", "Material", "Camera", "MeshRander", "World", "FixJoint", "Render", "SweepAndPrune", "DynamicAABBTree", "SpatialHashGrid", "simulate_batch", "Recorder", "Replayer", "Rollback"]
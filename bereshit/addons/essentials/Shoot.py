@@ -23,9 +23,9 @@ class Shoot:
         self.shots_text.text = str(self.shots)
         # self.render.t = str(self.shots)
         forward = self.parent.quaternion.rotate(Vector3(0,0,1))
-        hit = Physics.Raycast(self.parent.position.to_np(),forward.to_np(),self.target.get_component("collider"))
-        if hit.point is not None:
-            self.target.Rigidbody.AddForce(forward * self.force,ContactPoint=Vector3.from_np(hit.point))
+        hit = Physics.Raycast(self.parent.position, forward)  # whatever is in front, not just the target
+        if hit and hit.rigidbody is not None:
+            hit.rigidbody.AddForce(forward * self.force,ContactPoint=Vector3.from_np(hit.point))
             # self.gimos.position = Vector3.from_np(hit)
     def Start(self):
         self.render = self.parent.Camera.render
@@ -35,6 +35,10 @@ class Client:
         self.outgoing.append(msg)
 
     def Update(self, dt=None):
+        registry = self.parent.registry
+        if registry is not None and registry.world is not None and registry.world.resimulating:
+            return  # a Rollback is re-running past ticks: don't send or consume packets again
+
         # --- parse any received messages ---
         msgs = self.get_messages()
 
@@ -0,0 +1,145 @@
+import math
+
+import numpy as np
+
+from bereshit.Physics import Physics
+
+
+def planar_scan(beams=360, fov=360.0):
+    """Directions of a 2D scanner: `beams` rays spread over `fov` degrees around the local up (y) axis."""
+    if fov >= 360:
+        yaw = np.linspace(0.0, 2 * np.pi, beams, endpoint=False)
+    else:
+        yaw = np.radians(np.linspace(-fov / 2, fov / 2, beams))
+    return np.stack([np.sin(yaw), np.zeros(beams), np.cos(yaw)], axis=-1)
+
+
+def spinning_scan(beams=1024, channels=16, fov=360.0, vertical_fov=30.0):
+    """Directions of a spinning multi-channel lidar, shape (channels, beams, 3), bottom channel first."""
+    yaw = planar_scan(beams, fov)
+    pitch = np.radians(np.linspace(-vertical_fov / 2, vertical_fov / 2, channels))
+    directions = yaw[None] * np.cos(pitch)[:, None, None]
+    directions[..., 1] = np.sin(pitch)[:, None]
+    return directions
+
+
+def camera_rays(width=160, height=120, fov=60.0):
+    """
+    Unit directions through the pixel centres of a pinhole camera looking
+    down local +z, shape (height, width, 3), top row first. `fov` is the
+    horizontal field of view in degrees.
+    """
+    focal = (width / 2) / math.tan(math.radians(fov) / 2)
+    x = np.arange(width) + 0.5 - width / 2
+    y = height / 2 - (np.arange(height) + 0.5)
+    directions = np.empty((height, width, 3))
+    directions[..., 0] = x[None, :]
+    directions[..., 1] = y[:, None]
+    directions[..., 2] = focal
+    return directions / np.linalg.norm(directions, axis=-1, keepdims=True)
+
+
+class Lidar:
+    """
+    A range sensor. Attach it to an object like any other component; every
+    tick (or `rate` times a second) it casts `pattern` from the object's
+    pose and writes the distance of each ray into `ranges`, a NumPy array of
+    the pattern's shape (inf where nothing is within max_range).
+
+        lidar = Lidar(spinning_scan(1024, 16), max_range=30.0, rate=10)
+        robot.add_child(Object(position=Vector3(0, 0.5, 0), name="lidar").add_component(lidar))
+        ...
+        if lidar.scans != seen:       # a new scan was published
+            seen = lidar.scans
+            cloud = lidar.points()
+
+    `ranges` is the same array every scan, filled in place; pass `out` (for
+    instance an array over multiprocessing.shared_memory) to have it written
+    there. `colliders` holds the index in world.registry.colliders of what
+    each ray hit, -1 for a miss. The scan runs on the World's SceneIndex
+    (SceneIndex.scan), so it shares the tree Physics.Raycast uses.
+
+    Rays start inside the object's own collider if it has one: mount the
+    sensor on a child object without a collider.
+    """
+
+    def __init__(self, pattern=None, max_range=30.0, rate=None, offset=(0.0, 0.0, 0.0), out=None):
+        pattern = planar_scan() if pattern is None else np.asarray(pattern, dtype=float)
+        self.pattern = pattern / np.linalg.norm(pattern, axis=-1, keepdims=True)  # local directions
+        self.max_range = max_range
+        self.rate = rate  # scans per second, None for every tick
+        self.offset = np.asarray(offset, dtype=float)  # local position of the sensor on its object
+        shape = self.pattern.shape[:-1]
+        if out is not None and out.shape != shape:
+            raise ValueError(f"out has shape {out.shape}, the pattern gives {shape}")
+        self.ranges = np.full(shape, np.inf) if out is None else out
+        self.colliders = np.full(shape, -1, dtype=np.int64)
+        self.origin = np.zeros(3)  # pose of the last scan
+        self.rotation = np.eye(3)
+        self.tick = None  # world tick of the last scan
+        self.scans = 0
+        self.timer = 0.0
+        self.parent = None
+
+    def _world(self):
+        registry = getattr(self.parent, "registry", None)
+        world = getattr(registry, "world", None)
+        return world if world is not None else Physics.world
+
+    def Update(self, dt):
+        if self.rate is None:
+            self.scan()
+            return
+        self.timer += dt
+        period = 1.0 / self.rate
+        if self.timer >= period:
+            self.timer = min(self.timer - period, period)  # a slow tick delays scans, doesn't bunch them
+            self.scan()
+
+    def directions(self):
+        """The pattern turned into world space by the parent's rotation, flattened to (N, 3)."""
+        return self.pattern.reshape(-1, 3) @ self.rotation.T
+
+    def scan(self):
+        """Cast the pattern now and publish the result; returns `ranges`."""
+        world = self._world()
+        if world is None:
+            raise RuntimeError("the sensor's object is not in a World")
+        transform = self.parent.world_transform
+        self.rotation = np.array(transform.rotation)
+        self.origin = transform.position + self.rotation @ self.offset
+        distances, _, _, colliders = world.scene_index.scan(self.origin, self.directions(), self.max_range)
+        self._publish(distances, colliders)
+        self.tick = world.tick
+        self.scans += 1
+        return self.ranges
+
+    def _publish(self, distances, colliders):
+        np.copyto(self.ranges, distances.reshape(self.ranges.shape), casting="unsafe")
+        self.colliders[...] = colliders.reshape(self.colliders.shape)
+
+    def points(self):
+        """World space hit points of the last scan, (hits, 3)."""
+        hit = np.isfinite(self.ranges).reshape(-1)
+        return self.origin + self.directions()[hit] * self.ranges.reshape(-1, 1)[hit]
+
+
+class DepthCamera(Lidar):
+    """
+    A depth camera: a Lidar firing camera_rays(width, height, fov) whose
+    `ranges` is a (height, width) image of depth along the view axis (local
+    z), as a depth buffer stores it, rather than distance along each ray.
+    """
+
+    def __init__(self, width=160, height=120, fov=60.0, max_range=30.0, rate=None, offset=(0.0, 0.0, 0.0), out=None):
+        super().__init__(camera_rays(width, height, fov), max_range, rate, offset, out)
+        self.depth_scale = self.pattern[..., 2].copy()  # cosine between each ray and the view axis
+
+    def _publish(self, distances, colliders):
+        np.multiply(distances.reshape(self.ranges.shape), self.depth_scale, out=self.ranges, casting="unsafe")
+        self.colliders[...] = colliders.reshape(self.colliders.shape)
+
+    def points(self):
+        hit = np.isfinite(self.ranges).reshape(-1)
+        distances = (self.ranges / self.depth_scale).reshape(-1, 1)
+        return self.origin + self.directions()[hit] * distances[hit]
@@ -0,0 +1,4 @@
+from .Lidar import Lidar, DepthCamera, planar_scan, spinning_scan, camera_rays
+
+
+__all__ = ["Lidar", "DepthCamera", "planar_scan", "spinning_scan", "camera_rays"]
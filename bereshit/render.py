@@ -19,6 +19,7 @@ for name in [
 # --- Disable automatic resource registration if no "scene" folder exists ---
 import os
 from pathlib import Path
+from time import perf_counter
 
 scene_path = Path(__file__).parent / "scene"
 if not scene_path.exists():
@@ -51,6 +52,7 @@ class BereshitRenderer(moderngl_window.WindowConfig):
         self.wnd.exit_key = None
         self.root_object = BereshitRenderer.root_object  # 👈 assign it here
         self.camera_obj = self.root_object.search_by_component('Camera')
+        self.scene_version = None  # registry version the meshes were last matched against
 
         if not self.camera_obj:
             raise Exception("No camera object found")
@@ -152,6 +154,7 @@ class BereshitRenderer(moderngl_window.WindowConfig):
     def on_key_event(self, key, action, modifiers):
         keys = self.wnd.keys
         self.keys.append(key)
+        self.root_object.push_input("key", (key, action, modifiers))  # recorded with the tick that reads it
 
         # Key pressed (only trigger once)
         if action == keys.ACTION_PRESS and key not in self.keys_down:
@@ -160,6 +163,15 @@ class BereshitRenderer(moderngl_window.WindowConfig):
         elif action == keys.ACTION_RELEASE and key in self.keys_down:
             self.keys_down.remove(key)
 
+    def mouse_position_event(self, x, y, dx, dy):
+        self.root_object.push_input("mouse", (x, y, dx, dy))
+
+    def mouse_press_event(self, x, y, button):
+        self.root_object.push_input("mouse_press", (x, y, button))
+
+    def mouse_release_event(self, x, y, button):
+        self.root_object.push_input("mouse_release", (x, y, button))
+
     def prepare_meshes(self):
         shading = self.cam.shading
         if shading == "wire":
@@ -343,29 +355,36 @@ class BereshitRenderer(moderngl_window.WindowConfig):
         self.ui_elements.append(vertices)
 
     def on_render(self, time: float, frametime: float):
-        # collect all scene objects (root + children)
-        scene_objs = self.root_object.get_all_children()
+        # a World's registry says when the scene changed; anything else is walked every frame
+        registry = getattr(self.root_object, "registry", None)
+        if registry is None or registry.version != self.scene_version:
+            if registry is not None:
+                self.scene_version = registry.version
+                scene_objs = list(registry.renderables)
+            else:
+                scene_objs = self.root_object.get_all_children()
 
-        # ignore the camera (and any other special objs)
-        skip_objs = {self.camera_obj}
-        scene_objs = [obj for obj in scene_objs if obj not in skip_objs]
+            # ignore the camera (and any other special objs)
+            skip_objs = {self.camera_obj}
+            scene_objs = [obj for obj in scene_objs if obj not in skip_objs]
 
-        # objects we already have meshes for
-        existing_objs = [m['obj'] for m in self.meshes]
+            # objects we already have meshes for
+            existing_objs = {m['obj'] for m in self.meshes}
 
-        # objects missing a mesh
-        missing = [obj for obj in scene_objs if obj not in existing_objs]
+            # objects missing a mesh
+            missing = [obj for obj in scene_objs if obj not in existing_objs]
 
-        # objects no longer in the scene
-        removed = [obj for obj in existing_objs if obj not in scene_objs]
+            # objects no longer in the scene
+            scene_set = set(scene_objs)
+            removed = [obj for obj in existing_objs if obj not in scene_set]
 
-        # prepare meshes for new ones
-        if missing:
-            self.prepare_missing_meshes(missing)
+            # prepare meshes for new ones
+            if missing:
+                self.prepare_missing_meshes(missing)
 
-        # cleanup old meshes
-        if removed:
-            self.cleanup_removed_meshes(removed)  # you'd implement this
+            # cleanup old meshes
+            if removed:
+                self.cleanup_removed_meshes(removed)  # you'd implement this
 
         shading = self.cam.shading
 
@@ -373,10 +392,24 @@ class BereshitRenderer(moderngl_window.WindowConfig):
 
 
 
-        cam_pos = self.camera_obj.position.to_np()
-        cam_rot = self.camera_obj.quaternion
+        # blend the last two physics states when the logic loop publishes them
+        frames = getattr(self.root_object, "frames", None)
+        if frames is not None:
+            index = frames.index
+            positions, quaternions, rotations_T = frames.blend(perf_counter())
+        else:
+            index = {}
+
+        row = index.get(self.camera_obj)
+        if row is None:
+            cam_pos = self.camera_obj.position.to_np()
+            cam_rot = self.camera_obj.quaternion
+            cam_rot = [cam_rot.x, cam_rot.y, cam_rot.z, cam_rot.w]
+        else:
+            cam_pos = positions[row].astype(np.float32)
+            cam_rot = quaternions[row].tolist()
         # Rotate forward vector (0, 0, 1) using the rotation matrix
-        pyrr_q = PyrrQuat([cam_rot.x, cam_rot.y, cam_rot.z, cam_rot.w])
+        pyrr_q = PyrrQuat(cam_rot)
         rot_matrix = Matrix44.from_quaternion(pyrr_q)
 
         forward_vec4 = np.array([0.0, 0.0, 1.0, 0.0])  # direction vector (w=0)
@@ -397,19 +430,18 @@ class BereshitRenderer(moderngl_window.WindowConfig):
 
         for item in self.meshes:
             obj = item['obj']
-            pos = obj.position.to_np()
+            row = index.get(obj)
+            if row is None:
+                transform = obj.world_transform
+                pos, rotation_T = transform.position, transform.rotation_T
+            else:
+                pos, rotation_T = positions[row], rotations_T[row]
             size = obj.size.to_np()
-            rot = obj.quaternion
-
-            # Use object's rotation
-            pyrr_obj_q = PyrrQuat([rot.x, rot.y, rot.z, rot.w])
-            # obj_rot_matrix = Matrix44.from_quaternion(pyrr_obj_q)
 
-            model = (
-                    Matrix44.from_scale(size*0.5)
-                    @ Matrix44.from_quaternion(PyrrQuat([rot.x, rot.y, rot.z, rot.w]))
-                    @ Matrix44.from_translation(pos)
-            )
+            # scale @ rotation @ translation, for row vectors: the rotation matrix transposed
+            model = np.eye(4)
+            model[:3, :3] = (size * 0.5)[:, None] * rotation_T
+            model[3, :3] = pos
             if shading == "wire":
                 item['vao'].render(mode=moderngl.LINES, vertices=item['len'])
                 self.wire_prog['model'].write(model.astype('f4').tobytes())
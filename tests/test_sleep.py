@@ -0,0 +1,48 @@
+from bereshit import Object, Vector3, BoxCollider, Rigidbody, World
+
+DT = 1 / 60
+
+
+def box(name, y, size=(1, 1, 1), kinematic=False):
+    obj = Object(position=Vector3(0, y, 0), size=Vector3(*size), name=name)
+    obj.add_component([BoxCollider(), Rigidbody(isKinematic=kinematic)])
+    return obj
+
+
+def sleeping_stack(height=3):
+    floor = box("floor", -0.5, size=(10, 1, 10), kinematic=True)
+    stack = [box(f"box_{k}", 0.5 + k) for k in range(height)]
+    world = World(children=[floor] + stack)
+    world.Start()
+    for _ in range(600):
+        world.update(DT)
+        if all(obj.Rigidbody.IsSleeping() for obj in stack):
+            break
+    assert all(obj.Rigidbody.IsSleeping() for obj in stack)
+    return world, stack
+
+
+def test_dropped_box_wakes_the_whole_stack_in_one_tick():
+    world, stack = sleeping_stack()
+    dropped = box("dropped", 6.0)
+    world.add_child(dropped)
+
+    woke_at = []
+    lowest = float("inf")
+    for tick in range(300):
+        world.update(DT)
+        awake = [not obj.Rigidbody.IsSleeping() for obj in stack]
+        assert all(awake) or not any(awake), f"stack half awake at tick {tick}: {awake}"
+        if all(awake) and not woke_at:
+            woke_at.append(tick)
+        lowest = min(lowest, stack[0].position.y - 0.5)
+
+    assert woke_at, "the stack never woke up"
+    assert lowest > -0.05, f"bottom box sank to {lowest:.3f} into the floor"
+
+
+def test_removing_a_body_wakes_what_slept_on_it():
+    world, stack = sleeping_stack()
+    world.remove_child(stack[0])
+    world.update(DT)
+    assert not any(obj.Rigidbody.IsSleeping() for obj in stack[1:])